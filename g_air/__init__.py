@@ -25,5 +25,17 @@ global_configs = {
         'port': '3306',
         'user': 'guset',
         'password': '4AE6AyNF',
-        'database': 'factor_calculation_results'}
+        'database': 'factor_calculation_results'},
+    'target_schema': {
+        'typed': False},
+    'local_store': {
+        'enabled': False,
+        'path': os.path.join(current_path, 'resources', 'store')},
+    'incremental_state': {
+        'path': os.path.join(current_path, 'resources', 'incremental_state.pkl')},
+    'result_cache': {
+        'enabled': False,
+        'path': os.path.join(current_path, 'resources', 'result_cache.sqlite')},
+    'backfill': {
+        'path': os.path.join(current_path, 'resources', 'backfill_checkpoint.json')}
 }
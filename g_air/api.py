@@ -7,22 +7,37 @@
 """
 import os
 import inspect
-import multiprocessing
 import numpy as np
-import pandas as pd
 from functools import wraps
 from collections import OrderedDict
-from concurrent.futures import ProcessPoolExecutor, as_completed
 from .data.database_api import *
-from .calculator.factors import *
-from .calculator.signals import *
+from .data.writer import write_indicator_cube
+from .calculator.formula import (
+    calculate_indicator_matrices,
+    formula_versions
+)
+from .calculator.incremental import IncrementalState
+from .calculator.parallel import (
+    calculate_indicator_cube_in_parallel,
+    calculate_indicator_slot_in_parallel
+)
+from .calculator.planner import (
+    plan_lookbacks,
+    plan_periods
+)
+from .core.cube import (
+    AttributeCube,
+    IndicatorCube
+)
 from .const import (
-    AVAILABLE_DATA_FIELDS,
-    MAX_GLOBAL_PERIODS,
+    INDICATOR_FIELDS,
     MAX_SYMBOLS_FRAGMENT,
-    OUTPUT_FIELDS
+    MAX_WRITERS,
+    OUTPUT_FIELDS,
+    STREAM_WINDOW_PERIODS
 )
-from . import current_path
+from .utils.exceptions import Exceptions
+from . import current_path, global_configs
 
 
 def output(func):
@@ -38,7 +53,7 @@ def output(func):
 
     @wraps(func)
     def _decorator(*args, **kwargs):
-        panel = func(*args, **kwargs)
+        cube = func(*args, **kwargs)
         arg_spec = inspect.getfullargspec(func)
         arguments_list = arg_spec.args
         arguments_default = arg_spec.defaults
@@ -48,248 +63,342 @@ def output(func):
             args_arguments = dict(zip(arguments_list[:len(args)], args))
             arguments.update(args_arguments)
         if arguments.get('dump_excel', False):
+            output_fields = [field for field in OUTPUT_FIELDS if field in cube]
             path = arguments.get('current_path', current_path)
             excel_name = arguments.get('excel_name', '{}.xlsx'.format(func.__name__))
             if excel_name == 'symbol':
-                output_panel = panel.swapaxes(0, 2)
                 symbols_name_map = load_symbols_name_map()
-                for symbol in output_panel:
+                for symbol in cube.symbols:
                     excel_name = '{}-{}.xlsx'.format(symbol, symbols_name_map.get(symbol, symbol))
                     excel_path = os.path.join(path, excel_name)
-                    frame = output_panel[symbol][OUTPUT_FIELDS].T
+                    frame = cube.by_symbol(symbol)[output_fields].T
                     frame = frame[sorted(frame.columns, reverse=True)]
-                    frame.to_excel(excel_path, encoding='gbk')
+                    frame.to_excel(excel_path)
             elif excel_name == 'target_date':
-                output_panel = panel.swapaxes(0, 1)
-                for target_date in output_panel:
+                for target_date in cube.dates:
                     excel_name = '{}.xlsx'.format(target_date)
                     excel_path = os.path.join(path, excel_name)
-                    output_panel[target_date].loc[OUTPUT_FIELDS, :].to_excel(excel_path, encoding='gbk')
+                    cube.by_date(target_date).loc[output_fields, :].to_excel(excel_path)
             elif excel_name == 'indicator':
-                output_panel = panel
-                for indicator in output_panel:
-                    if indicator not in OUTPUT_FIELDS:
-                        continue
+                for indicator in output_fields:
                     excel_name = '{}.xlsx'.format(indicator)
                     excel_path = os.path.join(path, excel_name)
-                    output_panel[indicator].to_excel(excel_path, encoding='gbk')
+                    cube[indicator].to_excel(excel_path)
             else:
-                panel.to_excel(excel_name, encoding='gbk')
+                cube.to_excel(excel_name)
         if arguments.get('dump_mysql', False):
-            symbols_name_map = load_symbols_name_map()
-            for indicator in panel:
-                if indicator not in OUTPUT_FIELDS:
-                    continue
-                frame = panel[indicator]
-                frame.index += ' 00:00:00'
-                all_items = list()
-                for symbol in frame.columns:
-                    symbol_name = symbols_name_map.get(symbol, symbol)
-                    series = frame.iloc[:, frame.columns.get_loc(symbol)]
-                    for _ in series.items():
-                        item = [_[0], symbol, symbol_name, _[1]]
-                        if np.isnan(item[-1]):
-                            print(indicator, item)
-                            continue
-                        all_items.append(item)
-                update_table(indicator.strip('(n)').lower(), all_items)
-        return panel
+            write_indicator_cube(cube, [indicator for indicator in cube if indicator in OUTPUT_FIELDS],
+                                 symbols_name_map=load_symbols_name_map(),
+                                 method=arguments.get('dump_method', 'insert'),
+                                 writers=arguments.get('dump_writers', MAX_WRITERS))
+        return cube
 
     return _decorator
 
 
+def _requested_indicators(indicators=None):
+    """
+    Validate requested indicators.
+
+    Args:
+        indicators(list or None): list of indicator name, INDICATOR_FIELDS by default
+
+    Returns:
+        list: list of indicator name, in the order of INDICATOR_FIELDS
+    """
+    indicators = indicators.split(',') if isinstance(indicators, str) else indicators
+    if not indicators:
+        return list(INDICATOR_FIELDS)
+    assert set(indicators) <= set(INDICATOR_FIELDS), Exceptions.INVALID_INDICATORS
+    return [indicator for indicator in INDICATOR_FIELDS if indicator in set(indicators)]
+
+
+def _load_planned_cube(symbols, start_date, following_dates=None, indicators=None):
+    """
+    Load the attributes of indicators with the lookback of each attribute planned from the dependency graph.
+
+    Args:
+        symbols(list): list of symbols
+        start_date(string): first target date, %Y-%m-%d
+        following_dates(list): following target dates
+        indicators(list): list of indicator name
+
+    Returns:
+        AttributeCube: cube of (attribute, date, symbol)
+    """
+    following_dates = list(following_dates or list())
+    lookbacks = plan_lookbacks(indicators)
+    history_trading_days = load_trading_days_with_history_periods(
+        date=start_date, history_periods=max(lookbacks.values()))
+    trading_days = history_trading_days + following_dates
+    periods = plan_periods(lookbacks, target_periods=1 + len(following_dates))
+    return load_attributes_cube(symbols, trading_days, attributes=list(lookbacks), periods=periods)
+
+
+def _calculate_indicators_incrementally(symbols, target_date, indicators):
+    """
+    Calculate indicators of a target date from the persisted incremental state.
+
+    Only the rows of target date are loaded when the state is at the previous trading date and was built
+    for the same symbols, otherwise the state is rebuilt from a full history window.
+
+    Args:
+        symbols(list): list of symbols
+        target_date(string): target date, %Y-%m-%d
+        indicators(list): list of indicator name
+
+    Returns:
+        OrderedDict: {indicator: Series}
+    """
+    path = global_configs['incremental_state']['path']
+    state = IncrementalState.load(path)
+    if state is not None and state.date == get_trading_calendar().offset(target_date, offset=-1) and \
+            set(indicators) <= set(state.indicators) and state.matches(symbols):
+        data = load_attributes_cube(symbols, [target_date], attributes=state.attributes)
+        indicator_dict = state.update(target_date, data)
+    else:
+        data = _load_planned_cube(symbols, target_date, indicators=indicators)
+        state, indicator_dict = IncrementalState.from_data(data, indicators, symbols)
+    state.save(path)
+    return OrderedDict((indicator, indicator_dict[indicator]) for indicator in indicators)
+
+
+def _calculate_with_cache(symbols, target_dates, indicators, load, calculate):
+    """
+    Calculate indicators of target dates, assembling the cells already in the result cache from it and
+    calculating only the indicators and dates with missing or stale cells.
+
+    NaN cells before the latest date with rows of the loaded data are cached as known, those of later dates
+    are calculated again until their source rows arrive.
+
+    Args:
+        symbols(list): list of symbols
+        target_dates(list): target dates, %Y-%m-%d, ascending
+        indicators(list): list of indicator name
+        load(function): load(target_dates, indicators) returning the data of an AttributeCube
+        calculate(function): calculate(data, target_dates, indicators) returning an IndicatorCube
+
+    Returns:
+        IndicatorCube: symbol indicators cube, (indicator, date, symbol), on the requested symbols, NaN for
+            symbols without rows
+    """
+    cube = IndicatorCube.allocate(indicators, target_dates, sorted(set(symbols)))
+    cache = get_result_cache()
+    if cache is None:
+        result = calculate(load(target_dates, indicators), target_dates, indicators)
+        for indicator in indicators:
+            cube.fill(indicator, result[indicator])
+        return cube
+    versions = formula_versions(indicators)
+    missing = ~cache.fetch(cube, versions)
+    if missing.any():
+        missing_indicators = [indicator for indicator, flag in zip(indicators, missing.any(axis=(1, 2))) if flag]
+        missing_positions = np.flatnonzero(missing.any(axis=(0, 2)))
+        span = target_dates[missing_positions[0]:missing_positions[-1] + 1]
+        data = AttributeCube.from_frames(load(span, missing_indicators))
+        calculated = IndicatorCube.allocate(missing_indicators, span, cube.symbols)
+        result = calculate(data, span, missing_indicators)
+        for indicator in missing_indicators:
+            calculated.fill(indicator, result[indicator])
+        cache.store(calculated, versions, watermark=data.last_valid_date())
+        cube.update(calculated)
+    return cube
+
+
+def _slot_cube(target_date, indicator_dict):
+    """
+    Cube of a target date from indicator series.
+
+    Args:
+        target_date(string): target date, %Y-%m-%d
+        indicator_dict(dict): {indicator: Series}
+
+    Returns:
+        IndicatorCube: symbol indicators cube, (indicator, date, symbol), symbols sorted
+    """
+    all_symbols = sorted(set().union(*[set(series.index) for series in indicator_dict.values()]))
+    cube = IndicatorCube.allocate(list(indicator_dict), [target_date], all_symbols)
+    for indicator, series in indicator_dict.items():
+        cube.fill_row(indicator, target_date, series)
+    return cube
+
+
 @output
-def calculate_indicators_of_date_slot(symbols=None, target_date=None, data=None, **kwargs):
+def calculate_indicators_of_date_slot(symbols=None, target_date=None, data=None, indicators=None, **kwargs):
     """
     Calculate indicators of symbols of a specific target date.
 
     Args:
         symbols(list): list of symbols
         target_date(string): target date, %Y-%m-%d
-        data(dict): cached data from outside
+        data(dict or AttributeCube): cached data from outside
+        indicators(string or list or None): indicators to calculate, all by default; only their dependencies
+            are loaded and evaluated
         **kwargs(**dict): key-word arguments, available as follows
             * dump_excel(boolean): whether to export data as excel or not
             * excel_name(string): assign an excel name (as result.xlsx) or 'target_date', 'symbol'
             * dump_mysql(boolean): whether to dump data to mysql database or not
+            * dump_method(string): 'insert' for chunked upserts, 'load_data' for LOAD DATA LOCAL INFILE or 'diff'
+                for upserts of the new and changed cells only
+            * dump_writers(int): number of parallel writer connections of upserts
+            * incremental(boolean): whether to update the persisted lag state with one date of data or not
 
     Returns:
-        pandas.Panel: symbol indicators panel, {indicator: {date: {symbol}}}
+        IndicatorCube: symbol indicators cube, (indicator, date, symbol)
     """
     assert isinstance(kwargs, dict)
     symbols = symbols or load_all_symbols()
+    indicators = _requested_indicators(indicators)
+    if kwargs.get('incremental', False) and data is None:
+        return _slot_cube(target_date, _calculate_indicators_incrementally(symbols, target_date, indicators))
     if data is None:
-        trading_days = load_trading_days_with_history_periods(date=target_date, history_periods=MAX_GLOBAL_PERIODS)
-        data = load_attributes_data(symbols, trading_days, attributes=AVAILABLE_DATA_FIELDS)
-    factor_q = calculate_factor_q(target_date=target_date, data=data)
-    factor_m = calculate_factor_m(target_date=target_date, data=data)
-    factor_m_offset_20 = calculate_factor_m(target_date=target_date, offset=-20, data=data)
-    factor_w = calculate_factor_w(target_date=target_date, data=data)
-    factor_w_offset_5 = calculate_factor_w(target_date=target_date, offset=-5, data=data)
-    factor_d = calculate_factor_d(target_date=target_date, data=data)
-    factor_d_offset_1 = calculate_factor_d(target_date=target_date, offset=-1, data=data)
-    factor_close = get_close_price_series(target_date=target_date, data=data)
-    factor_close_offset_1 = get_close_price_series(target_date=target_date, offset=-1, data=data)
-    factor_close_offset_5 = get_close_price_series(target_date=target_date, offset=-5, data=data)
-    factor_close_offset_20 = get_close_price_series(target_date=target_date, offset=-20, data=data)
-
-    signal_m = calculate_signal_m(q_series=factor_q, m_series=factor_m)
-    signal_m_offset_20 = calculate_signal_m(symbols=symbols, target_date=target_date, offset=-20, data=data)
-    signal_w = calculate_signal_w(m_series=factor_m, w_series=factor_w)
-    signal_w_offset_5 = calculate_signal_w(symbols=symbols, target_date=target_date, offset=-5, data=data)
-    signal_d = calculate_signal_d(w_series=factor_w, d_series=factor_d)
-    signal_d_offset_1 = calculate_signal_d(symbols=symbols, target_date=target_date, offset=-1, data=data)
-
-    signal_m1 = calculate_signal_m1(ms_series=signal_m)
-    signal_m2 = calculate_signal_m2(ms_series=signal_m, ms_series_offset_20=signal_m_offset_20)
-    signal_m3 = calculate_signal_m3(c_series=factor_close, c_series_offset_20=factor_close_offset_20)
-    signal_m4 = calculate_signal_m4(m_series=factor_m, m_series_offset_20=factor_m_offset_20)
-
-    signal_w1 = calculate_signal_w1(ws_series=signal_w)
-    signal_w2 = calculate_signal_w2(ws_series=signal_w, ws_series_offset_5=signal_w_offset_5)
-    signal_w3 = calculate_signal_w3(c_series=factor_close, c_series_offset_5=factor_close_offset_5)
-    signal_w4 = calculate_signal_w4(w_series=factor_w, w_series_offset_5=factor_w_offset_5)
-
-    signal_d1 = calculate_signal_d1(ds_series=signal_d)
-    signal_d2 = calculate_signal_d2(ds_series=signal_d, ds_series_offset_1=signal_d_offset_1)
-    signal_d3 = calculate_signal_d3(c_series=factor_close, c_series_offset_1=factor_close_offset_1)
-    signal_d4 = calculate_signal_d4(d_series=factor_d, d_series_offset_1=factor_d_offset_1)
-
-    signal_m2l = calculate_signal_m2l(m2_series=signal_m2, target_date=target_date, data=data)
-    signal_w2l = calculate_signal_w2l(w2_series=signal_w2, target_date=target_date, data=data)
-    signal_d2l = calculate_signal_d2l(d2_series=signal_d2, target_date=target_date, data=data)
-    signal_m4l = calculate_signal_m4l(m4_series=signal_m4, target_date=target_date, data=data)
-    signal_w4l = calculate_signal_w4l(w4_series=signal_w4, target_date=target_date, data=data)
-    signal_d4l = calculate_signal_d4l(d4_series=signal_d4, target_date=target_date, data=data)
-
-    signal_m2b = calculate_signal_m2b(m2_series=signal_m2, m3_series=signal_m3)
-    signal_w2b = calculate_signal_w2b(w2_series=signal_w2, w3_series=signal_w3)
-    signal_d2b = calculate_signal_d2b(d2_series=signal_d2, d3_series=signal_d3)
-    signal_m4b = calculate_signal_m4b(m4_series=signal_m4, m3_series=signal_m3)
-    signal_w4b = calculate_signal_w4b(w4_series=signal_w4, w3_series=signal_w3)
-    signal_d4b = calculate_signal_d4b(d4_series=signal_d4, d3_series=signal_d3)
-    signal_j = calculate_signal_j(m2b_series=signal_m2b, w2b_series=signal_w2b, d2b_series=signal_d2b)
-
-    signal_z = calculate_signal_z(target_date=target_date, data=data)
-    signal_wz = calculate_signal_wz(target_date=target_date, data=data)
-    signal_t = calculate_signal_t(target_date=target_date, data=data)
-    signal_zq = calculate_signal_zq(j_series=signal_j, target_date=target_date, data=data)
-    indicator_dict = OrderedDict([
-        ('Q(n)', factor_q),
-        ('M(n)', factor_m),
-        ('W(n)', factor_w),
-        ('D(n)', factor_d),
-        ('Ms(n)', signal_m),
-        ('Ws(n)', signal_w),
-        ('Ds(n)', signal_d),
-        ('M1(n)', signal_m1),
-        ('M2(n)', signal_m2),
-        ('M3(n)', signal_m3),
-        ('M4(n)', signal_m4),
-        ('W1(n)', signal_w1),
-        ('W2(n)', signal_w2),
-        ('W3(n)', signal_w3),
-        ('W4(n)', signal_w4),
-        ('D1(n)', signal_d1),
-        ('D2(n)', signal_d2),
-        ('D3(n)', signal_d3),
-        ('D4(n)', signal_d4),
-        ('J(n)', signal_j),
-        ('M2L(n)', signal_m2l),
-        ('W2L(n)', signal_w2l),
-        ('D2L(n)', signal_d2l),
-        ('M4L(n)', signal_m4l),
-        ('W4L(n)', signal_w4l),
-        ('D4L(n)', signal_d4l),
-        ('M2B(n)', signal_m2b),
-        ('W2B(n)', signal_w2b),
-        ('D2B(n)', signal_d2b),
-        ('M4B(n)', signal_m4b),
-        ('W4B(n)', signal_w4b),
-        ('D4B(n)', signal_d4b),
-        ('Z(n)', signal_z),
-        ('WZ(n)', signal_wz),
-        ('T(n)', signal_t),
-        ('ZQ(n)', signal_zq)
-    ])
-    frame = pd.DataFrame(list(indicator_dict.values()), index=list(indicator_dict.keys()))
-    frame = frame.reindex(columns=sorted(frame.columns))
-    panel = pd.Panel.from_dict({target_date: frame}).swapaxes(0, 1)
-    return panel
+        return _calculate_with_cache(
+            symbols, [target_date], indicators,
+            lambda target_dates, missing: _load_planned_cube(symbols, target_date, indicators=missing),
+            _calculate_range_cube)
+    return _calculate_range_cube(data, [target_date], indicators)
+
+
+def _calculate_range_cube(data, target_date_range, indicators, processes=1):
+    """
+    Calculate indicators of target dates from loaded data.
+
+    Args:
+        data(dict or AttributeCube): loaded data
+        target_date_range(list): target dates, %Y-%m-%d, ascending
+        indicators(list): list of indicator name
+        processes(int): number of processes calculating blocks of dates over shared memory, serial if 1
+
+    Returns:
+        IndicatorCube: symbol indicators cube, (indicator, date, symbol)
+    """
+    if processes > 1:
+        return calculate_indicator_cube_in_parallel(data, target_date_range, indicators, processes)
+    matrices = calculate_indicator_matrices(data, indicators)
+    cube = IndicatorCube.allocate(list(matrices), target_date_range, sorted(matrices[indicators[0]].columns))
+    for indicator, matrix in matrices.items():
+        cube.fill(indicator, matrix)
+    return cube
 
 
 @output
-def calculate_indicators_of_date_range(symbols=None, target_date_range=None, data=None, **kwargs):
+def calculate_indicators_of_date_range(symbols=None, target_date_range=None, data=None, indicators=None, **kwargs):
     """
     Calculate indicators of a specific symbol in a target date range.
 
     Args:
         symbols(string or list or None): symbol name list
         target_date_range(string): target date, %Y-%m-%d
-        data(dict): cached data from outside
+        data(dict or AttributeCube): cached data from outside
+        indicators(string or list or None): indicators to calculate, all by default; only their dependencies
+            are loaded and evaluated
         **kwargs(**dict): key-word arguments, available as follows
             * dump_excel(boolean): whether to dump excel or not
             * excel_name(string): assign an excel name (as result.xlsx) or 'target_date', 'symbol'
             * dump_mysql(boolean): whether to dump data to mysql database or not
+            * dump_method(string): 'insert' for chunked upserts, 'load_data' for LOAD DATA LOCAL INFILE or 'diff'
+                for upserts of the new and changed cells only
+            * dump_writers(int): number of parallel writer connections of upserts
+            * processes(int): number of processes calculating blocks of dates over shared memory, serial if 1
 
     Returns:
-        pandas.Panel: symbol indicators panel, {indicator: {date: {symbol}}}
+        IndicatorCube: symbol indicators cube, (indicator, date, symbol)
     """
     assert isinstance(kwargs, dict)
     symbols = symbols or load_all_symbols()
     symbols = symbols.split(',') if isinstance(symbols, str) else symbols
+    indicators = _requested_indicators(indicators)
+    target_date_range = sorted(target_date_range)
+    processes = kwargs.get('processes', 1)
     if data is None:
-        target_date_range = sorted(target_date_range)
-        start_date = target_date_range[0]
-        history_trading_days = load_trading_days_with_history_periods(
-            date=start_date, history_periods=MAX_GLOBAL_PERIODS)
-        trading_days = history_trading_days + target_date_range[1:]
-        data = load_attributes_data(symbols, trading_days, attributes=AVAILABLE_DATA_FIELDS)
-
-    results = list()
-    for target_date in target_date_range:
-        results.append(calculate_indicators_of_date_slot(
-                symbols=symbols,
-                target_date=target_date,
-                data=data
-            ))
-    panel = pd.concat(results, axis=1)
-    panel = panel.reindex(major_axis=sorted(panel.major_axis))
-    return panel
+        return _calculate_with_cache(
+            symbols, target_date_range, indicators,
+            lambda target_dates, missing: _load_planned_cube(symbols, target_dates[0], target_dates[1:],
+                                                             indicators=missing),
+            lambda data, target_dates, missing: _calculate_range_cube(data, target_dates, missing,
+                                                                      processes=processes))
+    return _calculate_range_cube(data, target_date_range, indicators, processes=processes)
+
+
+def iterate_indicators_of_date_range(symbols=None, target_date_range=None, indicators=None,
+                                     window_periods=STREAM_WINDOW_PERIODS, **kwargs):
+    """
+    Calculate indicators of a target date range window by window with bounded memory.
+
+    Only the planned lookback of the former window is kept; each window loads its own trading days
+    and slides the attribute window forward.
+
+    Args:
+        symbols(string or list or None): symbol name list
+        target_date_range(list): target dates, %Y-%m-%d
+        indicators(string or list or None): indicators to calculate, all by default
+        window_periods(int): number of trading days of a window, 1 for per date results; target dates
+            which are not trading days are skipped
+        **kwargs(**dict): key-word arguments, available as follows
+            * processes(int): number of processes calculating blocks of dates over shared memory, serial if 1
+
+    Yields:
+        IndicatorCube: symbol indicators cube of the target dates of a window, (indicator, date, symbol)
+    """
+    symbols = symbols or load_all_symbols()
+    symbols = symbols.split(',') if isinstance(symbols, str) else symbols
+    indicators = _requested_indicators(indicators)
+    target_date_range = sorted(target_date_range)
+    lookbacks = plan_lookbacks(indicators)
+    calendar = get_trading_calendar()
+    trading_days = calendar.window(start=target_date_range[0], end=target_date_range[-1])
+    history = None
+    for start in range(0, len(trading_days), window_periods):
+        window_days = trading_days[start:start + window_periods]
+        window_targets = [date for date in target_date_range if window_days[0] <= date <= window_days[-1]]
+        if history is None:
+            data = _load_planned_cube(symbols, window_days[0], window_days[1:], indicators=indicators)
+        else:
+            data = history.append(load_attributes_cube(symbols, window_days, attributes=list(lookbacks)))
+        history = data.tail(max(lookbacks.values()))
+        if window_targets:
+            yield _calculate_range_cube(data, window_targets, indicators, processes=kwargs.get('processes', 1))
 
 
 @output
-def calculate_indicators_of_date_slot_concurrently(symbols=None, target_date=None, data=None, **kwargs):
+def calculate_indicators_of_date_slot_concurrently(symbols=None, target_date=None, data=None, indicators=None,
+                                                   **kwargs):
     """
     Calculate indicators of symbols in a specific target date with concurrent processing.
 
     Args:
         symbols(list): list of symbols
         target_date(string): target date, %Y-%m-%d
-        data(dict): cached data from outside
+        data(dict or AttributeCube): cached data from outside
+        indicators(string or list or None): indicators to calculate, all by default
         **kwargs(**dict): key-word arguments, available as follows
             * dump_excel(boolean): whether to dump excel or not
             * excel_name(string): assign an excel name (as result.xlsx) or 'target_date', 'symbol'
             * dump_mysql(boolean): whether to dump data to mysql database or not
+            * dump_method(string): 'insert' for chunked upserts, 'load_data' for LOAD DATA LOCAL INFILE or 'diff'
+                for upserts of the new and changed cells only
+            * dump_writers(int): number of parallel writer connections of upserts
+            * processes(int): number of processes of the warm worker pool, kept from former calls by default
 
     Returns:
-        pandas.Panel: symbol indicators panel, {indicator: {date: {symbol}}}
+        IndicatorCube: symbol indicators cube, (indicator, date, symbol)
     """
     assert isinstance(kwargs, dict)
     all_symbols = symbols or load_all_symbols()
-    symbols_length = len(all_symbols)
-    symbol_batch = [all_symbols[index:min(index+MAX_SYMBOLS_FRAGMENT, symbols_length)] for index in range(
-        0, symbols_length, MAX_SYMBOLS_FRAGMENT)]
-    args_batch = map(lambda x: [x, target_date, data], symbol_batch)
-    with ProcessPoolExecutor(multiprocessing.cpu_count()) as pool:
-        requests = [pool.submit(calculate_indicators_of_date_slot, *args) for args in args_batch]
-        responses = [data.result() for data in as_completed(requests)]
-    panel = pd.concat(responses, axis=2)
-    panel = panel.reindex(minor_axis=sorted(panel.minor_axis))
-    return panel
+    indicators = _requested_indicators(indicators)
+    if data is None:
+        return _calculate_with_cache(
+            all_symbols, [target_date], indicators,
+            lambda target_dates, missing: _load_planned_cube(all_symbols, target_date, indicators=missing),
+            lambda data, target_dates, missing: calculate_indicator_slot_in_parallel(
+                data, target_date, missing, processes=kwargs.get('processes'), shard_size=MAX_SYMBOLS_FRAGMENT))
+    return calculate_indicator_slot_in_parallel(
+        data, target_date, indicators, processes=kwargs.get('processes'), shard_size=MAX_SYMBOLS_FRAGMENT)
 
 
 __all__ = [
     'calculate_indicators_of_date_slot',
     'calculate_indicators_of_date_range',
+    'iterate_indicators_of_date_range',
     'calculate_indicators_of_date_slot_concurrently',
 ]
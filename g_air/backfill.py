@@ -0,0 +1,226 @@
+"""
+# -*- coding: UTF-8 -*-
+# **********************************************************************************#
+#     File: Checkpointed backfill runner.
+#   Author: Myron
+# **********************************************************************************#
+"""
+import os
+import json
+import hashlib
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from .api import calculate_indicators_of_date_range
+from .data.database_api import (
+    load_all_symbols,
+    load_trading_days
+)
+from .const import BACKFILL_WINDOW_PERIODS
+from .utils.exceptions import Exceptions
+from . import global_configs
+
+
+def job_identity(symbols, indicators=None, window_periods=BACKFILL_WINDOW_PERIODS):
+    """
+    Identity of a backfill job, the windows of a checkpoint are only completed for it.
+
+    Args:
+        symbols(list): symbol name list
+        indicators(list or None): indicators to calculate, None for all
+        window_periods(int): number of dates of a window
+
+    Returns:
+        dict: {'symbols': sorted symbols, 'indicators': sorted indicators or None, 'window_periods': int}
+    """
+    return {'symbols': sorted(set(symbols)),
+            'indicators': sorted(set(indicators)) if indicators else None,
+            'window_periods': window_periods}
+
+
+def default_checkpoint_path(job):
+    """
+    Checkpoint file of a job next to global_configs['backfill']['path'], one file per job identity.
+
+    Args:
+        job(dict): job identity
+
+    Returns:
+        string: checkpoint file path
+    """
+    root, extension = os.path.splitext(global_configs['backfill']['path'])
+    digest = hashlib.sha1(json.dumps(job, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+    return '{}.{}{}'.format(root, digest, extension)
+
+
+class BackfillCheckpoint(object):
+    """
+    Local record of the completed windows of a backfill job, one checkpoint file per job.
+
+    The job identity is stored along with the windows, a checkpoint of another job is refused.
+    """
+
+    def __init__(self, path, job=None):
+        """
+        Args:
+            path(string): checkpoint file path
+            job(dict): job identity, not checked if None
+        """
+        self.path = path
+        self.job = job
+        self.completed = set()
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                checkpoint = json.load(f)
+            if job is not None and checkpoint.get('job') not in (None, job):
+                raise Exceptions.MISMATCHED_CHECKPOINT
+            self.job = self.job or checkpoint.get('job')
+            self.completed = set(checkpoint.get('completed', list()))
+
+    @staticmethod
+    def key(window):
+        """
+        Key of a window of dates.
+
+        Args:
+            window(list): ascending dates, %Y-%m-%d
+
+        Returns:
+            string: key
+        """
+        return '{}~{}'.format(window[0], window[-1])
+
+    def is_completed(self, window):
+        """
+        Whether a window has been completed or not.
+        """
+        return self.key(window) in self.completed
+
+    def mark_completed(self, window):
+        """
+        Record a completed window and persist the checkpoint atomically.
+
+        Args:
+            window(list): ascending dates, %Y-%m-%d
+        """
+        with self._lock:
+            self.completed.add(self.key(window))
+            directory = os.path.dirname(self.path)
+            if directory and not os.path.exists(directory):
+                os.makedirs(directory)
+            temp_path = '{}.tmp'.format(self.path)
+            with open(temp_path, 'w') as f:
+                json.dump({'job': self.job, 'completed': sorted(self.completed)}, f)
+            os.replace(temp_path, self.path)
+
+    def reset(self):
+        """
+        Forget all completed windows.
+        """
+        with self._lock:
+            self.completed = set()
+            if os.path.exists(self.path):
+                os.remove(self.path)
+
+
+def split_windows(target_date_range, window_periods=BACKFILL_WINDOW_PERIODS):
+    """
+    Split target dates into windows of consecutive dates.
+
+    Args:
+        target_date_range(list): target dates, %Y-%m-%d
+        window_periods(int): number of dates of a window
+
+    Returns:
+        list: list of windows
+    """
+    target_date_range = sorted(target_date_range)
+    return [target_date_range[index:index + window_periods]
+            for index in range(0, len(target_date_range), window_periods)]
+
+
+def run_backfill(symbols=None, target_date_range=None, indicators=None, window_periods=BACKFILL_WINDOW_PERIODS,
+                 max_workers=1, checkpoint_path=None, reset=False, **kwargs):
+    """
+    Calculate and dump indicators of a long target date range window by window, skipping the windows
+    completed by former runs of the same checkpoint.
+
+    Args:
+        symbols(string or list or None): symbol name list
+        target_date_range(list): target dates, %Y-%m-%d
+        indicators(string or list or None): indicators to calculate, all by default
+        window_periods(int): number of dates of a window
+        max_workers(int): number of windows in flight concurrently
+        checkpoint_path(string): checkpoint file path, one file per job next to global_configs['backfill']['path']
+            by default
+        reset(boolean): whether to forget the completed windows of the checkpoint before running or not
+        **kwargs(**dict): key-word arguments of calculate_indicators_of_date_range, dump_mysql by default
+
+    Returns:
+        list: windows calculated by this run
+    """
+    symbols = symbols or load_all_symbols()
+    symbols = symbols.split(',') if isinstance(symbols, str) else symbols
+    indicators = indicators.split(',') if isinstance(indicators, str) else indicators
+    job = job_identity(symbols, indicators, window_periods)
+    checkpoint_path = checkpoint_path or default_checkpoint_path(job)
+    if reset:
+        BackfillCheckpoint(checkpoint_path).reset()
+    checkpoint = BackfillCheckpoint(checkpoint_path, job)
+    windows = [window for window in split_windows(target_date_range, window_periods)
+               if not checkpoint.is_completed(window)]
+    kwargs.setdefault('dump_mysql', True)
+
+    def _run(window):
+        calculate_indicators_of_date_range(symbols=symbols, target_date_range=window, indicators=indicators, **kwargs)
+        checkpoint.mark_completed(window)
+        print('Backfill window {} completed.'.format(checkpoint.key(window)))
+        return window
+
+    with ThreadPoolExecutor(max_workers) as pool:
+        requests = [pool.submit(_run, window) for window in windows]
+        try:
+            for request in as_completed(requests):
+                request.result()
+        except Exception:
+            for request in requests:
+                request.cancel()
+            raise
+    return windows
+
+
+def main(arguments=None):
+    """
+    Command line entry: python -m g_air.backfill start end [--window-periods n] [--max-workers n].
+    """
+    parser = argparse.ArgumentParser(description='Checkpointed backfill of indicators.')
+    parser.add_argument('start', help='start date, %%Y-%%m-%%d')
+    parser.add_argument('end', help='end date, %%Y-%%m-%%d')
+    parser.add_argument('--symbols', default=None, help='comma separated symbols, all by default')
+    parser.add_argument('--indicators', default=None, help='comma separated indicators, all by default')
+    parser.add_argument('--window-periods', type=int, default=BACKFILL_WINDOW_PERIODS)
+    parser.add_argument('--max-workers', type=int, default=1)
+    parser.add_argument('--checkpoint', default=None, help='checkpoint file path')
+    parser.add_argument('--reset', action='store_true', help='forget completed windows before running')
+    arguments = parser.parse_args(arguments)
+    run_backfill(symbols=arguments.symbols,
+                 target_date_range=load_trading_days(start=arguments.start, end=arguments.end),
+                 indicators=arguments.indicators,
+                 window_periods=arguments.window_periods,
+                 max_workers=arguments.max_workers,
+                 checkpoint_path=arguments.checkpoint,
+                 reset=arguments.reset)
+
+
+__all__ = [
+    'job_identity',
+    'default_checkpoint_path',
+    'BackfillCheckpoint',
+    'split_windows',
+    'run_backfill'
+]
+
+
+if __name__ == '__main__':
+    main()
@@ -5,13 +5,51 @@
 #   Author: Myron
 # **********************************************************************************#
 """
+from ..core.cube import AttributeCube
 from ..data.database_api import (
+    get_trading_calendar,
     load_trading_days_with_history_periods,
-    load_offset_trading_day,
-    load_attributes_data
+    load_attributes_cube
 )
 
 
+def _locate_target_date(data, attribute, target_date, offset=0):
+    """
+    Locate the position of target date with offset on the date axis of cached data.
+
+    Args:
+        data(dict or AttributeCube): cached data
+        attribute(string): attribute whose date axis is used
+        target_date(string): target date, %Y-%m-%d
+        offset(int): target date offset
+
+    Returns:
+        int: position of the offset target date, clipped to the date axis boundaries
+    """
+    if isinstance(data, AttributeCube):
+        index, length = data.position(target_date), len(data.dates)
+    else:
+        index, length = data[attribute].index.get_loc(target_date), len(data[attribute].index)
+    return min(max(index + offset, 0), length - 1)
+
+
+def _get_row(data, attribute, position):
+    """
+    Get the symbol row of attribute at date position of cached data.
+
+    Args:
+        data(dict or AttributeCube): cached data
+        attribute(string): attribute name
+        position(int): date position
+
+    Returns:
+        Series: attribute series
+    """
+    if isinstance(data, AttributeCube):
+        return data.series(attribute, position)
+    return data[attribute].iloc[position, :]
+
+
 def calculate_factor_q(symbols=None, target_date=None, offset=0, data=None):
     """
     Calculate factor Q(n).
@@ -22,27 +60,24 @@ def calculate_factor_q(symbols=None, target_date=None, offset=0, data=None):
         symbols(list): list of symbols
         target_date(string): target date, %Y-%m-%d
         offset(int): target date offset
-        data(dict): cached data from outside
+        data(dict or AttributeCube): cached data from outside
 
     Returns:
         Series: factor Q(n) series
     """
-    if offset:
-        all_trading_days = list(data['scdq'].index) if data else None
-        target_date = load_offset_trading_day(target_date, offset=offset, all_trading_days=all_trading_days)
     if not data:
+        target_date = get_trading_calendar().offset(target_date, offset=offset)
+        offset = 0
         trading_days = load_trading_days_with_history_periods(date=target_date)
-        data = load_attributes_data(symbols, trading_days, attributes=['scdq', 'tiq', 'cadq', 'scdm'])
-    else:
-        trading_days = list(data['scdq'].index)
-    target_date_index = trading_days.index(target_date)
+        data = load_attributes_cube(symbols, trading_days, attributes=['scdq', 'tiq', 'cadq', 'scdm'])
+    target_date_index = _locate_target_date(data, 'scdq', target_date, offset)
     target_date_offset_20 = target_date_index - 20
     target_date_offset_40 = target_date_index - 40
     q_series = (
-            data['scdq'].iloc[target_date_index, :] + data['tiq'].iloc[target_date_index, :]
-            + data['cadq'].iloc[target_date_index, :] / 2 + (
-                    data['scdm'].iloc[target_date_index, :] + data['scdm'].iloc[target_date_offset_20, :]
-                    + data['scdm'].iloc[target_date_offset_40, :]) / 6)
+            _get_row(data, 'scdq', target_date_index) + _get_row(data, 'tiq', target_date_index)
+            + _get_row(data, 'cadq', target_date_index) / 2 + (
+                    _get_row(data, 'scdm', target_date_index) + _get_row(data, 'scdm', target_date_offset_20)
+                    + _get_row(data, 'scdm', target_date_offset_40)) / 6)
     return q_series
 
 
@@ -56,28 +91,25 @@ def calculate_factor_m(symbols=None, target_date=None, offset=0, data=None):
         symbols(list): list of symbols
         target_date(string): target date, %Y-%m-%d
         offset(int): target date offset
-        data(dict): cached data from outside
+        data(dict or AttributeCube): cached data from outside
 
     Returns:
         Series: factor M(n) series
     """
-    if offset:
-        all_trading_days = list(data['scdm'].index) if data else None
-        target_date = load_offset_trading_day(target_date, offset=offset, all_trading_days=all_trading_days)
     if not data:
+        target_date = get_trading_calendar().offset(target_date, offset=offset)
+        offset = 0
         trading_days = load_trading_days_with_history_periods(date=target_date, history_periods=15)
-        data = load_attributes_data(symbols, trading_days, attributes=['scdm', 'tim', 'cadm', 'scdw'])
-    else:
-        trading_days = list(data['scdm'].index)
-    target_date_index = trading_days.index(target_date)
+        data = load_attributes_cube(symbols, trading_days, attributes=['scdm', 'tim', 'cadm', 'scdw'])
+    target_date_index = _locate_target_date(data, 'scdm', target_date, offset)
     target_date_offset_5 = target_date_index - 5
     target_date_offset_10 = target_date_index - 10
     target_date_offset_15 = target_date_index - 15
     m_series = (
-        data['scdm'].iloc[target_date_index, :] + data['tim'].iloc[target_date_index, :]
-        + data['cadm'].iloc[target_date_index, :] / 2 + (
-                data['scdw'].iloc[target_date_index, :] + data['scdw'].iloc[target_date_offset_5, :]
-                + data['scdw'].iloc[target_date_offset_10, :] + data['scdw'].iloc[target_date_offset_15, :]) / 8
+        _get_row(data, 'scdm', target_date_index) + _get_row(data, 'tim', target_date_index)
+        + _get_row(data, 'cadm', target_date_index) / 2 + (
+                _get_row(data, 'scdw', target_date_index) + _get_row(data, 'scdw', target_date_offset_5)
+                + _get_row(data, 'scdw', target_date_offset_10) + _get_row(data, 'scdw', target_date_offset_15)) / 8
     )
     return m_series
 
@@ -92,30 +124,27 @@ def calculate_factor_w(symbols=None, target_date=None, offset=0, data=None):
         symbols(list): list of symbols
         target_date(string): target date, %Y-%m-%d
         offset(int): target date offset
-        data(dict): cached data from outside
+        data(dict or AttributeCube): cached data from outside
 
     Returns:
         Series: factor W(n) series
     """
-    if offset:
-        all_trading_days = list(data['scdw'].index) if data else None
-        target_date = load_offset_trading_day(target_date, offset=offset, all_trading_days=all_trading_days)
     if not data:
+        target_date = get_trading_calendar().offset(target_date, offset=offset)
+        offset = 0
         trading_days = load_trading_days_with_history_periods(date=target_date, history_periods=4)
-        data = load_attributes_data(symbols, trading_days, attributes=['scdw', 'tiw', 'cadw', 'scdd'])
-    else:
-        trading_days = list(data['scdw'].index)
-    target_date_index = trading_days.index(target_date)
+        data = load_attributes_cube(symbols, trading_days, attributes=['scdw', 'tiw', 'cadw', 'scdd'])
+    target_date_index = _locate_target_date(data, 'scdw', target_date, offset)
     target_date_offset_1 = target_date_index - 1
     target_date_offset_2 = target_date_index - 2
     target_date_offset_3 = target_date_index - 3
     target_date_offset_4 = target_date_index - 4
     w_series = (
-        data['scdw'].iloc[target_date_index, :] + data['tiw'].iloc[target_date_index, :]
-        + data['cadw'].iloc[target_date_index, :] / 2 + (
-                data['scdd'].iloc[target_date_index, :] + data['scdd'].iloc[target_date_offset_1, :]
-                + data['scdd'].iloc[target_date_offset_2, :] + data['scdd'].iloc[target_date_offset_3, :]
-                + data['scdd'].iloc[target_date_offset_4, :]) / 10
+        _get_row(data, 'scdw', target_date_index) + _get_row(data, 'tiw', target_date_index)
+        + _get_row(data, 'cadw', target_date_index) / 2 + (
+                _get_row(data, 'scdd', target_date_index) + _get_row(data, 'scdd', target_date_offset_1)
+                + _get_row(data, 'scdd', target_date_offset_2) + _get_row(data, 'scdd', target_date_offset_3)
+                + _get_row(data, 'scdd', target_date_offset_4)) / 10
     )
     return w_series
 
@@ -130,26 +159,23 @@ def calculate_factor_d(symbols=None, target_date=None, offset=0, data=None):
         symbols(list): list of symbols
         target_date(string): target date, %Y-%m-%d
         offset(int): target date offset
-        data(dict): cached data from outside
+        data(dict or AttributeCube): cached data from outside
 
     Returns:
         Series: factor D(n) series
     """
-    if offset:
-        all_trading_days = list(data['scdd'].index) if data else None
-        target_date = load_offset_trading_day(target_date, offset=offset, all_trading_days=all_trading_days)
     if not data:
+        target_date = get_trading_calendar().offset(target_date, offset=offset)
+        offset = 0
         trading_days = load_trading_days_with_history_periods(date=target_date, history_periods=0)
-        data = load_attributes_data(
+        data = load_attributes_cube(
             symbols, trading_days, attributes=['scdd', 'tid', 'cadd', 'scdh1', 'scdh2', 'scdh3', 'scdh4'])
-    else:
-        trading_days = list(data['scdd'].index)
-    target_date_index = trading_days.index(target_date)
+    target_date_index = _locate_target_date(data, 'scdd', target_date, offset)
     d_series = (
-        data['scdd'].iloc[target_date_index, :] + data['tid'].iloc[target_date_index, :]
-        + data['cadd'].iloc[target_date_index, :] / 2 + (
-                data['scdh1'].iloc[target_date_index, :] + data['scdh2'].iloc[target_date_index, :]
-                + data['scdh3'].iloc[target_date_index, :] + data['scdh4'].iloc[target_date_index, :]) / 8
+        _get_row(data, 'scdd', target_date_index) + _get_row(data, 'tid', target_date_index)
+        + _get_row(data, 'cadd', target_date_index) / 2 + (
+                _get_row(data, 'scdh1', target_date_index) + _get_row(data, 'scdh2', target_date_index)
+                + _get_row(data, 'scdh3', target_date_index) + _get_row(data, 'scdh4', target_date_index)) / 8
     )
     return d_series
 
@@ -162,21 +188,18 @@ def get_close_price_series(symbols=None, target_date=None, offset=0, data=None):
         symbols(list): list of symbols
         target_date(string): target date, %Y-%m-%d
         offset(int): target date offset
-        data(dict): cached data from outside
+        data(dict or AttributeCube): cached data from outside
 
     Returns:
         Series: close price series
     """
-    if offset:
-        all_trading_days = list(data['adj_close_price'].index) if data else None
-        target_date = load_offset_trading_day(target_date, offset=offset, all_trading_days=all_trading_days)
     if not data:
+        target_date = get_trading_calendar().offset(target_date, offset=offset)
+        offset = 0
         trading_days = load_trading_days_with_history_periods(date=target_date, history_periods=0)
-        data = load_attributes_data(symbols, trading_days, attributes=['adj_close_price'])
-    else:
-        trading_days = list(data['adj_close_price'].index)
-    target_date_index = trading_days.index(target_date)
-    c_series = data['adj_close_price'].iloc[target_date_index, :]
+        data = load_attributes_cube(symbols, trading_days, attributes=['adj_close_price'])
+    target_date_index = _locate_target_date(data, 'adj_close_price', target_date, offset)
+    c_series = _get_row(data, 'adj_close_price', target_date_index)
     return c_series
 
 
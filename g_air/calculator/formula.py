@@ -0,0 +1,425 @@
+"""
+# -*- coding: UTF-8 -*-
+# **********************************************************************************#
+#     File: Indicator formula language file.
+#   Author: Myron
+# **********************************************************************************#
+"""
+import ast
+import hashlib
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from .graders import SIGNAL_GRADER
+from .kernels import (
+    rolling_sum,
+    shift_rows
+)
+from ..core.cube import AttributeCube
+from ..const import (
+    AVAILABLE_DATA_FIELDS,
+    INDICATOR_FIELDS
+)
+
+
+# One definition per line, NAME = expression. Upper case attribute names read attributes, names defined
+# on previous lines read indicators, X[-k] reads X k dates before, and the functions are sign(X),
+# grade(X) of SIGNAL_GRADER and lsum(X, window), the sum of X over the latest window dates.
+INDICATOR_FORMULAS = """
+Q = SCDQ + TIQ + CADQ / 2 + (SCDM + SCDM[-20] + SCDM[-40]) / 6
+M = SCDM + TIM + CADM / 2 + (SCDW + SCDW[-5] + SCDW[-10] + SCDW[-15]) / 8
+W = SCDW + TIW + CADW / 2 + (SCDD + SCDD[-1] + SCDD[-2] + SCDD[-3] + SCDD[-4]) / 10
+D = SCDD + TID + CADD / 2 + (SCDH1 + SCDH2 + SCDH3 + SCDH4) / 8
+Close = ADJ_CLOSE_PRICE
+Ms = Q + M
+Ws = M + W
+Ds = W + D
+M1 = grade(Ms)
+M2 = sign(Ms - Ms[-20])
+M3 = sign(Close - Close[-20])
+M4 = sign(M - M[-20])
+W1 = grade(Ws)
+W2 = sign(Ws - Ws[-5])
+W3 = sign(Close - Close[-5])
+W4 = sign(W - W[-5])
+D1 = grade(Ds)
+D2 = sign(Ds - Ds[-1])
+D3 = sign(Close - Close[-1])
+D4 = sign(D - D[-1])
+M2B = M2 * (M2 != M3) + 0
+W2B = W2 * (W2 != W3) + 0
+D2B = D2 * (D2 != D3) + 0
+M4B = M4 * (M4 != M3) + 0
+W4B = W4 * (W4 != W3) + 0
+D4B = D4 * (D4 != D3) + 0
+J = 0.25 * M2B + 0.5 * W2B + D2B
+M2L = lsum(M2, 5)
+W2L = lsum(W2, 5)
+D2L = lsum(D2, 5)
+M4L = lsum(M4, 5)
+W4L = lsum(W4, 5)
+D4L = lsum(D4, 5)
+Z1 = M2 * ((M2 < 0) & (M3 == 1)) + 0
+Z = lsum(Z1, 5)
+WZ1 = W2 * ((W2 < 0) & (W3 == 1)) + 0
+WZ = lsum(WZ1, 5)
+T1 = M2 * ((M2 > 0) & (M3 == -1)) + 0
+T = lsum(T1, 5)
+ZQ = lsum(J, 5)
+"""
+
+_BINARY_OPERATORS = {ast.Add: '+', ast.Sub: '-', ast.Mult: '*', ast.Div: '/', ast.BitAnd: '&', ast.BitOr: '|'}
+_COMPARE_OPERATORS = {ast.Eq: '==', ast.NotEq: '!=', ast.Lt: '<', ast.LtE: '<=', ast.Gt: '>', ast.GtE: '>='}
+_FUNCTIONS = {'sign': 1, 'grade': 1, 'lsum': 2}
+_UFUNCS = {'+': 'add', '-': 'subtract', '*': 'multiply', '/': 'true_divide'}
+
+
+class FormulaError(Exception):
+    """
+    Invalid indicator formula.
+    """
+    pass
+
+
+class FormulaSet(object):
+    """
+    Indicator formulas parsed into one expression graph, with common subexpressions shared by every
+    indicator, and compiled into a single straight-line numpy program over the attribute cube.
+    """
+
+    def __init__(self, text=INDICATOR_FORMULAS):
+        """
+        Args:
+            text(string): formula definitions, one NAME = expression per line
+        """
+        self.nodes = list()
+        self.node_index = dict()
+        self.indicators = OrderedDict()
+        for line in text.strip().splitlines():
+            line = line.split('#')[0].strip()
+            if line:
+                self._define(line)
+
+    @staticmethod
+    def output_name(name):
+        """
+        Output indicator name of a formula name, Q --> Q(n).
+        """
+        return '{}(n)'.format(name)
+
+    def _node(self, *key):
+        """
+        Get the node id of a key, adding the node when it is new.
+        """
+        if key not in self.node_index:
+            self.node_index[key] = len(self.nodes)
+            self.nodes.append(key)
+        return self.node_index[key]
+
+    def _define(self, line):
+        """
+        Parse a NAME = expression line into the graph.
+        """
+        try:
+            statement = ast.parse(line, mode='exec').body[0]
+        except SyntaxError as error:
+            raise FormulaError('Invalid formula {!r}: {}'.format(line, error))
+        if not isinstance(statement, ast.Assign) or len(statement.targets) != 1 or \
+                not isinstance(statement.targets[0], ast.Name):
+            raise FormulaError('Formula {!r} is not a NAME = expression definition.'.format(line))
+        name = statement.targets[0].id
+        if name in self.indicators:
+            raise FormulaError('Indicator {} is defined twice.'.format(name))
+        self.indicators[name] = self._parse(statement.value, line)
+
+    def _lag(self, node, lag):
+        """
+        Node of node lagged by lag dates, merging nested lags.
+        """
+        if lag == 0:
+            return node
+        key = self.nodes[node]
+        if key[0] == 'lag':
+            return self._lag(key[1], key[2] + lag)
+        if key[0] == 'const':
+            return node
+        return self._node('lag', node, lag)
+
+    def _parse(self, expression, line):
+        """
+        Parse an expression into a node id.
+        """
+        if isinstance(expression, ast.Constant) and isinstance(expression.value, (int, float)) and \
+                not isinstance(expression.value, bool):
+            return self._node('const', expression.value)
+        if isinstance(expression, ast.Name):
+            if expression.id in self.indicators:
+                return self.indicators[expression.id]
+            attribute = expression.id.lower()
+            if expression.id.isupper() and attribute in AVAILABLE_DATA_FIELDS:
+                return self._node('attribute', attribute)
+            raise FormulaError('Unknown name {} in formula {!r}.'.format(expression.id, line))
+        if isinstance(expression, ast.UnaryOp) and isinstance(expression.op, ast.USub):
+            operand = self._parse(expression.operand, line)
+            if self.nodes[operand][0] == 'const':
+                return self._node('const', -self.nodes[operand][1])
+            return self._node('negative', operand)
+        if isinstance(expression, ast.BinOp) and type(expression.op) in _BINARY_OPERATORS:
+            return self._node('binary', _BINARY_OPERATORS[type(expression.op)],
+                              self._parse(expression.left, line), self._parse(expression.right, line))
+        if isinstance(expression, ast.Compare) and len(expression.ops) == 1 and \
+                type(expression.ops[0]) in _COMPARE_OPERATORS:
+            return self._node('binary', _COMPARE_OPERATORS[type(expression.ops[0])],
+                              self._parse(expression.left, line), self._parse(expression.comparators[0], line))
+        if isinstance(expression, ast.Subscript):
+            lag = self._parse(expression.slice, line)
+            if self.nodes[lag][0] != 'const' or self.nodes[lag][1] > 0 or self.nodes[lag][1] != int(
+                    self.nodes[lag][1]):
+                raise FormulaError('Lags must be non-positive integers in formula {!r}.'.format(line))
+            return self._lag(self._parse(expression.value, line), -int(self.nodes[lag][1]))
+        if isinstance(expression, ast.Call) and isinstance(expression.func, ast.Name) and \
+                _FUNCTIONS.get(expression.func.id) == len(expression.args) and not expression.keywords:
+            arguments = [self._parse(argument, line) for argument in expression.args]
+            if expression.func.id == 'lsum':
+                if self.nodes[arguments[1]][0] != 'const' or self.nodes[arguments[1]][1] < 1:
+                    raise FormulaError('lsum window must be a positive integer in formula {!r}.'.format(line))
+                return self._node('lsum', arguments[0], int(self.nodes[arguments[1]][1]))
+            return self._node(expression.func.id, *arguments)
+        raise FormulaError('Unsupported expression {!r} in formula {!r}.'.format(ast.dump(expression), line))
+
+    def dependencies(self, indicators=None):
+        """
+        Node ids needed by indicators, in evaluation order.
+
+        Args:
+            indicators(list): list of formula name, all by default
+
+        Returns:
+            list: sorted node ids
+        """
+        needed = set()
+        stack = [self.indicators[name] for name in (indicators or list(self.indicators))]
+        while stack:
+            node = stack.pop()
+            if node not in needed:
+                needed.add(node)
+                stack.extend(self.inputs(node))
+        return sorted(needed)
+
+    def _kind(self, node):
+        """
+        Value kind of a node: 'const', 'bool', 'int' or 'float' array.
+        """
+        key = self.nodes[node]
+        if key[0] == 'const':
+            return 'const'
+        if key[0] == 'binary':
+            if key[1] not in _UFUNCS:
+                return 'bool'
+            kinds = {self._kind(key[2]), self._kind(key[3])}
+            return 'float' if 'float' in kinds or key[1] == '/' else 'int'
+        if key[0] == 'grade':
+            return 'int'
+        if key[0] in ('negative', 'sign'):
+            return self._kind(key[1])
+        return 'float'
+
+    def inputs(self, node):
+        """
+        Node ids read by a node.
+        """
+        key = self.nodes[node]
+        if key[0] == 'binary':
+            return list(key[2:])
+        if key[0] in ('negative', 'lag', 'lsum', 'sign', 'grade'):
+            return [key[1]]
+        return list()
+
+    def expression(self, node):
+        """
+        Canonical expression of a node, the same for every formula text defining the same computation.
+        """
+        key = self.nodes[node]
+        if key[0] in ('const', 'attribute'):
+            return repr(key[1])
+        if key[0] == 'binary':
+            return '({} {} {})'.format(self.expression(key[2]), key[1], self.expression(key[3]))
+        if key[0] in ('lag', 'lsum'):
+            return '{}({}, {})'.format(key[0], self.expression(key[1]), key[2])
+        return '{}({})'.format(key[0], self.expression(key[1]))
+
+    def version(self, name):
+        """
+        Version hash of an indicator, changed whenever its expression or the grader it reads changes.
+
+        Args:
+            name(string): formula name, as Q
+
+        Returns:
+            string: hex digest
+        """
+        text = self.expression(self.indicators[name])
+        if 'grade(' in text:
+            text += repr((SIGNAL_GRADER.edges.tolist(), SIGNAL_GRADER.scores.tolist(),
+                          SIGNAL_GRADER.side, SIGNAL_GRADER.default))
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+    def _statement(self, node, free):
+        """
+        Python source of a node assignment.
+
+        Float temporaries in free are read for the last time here, so the node may be written into
+        one of them instead of allocating a new array.
+        """
+        key = self.nodes[node]
+        kind = key[0]
+        reuse = [operand for operand in self.inputs(node) if operand in free] \
+            if self._kind(node) == 'float' and kind in ('binary', 'negative', 'sign') else list()
+        if kind == 'attribute':
+            expression = 'cube.view({!r})'.format(key[1])
+        elif kind == 'binary' and reuse and key[1] in _UFUNCS:
+            expression = 'np.{}({}, {}, out=v{})'.format(
+                _UFUNCS[key[1]], self._operand(key[2]), self._operand(key[3]), reuse[0])
+        elif kind == 'binary':
+            expression = '{} {} {}'.format(self._operand(key[2]), key[1], self._operand(key[3]))
+        elif kind in ('negative', 'sign') and reuse:
+            expression = 'np.{}(v{}, out=v{})'.format(kind, key[1], key[1])
+        elif kind == 'negative':
+            expression = '-{}'.format(self._operand(key[1]))
+        elif kind == 'lag':
+            expression = 'shift_rows({}, {})'.format(self._operand(key[1]), key[2])
+        elif kind == 'lsum':
+            expression = 'rolling_sum({}, {})'.format(self._operand(key[1]), key[2])
+        elif kind == 'sign':
+            expression = 'np.sign({})'.format(self._operand(key[1]))
+        else:
+            expression = 'grade({})'.format(self._operand(key[1]))
+        return '    v{} = {}'.format(node, expression)
+
+    def _operand(self, node):
+        """
+        Python source of a node used as an operand.
+        """
+        key = self.nodes[node]
+        return repr(key[1]) if key[0] == 'const' else 'v{}'.format(node)
+
+    def compile(self, indicators=None):
+        """
+        Compile indicators into one function of the cube.
+
+        Args:
+            indicators(list): list of formula name, all by default
+
+        Returns:
+            CompiledFormulas: compiled program
+        """
+        indicators = list(indicators or self.indicators)
+        for name in indicators:
+            if name not in self.indicators:
+                raise FormulaError('Unknown indicator {}.'.format(name))
+        nodes = [node for node in self.dependencies(indicators) if self.nodes[node][0] != 'const']
+        outputs = set(self.indicators[name] for name in indicators)
+        last_use = dict()
+        for node in nodes:
+            for operand in self.inputs(node):
+                last_use[operand] = node
+        lines = ['def program(cube):']
+        for node in nodes:
+            free = set(operand for operand in self.inputs(node) if last_use.get(operand) == node and
+                       operand not in outputs and self._kind(operand) == 'float' and
+                       self.nodes[operand][0] in ('binary', 'negative', 'sign'))
+            lines.append(self._statement(node, free))
+        lines.append('    return [{}]'.format(', '.join(self._operand(self.indicators[name]) for name in indicators)))
+        source = '\n'.join(lines)
+        namespace = {'np': np, 'shift_rows': shift_rows, 'rolling_sum': rolling_sum,
+                     'grade': SIGNAL_GRADER.grade_array}
+        exec(compile(source, '<indicator formulas>', 'exec'), namespace)
+        return CompiledFormulas([self.output_name(name) for name in indicators], namespace['program'], source)
+
+
+class CompiledFormulas(object):
+    """
+    Indicator formulas compiled into a straight-line program of (date, symbol) array operations.
+    """
+
+    def __init__(self, indicators, program, source):
+        """
+        Args:
+            indicators(list): list of output indicator name
+            program(function): program(cube) returning the list of indicator arrays
+            source(string): python source of program
+        """
+        self.indicators = indicators
+        self.program = program
+        self.source = source
+
+    def evaluate(self, data):
+        """
+        Evaluate indicators on every date of cached data, dates without enough history are NaN.
+
+        Args:
+            data(dict or AttributeCube): cached data
+
+        Returns:
+            OrderedDict: {indicator: DataFrame of (date, symbol)}
+        """
+        cube = AttributeCube.from_frames(data)
+        shape = (len(cube.dates), len(cube.symbols))
+        result = OrderedDict()
+        for indicator, values in zip(self.indicators, self.program(cube)):
+            values = np.asarray(values, dtype=np.float64)
+            if values.shape != shape:
+                values = np.full(shape, values)
+            elif not values.flags.owndata:
+                values = values.copy()
+            result[indicator] = pd.DataFrame(values, index=cube.date_index, columns=cube.symbol_index)
+        return result
+
+
+_compiled_formulas = dict()
+
+
+_formula_versions = dict()
+
+
+def formula_versions(indicators=None):
+    """
+    Version hashes of indicators of INDICATOR_FORMULAS.
+
+    Args:
+        indicators(list): list of output indicator name, INDICATOR_FIELDS by default
+
+    Returns:
+        OrderedDict: {indicator: hex digest}
+    """
+    if not _formula_versions:
+        formulas = FormulaSet()
+        _formula_versions.update((formulas.output_name(name), formulas.version(name)) for name in formulas.indicators)
+    return OrderedDict((indicator, _formula_versions[indicator]) for indicator in indicators or INDICATOR_FIELDS)
+
+
+def calculate_indicator_matrices(data, indicators=None):
+    """
+    Calculate indicator matrices of every date with the compiled INDICATOR_FORMULAS.
+
+    Args:
+        data(dict or AttributeCube): cached data
+        indicators(list): list of output indicator name, INDICATOR_FIELDS by default
+
+    Returns:
+        OrderedDict: {indicator: DataFrame of (date, symbol)}
+    """
+    indicators = tuple(indicators or INDICATOR_FIELDS)
+    if indicators not in _compiled_formulas:
+        _compiled_formulas[indicators] = FormulaSet().compile([indicator[:-len('(n)')] for indicator in indicators])
+    return _compiled_formulas[indicators].evaluate(data)
+
+
+__all__ = [
+    'INDICATOR_FORMULAS',
+    'FormulaError',
+    'FormulaSet',
+    'CompiledFormulas',
+    'formula_versions',
+    'calculate_indicator_matrices'
+]
@@ -0,0 +1,76 @@
+"""
+# -*- coding: UTF-8 -*-
+# **********************************************************************************#
+#     File: Table driven graders file.
+#   Author: Myron
+# **********************************************************************************#
+"""
+import numpy as np
+import pandas as pd
+
+
+class Grader(object):
+    """
+    Grade values by a bin-edge/score table, evaluated on whole arrays at once.
+
+    With right closed bins, score[0] is for value <= edges[0], score[i] for edges[i-1] < value <= edges[i]
+    and score[-1] for value > edges[-1]; left closed bins swap the open and closed edges. NaN gets the
+    default score.
+    """
+
+    def __init__(self, edges, scores, right=True, default=0):
+        """
+        Args:
+            edges(list): ascending bin edges
+            scores(list): scores of the len(edges) + 1 bins
+            right(boolean): whether bins are closed on the right edge or on the left edge
+            default(int): score of NaN
+        """
+        assert len(scores) == len(edges) + 1, 'A grader needs one more score than edges.'
+        assert all(np.diff(edges) > 0), 'Grader edges must be strictly ascending.'
+        self.edges = np.asarray(edges, dtype=np.float64)
+        self.scores = np.asarray(scores)
+        self.side = 'left' if right else 'right'
+        self.default = default
+
+    def grade_array(self, values):
+        """
+        Grade an array.
+
+        Args:
+            values(numpy.ndarray): values of any shape
+
+        Returns:
+            numpy.ndarray: scores of the same shape
+        """
+        values = np.asarray(values, dtype=np.float64)
+        scores = self.scores[np.searchsorted(self.edges, values, side=self.side)]
+        return np.where(np.isnan(values), self.default, scores)
+
+    def grade(self, values):
+        """
+        Grade a Series, a DataFrame of (date, symbol) or an array.
+
+        Args:
+            values(Series or DataFrame or numpy.ndarray): values
+
+        Returns:
+            Series or DataFrame or numpy.ndarray: scores with the labels of values
+        """
+        if isinstance(values, pd.Series):
+            return pd.Series(self.grade_array(values.values), index=values.index, name=values.name)
+        if isinstance(values, pd.DataFrame):
+            return pd.DataFrame(self.grade_array(values.values), index=values.index, columns=values.columns)
+        return self.grade_array(values)
+
+
+# Ms(n) > 5 --> -3;   4 < Ms(n) <= 5 --> -2;   3 < Ms(n) <= 4 --> -1;
+# Ms(n) <= -9 --> 5;   -9 < Ms(n) <= -8 --> 4;  -8 < Ms(n) <= -7 --> 3;
+# -7 < Ms(n) <= -6 --> 2;  -6 < Ms(n) <= -5 --> 1;  else: 0
+SIGNAL_GRADER = Grader(edges=[-9, -8, -7, -6, -5, 3, 4, 5], scores=[5, 4, 3, 2, 1, 0, -1, -2, -3])
+
+
+__all__ = [
+    'Grader',
+    'SIGNAL_GRADER'
+]
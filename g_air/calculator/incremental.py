@@ -0,0 +1,149 @@
+"""
+# -*- coding: UTF-8 -*-
+# **********************************************************************************#
+#     File: Incremental end-of-day update file.
+#   Author: Myron
+# **********************************************************************************#
+"""
+import os
+import pickle
+import pandas as pd
+from collections import OrderedDict
+from .formula import calculate_indicator_matrices
+from .planner import plan_lookbacks
+from ..core.cube import AttributeCube
+from ..const import INDICATOR_FIELDS
+
+
+class IncrementalState(object):
+    """
+    Minimal rolling state of the indicators, advanced by one date of source rows at a time.
+
+    The state keeps the latest rows of every attribute the compiled formulas read at a lag, as the planned
+    lookback of each attribute, so that the formulas of a new date are evaluated on the state and the rows
+    of that date only. A state only holds for the symbols it was built for.
+    """
+
+    def __init__(self, date, history, indicators=None, symbols=None):
+        """
+        Args:
+            date(string): latest date of the state, %Y-%m-%d
+            history(dict): {attribute: DataFrame of (date, symbol)} latest rows
+            indicators(list): list of indicator name evaluated by the state
+            symbols(list): list of symbols the state was built for, None if unknown
+        """
+        self.date = date
+        self.history = history
+        self.indicators = list(indicators or INDICATOR_FIELDS)
+        self.symbols = sorted(set(symbols)) if symbols is not None else None
+        self.requirements = plan_lookbacks(self.indicators)
+
+    @property
+    def attributes(self):
+        """
+        Attributes needed from the source for each date.
+        """
+        return list(self.requirements)
+
+    def matches(self, symbols):
+        """
+        Whether the state was built for exactly these symbols or not.
+
+        Args:
+            symbols(list): list of symbols
+
+        Returns:
+            boolean: matched or not
+        """
+        return self.symbols is not None and self.symbols == sorted(set(symbols))
+
+    def _advance(self, frames):
+        """
+        Evaluate indicators on the last date of attribute frames and keep the planned lookback of each attribute.
+
+        Args:
+            frames(dict): {attribute: DataFrame of (date, symbol)}, all on the same dates
+
+        Returns:
+            OrderedDict: {indicator: Series} of the last date
+        """
+        matrices = calculate_indicator_matrices(AttributeCube.from_frames(frames), self.indicators)
+        self.history = {attribute: frames[attribute].iloc[max(len(frames[attribute].index) - rows, 0):]
+                        if rows else frames[attribute].iloc[:0] for attribute, rows in self.requirements.items()}
+        self.date = frames[self.attributes[0]].index[-1]
+        return OrderedDict((indicator, matrix.iloc[-1]) for indicator, matrix in matrices.items())
+
+    @classmethod
+    def from_data(cls, data, indicators=None, symbols=None):
+        """
+        Build the state from a window of cached data.
+
+        Args:
+            data(dict or AttributeCube): cached data, its last date is the date of the state
+            indicators(list): list of indicator name, INDICATOR_FIELDS by default
+            symbols(list): list of symbols the data was loaded for
+
+        Returns:
+            tuple: (IncrementalState, OrderedDict of {indicator: Series} of the last date)
+        """
+        state = cls(None, dict(), indicators, symbols)
+        latest = state._advance({attribute: data[attribute] for attribute in state.attributes})
+        return state, latest
+
+    @classmethod
+    def load(cls, path):
+        """
+        Load a persisted state.
+
+        Args:
+            path(string): state file path
+
+        Returns:
+            IncrementalState or None: state, None if it was never saved or holds other rows than planned
+        """
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            state = pickle.load(f)
+        state = cls(state['date'], state['history'], state['indicators'], state.get('symbols'))
+        return state if set(state.history) == set(state.attributes) else None
+
+    def save(self, path):
+        """
+        Persist the state atomically.
+
+        Args:
+            path(string): state file path
+        """
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        temp_path = '{}.tmp'.format(path)
+        with open(temp_path, 'wb') as f:
+            pickle.dump({'date': self.date, 'history': self.history, 'indicators': self.indicators,
+                         'symbols': self.symbols}, f)
+        os.replace(temp_path, path)
+
+    def update(self, date, data):
+        """
+        Evaluate the indicators of a new date and advance the state to it.
+
+        Args:
+            date(string): new date, the next trading date of the state, %Y-%m-%d
+            data(dict or AttributeCube): cached data holding the rows of date
+
+        Returns:
+            OrderedDict: {indicator: Series}
+        """
+        assert date > self.date, 'Incremental state of {} can not be updated to {}.'.format(self.date, date)
+        symbols = sorted(set().union(*[set(data[attribute].columns) for attribute in self.attributes] + [
+            set(frame.columns) for frame in self.history.values()]))
+        dates = sorted(set().union(*[set(frame.index) for frame in self.history.values()])) + [date]
+        frames = {attribute: pd.concat([self.history[attribute], data[attribute].loc[[date]]]).reindex(
+            index=dates, columns=symbols) for attribute in self.attributes}
+        return self._advance(frames)
+
+
+__all__ = [
+    'IncrementalState'
+]
@@ -0,0 +1,57 @@
+"""
+# -*- coding: UTF-8 -*-
+# **********************************************************************************#
+#     File: array kernels file.
+#   Author: Myron
+# **********************************************************************************#
+"""
+import numpy as np
+
+
+def shift_rows(values, lag):
+    """
+    Shift values down by lag rows along the date axis.
+
+    Args:
+        values(numpy.ndarray): array of shape (date, ...)
+        lag(int): non-negative lag
+
+    Returns:
+        numpy.ndarray: shifted array of the same shape
+    """
+    if lag == 0:
+        return values
+    shifted = np.empty(values.shape, dtype=np.float64)
+    length = len(values)
+    if lag < length:
+        shifted[lag:] = values[:length - lag]
+    if length:
+        shifted[:min(lag, length)] = np.nan
+    return shifted
+
+
+def rolling_sum(values, window):
+    """
+    Sliding window sum along the date axis, value(n) + value(n-1) + ... + value(n-window+1).
+
+    The window is accumulated from the latest row backwards, in the same order as the per-date sums,
+    with one pass over the array per window row.
+
+    Args:
+        values(numpy.ndarray): array of shape (date, ...)
+        window(int): window length
+
+    Returns:
+        numpy.ndarray: array of the same shape
+    """
+    assert window >= 1, 'Rolling window length must be positive.'
+    result = np.asarray(values, dtype=np.float64)
+    for lag in range(1, window):
+        result = result + shift_rows(values, lag)
+    return result
+
+
+__all__ = [
+    'shift_rows',
+    'rolling_sum'
+]
@@ -0,0 +1,258 @@
+"""
+# -*- coding: UTF-8 -*-
+# **********************************************************************************#
+#     File: Parallel calculation file.
+#   Author: Myron
+# **********************************************************************************#
+"""
+import traceback
+import multiprocessing
+import numpy as np
+from functools import wraps
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from .formula import calculate_indicator_matrices
+from .planner import plan_lookbacks
+from ..core.cube import AttributeCube, IndicatorCube
+from ..core.shared import SharedArray
+from ..data.database_api import get_trading_calendar
+from ..const import INDICATOR_FIELDS, MAX_SYMBOLS_FRAGMENT
+
+
+def _initialize_worker(trading_days):
+    """
+    Warm up a worker process: seed the trading calendar so that workers never query it themselves.
+
+    Args:
+        trading_days(list or None): trading days loaded by the parent process
+    """
+    if trading_days:
+        get_trading_calendar().refresh(trading_days)
+
+
+def _attached_task(function):
+    """
+    Run a task on the shared arrays of its (input_spec, output_spec), attached for the task only, so that
+    idle workers never keep the buffers of former calls mapped.
+    """
+    @wraps(function)
+    def _decorator(input_spec, output_spec, *args):
+        shared = [SharedArray.attach(name, shape) for name, shape in (input_spec, output_spec)]
+        try:
+            return function(shared[0].array, shared[1].array, *args)
+        except Exception as error:
+            # views of the arrays in the frames of a failed task would keep the buffers exported
+            traceback.clear_frames(error.__traceback__)
+            raise
+        finally:
+            for item in shared:
+                item.close()
+    return _decorator
+
+
+@_attached_task
+def _calculate_block(inputs, outputs, axes, indicators, lookback, target_positions, date_positions):
+    """
+    Calculate a block of consecutive target dates and write them into the shared output buffer.
+
+    Args:
+        inputs(numpy.ndarray): shared (attribute, date, symbol) input, attached from its (name, shape)
+        outputs(numpy.ndarray): shared (indicator, target date, symbol) output, attached from its (name, shape)
+        axes(tuple): (attributes, dates, symbols) of the input
+        indicators(list): list of indicator name
+        lookback(int): history periods before a target date the indicators need
+        target_positions(list): positions of target dates in the output buffer
+        date_positions(list): positions of target dates in the input cube, ascending
+
+    Returns:
+        int: number of dates calculated
+    """
+    attributes, dates, symbols = axes
+    start, stop = max(date_positions[0] - lookback, 0), date_positions[-1] + 1
+    window = AttributeCube(inputs[:, start:stop], attributes, dates[start:stop], symbols)
+    matrices = calculate_indicator_matrices(window, indicators)
+    rows = np.asarray(date_positions) - start
+    for index, matrix in enumerate(matrices.values()):
+        outputs[index, target_positions] = matrix.values[rows]
+    return len(date_positions)
+
+
+@_attached_task
+def _calculate_shard(inputs, outputs, axes, indicators, lookback, date_position, start, stop):
+    """
+    Calculate indicators of a shard of symbols at target date and write them into the shared output buffer.
+
+    Args:
+        inputs(numpy.ndarray): shared (attribute, date, symbol) input, attached from its (name, shape)
+        outputs(numpy.ndarray): shared (indicator, 1, symbol) output, attached from its (name, shape)
+        axes(tuple): (attributes, dates, symbols) of the input
+        indicators(list): list of indicator name
+        lookback(int): history periods before target date the indicators need
+        date_position(int): position of target date in the input cube
+        start(int): first symbol position of shard
+        stop(int): symbol position after shard
+
+    Returns:
+        int: number of symbols calculated
+    """
+    attributes, dates, symbols = axes
+    first = max(date_position - lookback, 0)
+    window = AttributeCube(inputs[:, first:date_position + 1, start:stop], attributes,
+                           dates[first:date_position + 1], symbols[start:stop])
+    matrices = calculate_indicator_matrices(window, indicators)
+    for index, matrix in enumerate(matrices.values()):
+        outputs[index, 0, start:stop] = matrix.values[-1]
+    return stop - start
+
+
+class WorkerPool(object):
+    """
+    Long-lived pool of warm worker processes reused across api calls.
+
+    Workers are forked with the calculation modules imported and the trading calendar seeded; every call
+    shares its attribute cube with them through shared memory, so tasks only carry positions.
+    """
+
+    def __init__(self, processes=None):
+        """
+        Args:
+            processes(int): number of worker processes, cpu count by default
+        """
+        self.processes = processes or multiprocessing.cpu_count()
+        self.executor = None
+
+    def start(self):
+        """
+        Start worker processes if not started.
+        """
+        if self.executor is None:
+            calendar = get_trading_calendar()
+            trading_days = list(calendar.trading_days) if calendar.is_loaded else None
+            self.executor = ProcessPoolExecutor(
+                self.processes, initializer=_initialize_worker, initargs=(trading_days,))
+
+    def shutdown(self):
+        """
+        Stop worker processes.
+        """
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def run(self, function, tasks):
+        """
+        Run tasks on workers and wait for all of them, the pool is restarted once if it is broken.
+
+        Args:
+            function(function): module level task function
+            tasks(list): list of task arguments
+
+        Returns:
+            list: results in the order of tasks
+        """
+        for retry in (True, False):
+            self.start()
+            try:
+                requests = [self.executor.submit(function, *args) for args in tasks]
+                return [request.result() for request in requests]
+            except BrokenProcessPool:
+                self.executor = None
+                if not retry:
+                    raise
+
+
+_worker_pool = None
+
+
+def get_worker_pool(processes=None):
+    """
+    Get the process-wide warm worker pool, restarted if a different number of processes is requested.
+
+    Args:
+        processes(int or None): number of worker processes, the current pool or cpu count by default
+
+    Returns:
+        WorkerPool: worker pool
+    """
+    global _worker_pool
+    if _worker_pool is not None and processes and _worker_pool.processes != processes:
+        _worker_pool.shutdown()
+        _worker_pool = None
+    if _worker_pool is None:
+        _worker_pool = WorkerPool(processes)
+    return _worker_pool
+
+
+def calculate_indicator_cube_in_parallel(data, target_dates, indicators=None, processes=None):
+    """
+    Calculate indicators of target dates in parallel blocks of consecutive dates.
+
+    Each worker evaluates its block on a zero-copy window of the planned lookback before the block.
+
+    Args:
+        data(dict or AttributeCube): cached data
+        target_dates(list): list of target date, %Y-%m-%d, ascending
+        indicators(list): list of indicator name, INDICATOR_FIELDS by default
+        processes(int): number of worker processes, cpu count by default
+
+    Returns:
+        IndicatorCube: symbol indicators cube, (indicator, date, symbol), symbols sorted
+    """
+    indicators = list(indicators or INDICATOR_FIELDS)
+    pool = get_worker_pool(processes)
+    cube = AttributeCube.from_frames(data)
+    date_positions = cube.date_index.get_indexer(target_dates)
+    target_positions = np.flatnonzero(date_positions >= 0)
+    lookback = max(plan_lookbacks(indicators).values())
+    blocks = np.array_split(target_positions, min(pool.processes, len(target_positions))) \
+        if len(target_positions) else list()
+    axes = (cube.attributes, cube.dates, cube.symbols)
+    shape = (len(indicators), len(target_dates), len(cube.symbols))
+    with SharedArray.from_array(cube.array) as shared_input, SharedArray.create(shape) as shared_output:
+        input_spec, output_spec = (shared_input.name, cube.array.shape), (shared_output.name, shape)
+        pool.run(_calculate_block, [(input_spec, output_spec, axes, indicators, lookback, block.tolist(),
+                                     date_positions[block].tolist()) for block in blocks])
+        order = np.argsort(cube.symbols, kind='stable')
+        values = shared_output.array[:, :, order]
+    return IndicatorCube(values, indicators, target_dates, [cube.symbols[index] for index in order])
+
+
+def calculate_indicator_slot_in_parallel(data, target_date, indicators=None, processes=None,
+                                         shard_size=MAX_SYMBOLS_FRAGMENT):
+    """
+    Calculate indicators of target date in parallel shards of symbols.
+
+    Args:
+        data(dict or AttributeCube): cached data
+        target_date(string): target date, %Y-%m-%d
+        indicators(list): list of indicator name, INDICATOR_FIELDS by default
+        processes(int): number of worker processes, the current pool or cpu count by default
+        shard_size(int): number of symbols of a shard
+
+    Returns:
+        IndicatorCube: symbol indicators cube, (indicator, date, symbol), symbols sorted
+    """
+    indicators = list(indicators or INDICATOR_FIELDS)
+    pool = get_worker_pool(processes)
+    cube = AttributeCube.from_frames(data)
+    axes = (cube.attributes, cube.dates, cube.symbols)
+    shape = (len(indicators), 1, len(cube.symbols))
+    date_position = cube.date_index.get_indexer([target_date])[0]
+    lookback = max(plan_lookbacks(indicators).values())
+    shards = [(start, min(start + shard_size, len(cube.symbols))) for start in range(0, len(cube.symbols), shard_size)] \
+        if date_position >= 0 else list()
+    with SharedArray.from_array(cube.array) as shared_input, SharedArray.create(shape) as shared_output:
+        input_spec, output_spec = (shared_input.name, cube.array.shape), (shared_output.name, shape)
+        pool.run(_calculate_shard, [(input_spec, output_spec, axes, indicators, lookback, int(date_position), start,
+                                     stop) for start, stop in shards])
+        order = np.argsort(cube.symbols, kind='stable')
+        values = shared_output.array[:, :, order]
+    return IndicatorCube(values, indicators, [target_date], [cube.symbols[index] for index in order])
+
+
+__all__ = [
+    'WorkerPool',
+    'get_worker_pool',
+    'calculate_indicator_cube_in_parallel',
+    'calculate_indicator_slot_in_parallel'
+]
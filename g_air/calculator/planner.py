@@ -0,0 +1,69 @@
+"""
+# -*- coding: UTF-8 -*-
+# **********************************************************************************#
+#     File: Lookback planning file.
+#   Author: Myron
+# **********************************************************************************#
+"""
+from collections import OrderedDict
+from .formula import FormulaSet
+from ..const import (
+    AVAILABLE_DATA_FIELDS,
+    INDICATOR_FIELDS
+)
+
+
+def plan_lookbacks(indicators=None):
+    """
+    Plan the history periods each attribute needs, following the cumulative lags of the indicator
+    dependency graph from the requested indicators down to the attributes.
+
+    Args:
+        indicators(list): list of output indicator name, INDICATOR_FIELDS by default
+
+    Returns:
+        OrderedDict: {attribute: history periods}, only attributes the indicators depend on
+    """
+    formulas = FormulaSet()
+    memo = dict()
+
+    def _lookbacks(node):
+        if node in memo:
+            return memo[node]
+        key = formulas.nodes[node]
+        if key[0] == 'attribute':
+            lookbacks = {key[1]: 0}
+        else:
+            shift = key[2] if key[0] == 'lag' else key[2] - 1 if key[0] == 'lsum' else 0
+            lookbacks = dict()
+            for operand in formulas.inputs(node):
+                for attribute, periods in _lookbacks(operand).items():
+                    lookbacks[attribute] = max(lookbacks.get(attribute, 0), periods + shift)
+        memo[node] = lookbacks
+        return lookbacks
+
+    result = dict()
+    for indicator in indicators or INDICATOR_FIELDS:
+        for attribute, periods in _lookbacks(formulas.indicators[indicator[:-len('(n)')]]).items():
+            result[attribute] = max(result.get(attribute, 0), periods)
+    return OrderedDict((attribute, result[attribute]) for attribute in AVAILABLE_DATA_FIELDS if attribute in result)
+
+
+def plan_periods(lookbacks, target_periods=1):
+    """
+    Number of latest trading days to load for each attribute.
+
+    Args:
+        lookbacks(dict): {attribute: history periods}
+        target_periods(int): number of target trading days at the end of the window
+
+    Returns:
+        OrderedDict: {attribute: periods}
+    """
+    return OrderedDict((attribute, periods + target_periods) for attribute, periods in lookbacks.items())
+
+
+__all__ = [
+    'plan_lookbacks',
+    'plan_periods'
+]
@@ -6,8 +6,8 @@
 # **********************************************************************************#
 """
 import numpy as np
-import pandas as pd
 from .factors import *
+from .graders import SIGNAL_GRADER
 
 
 def calculate_signal_m(q_series=None, m_series=None, **cal_args):
@@ -90,39 +90,9 @@ def calculate_signal_m1(ms_series=None, **cal_args):
     Returns:
         Series: signal M1(n) series.
     """
-
-    def _grade(signal):
-        """
-        Grade a specific signal value.
-
-        Args:
-            signal: signal value.
-
-        Returns:
-            int: score of signal deserved.
-        """
-        score = 0
-        if signal > 5:
-            score = -3
-        if 4 < signal <= 5:
-            score = -2
-        if 3 < signal <= 4:
-            score = -1
-        if signal <= -9:
-            score = 5
-        if -9 < signal <= -8:
-            score = 4
-        if -8 < signal <= -7:
-            score = 3
-        if -7 < signal <= -6:
-            score = 2
-        if -6 < signal <= -5:
-            score = 1
-        return score
-
     if ms_series is None:
         ms_series = calculate_signal_m(**cal_args)
-    return ms_series.apply(_grade)
+    return SIGNAL_GRADER.grade(ms_series)
 
 
 def calculate_signal_m2(ms_series=None, ms_series_offset_20=None, **cal_args):
@@ -144,7 +114,7 @@ def calculate_signal_m2(ms_series=None, ms_series_offset_20=None, **cal_args):
     if ms_series_offset_20 is None:
         cal_args['offset'] = cal_args.get('offset', 0) - 20
         ms_series_offset_20 = calculate_signal_m(**cal_args)
-    return (ms_series - ms_series_offset_20).apply(np.sign)
+    return np.sign(ms_series - ms_series_offset_20)
 
 
 def calculate_signal_m3(c_series=None, c_series_offset_20=None, **cal_args):
@@ -166,7 +136,7 @@ def calculate_signal_m3(c_series=None, c_series_offset_20=None, **cal_args):
     if c_series_offset_20 is None:
         cal_args['offset'] = cal_args.get('offset', 0) - 20
         c_series_offset_20 = get_close_price_series(**cal_args)
-    return (c_series - c_series_offset_20).apply(np.sign)
+    return np.sign(c_series - c_series_offset_20)
 
 
 def calculate_signal_m4(m_series=None, m_series_offset_20=None, **cal_args):
@@ -188,7 +158,7 @@ def calculate_signal_m4(m_series=None, m_series_offset_20=None, **cal_args):
     if m_series_offset_20 is None:
         cal_args['offset'] = cal_args.get('offset', 0) - 20
         m_series_offset_20 = calculate_factor_m(**cal_args)
-    return (m_series - m_series_offset_20).apply(np.sign)
+    return np.sign(m_series - m_series_offset_20)
 
 
 def calculate_signal_w1(ws_series=None, **cal_args):
@@ -208,39 +178,9 @@ def calculate_signal_w1(ws_series=None, **cal_args):
     Returns:
         Series: signal W1(n) series.
     """
-
-    def _grade(signal):
-        """
-        Grade a specific signal value.
-
-        Args:
-            signal: signal value.
-
-        Returns:
-            int: score of signal deserved.
-        """
-        score = 0
-        if signal > 5:
-            score = -3
-        if 4 < signal <= 5:
-            score = -2
-        if 3 < signal <= 4:
-            score = -1
-        if signal <= -9:
-            score = 5
-        if -9 < signal <= -8:
-            score = 4
-        if -8 < signal <= -7:
-            score = 3
-        if -7 < signal <= -6:
-            score = 2
-        if -6 < signal <= -5:
-            score = 1
-        return score
-
     if ws_series is None:
         ws_series = calculate_signal_w(**cal_args)
-    return ws_series.apply(_grade)
+    return SIGNAL_GRADER.grade(ws_series)
 
 
 def calculate_signal_w2(ws_series=None, ws_series_offset_5=None, **cal_args):
@@ -262,7 +202,7 @@ def calculate_signal_w2(ws_series=None, ws_series_offset_5=None, **cal_args):
     if ws_series_offset_5 is None:
         cal_args['offset'] = cal_args.get('offset', 0) - 5
         ws_series_offset_5 = calculate_signal_w(**cal_args)
-    return (ws_series - ws_series_offset_5).apply(np.sign)
+    return np.sign(ws_series - ws_series_offset_5)
 
 
 def calculate_signal_w3(c_series=None, c_series_offset_5=None, **cal_args):
@@ -284,7 +224,7 @@ def calculate_signal_w3(c_series=None, c_series_offset_5=None, **cal_args):
     if c_series_offset_5 is None:
         cal_args['offset'] = cal_args.get('offset', 0) - 5
         c_series_offset_5 = get_close_price_series(**cal_args)
-    return (c_series - c_series_offset_5).apply(np.sign)
+    return np.sign(c_series - c_series_offset_5)
 
 
 def calculate_signal_w4(w_series=None, w_series_offset_5=None, **cal_args):
@@ -306,7 +246,7 @@ def calculate_signal_w4(w_series=None, w_series_offset_5=None, **cal_args):
     if w_series_offset_5 is None:
         cal_args['offset'] = cal_args.get('offset', 0) - 5
         w_series_offset_5 = calculate_factor_w(**cal_args)
-    return (w_series - w_series_offset_5).apply(np.sign)
+    return np.sign(w_series - w_series_offset_5)
 
 
 def calculate_signal_d1(ds_series=None, **cal_args):
@@ -326,39 +266,9 @@ def calculate_signal_d1(ds_series=None, **cal_args):
     Returns:
         Series: signal D1(n) series.
     """
-
-    def _grade(signal):
-        """
-        Grade a specific signal value.
-
-        Args:
-            signal: signal value.
-
-        Returns:
-            int: score of signal deserved.
-        """
-        score = 0
-        if signal > 5:
-            score = -3
-        if 4 < signal <= 5:
-            score = -2
-        if 3 < signal <= 4:
-            score = -1
-        if signal <= -9:
-            score = 5
-        if -9 < signal <= -8:
-            score = 4
-        if -8 < signal <= -7:
-            score = 3
-        if -7 < signal <= -6:
-            score = 2
-        if -6 < signal <= -5:
-            score = 1
-        return score
-
     if ds_series is None:
         ds_series = calculate_signal_d(**cal_args)
-    return ds_series.apply(_grade)
+    return SIGNAL_GRADER.grade(ds_series)
 
 
 def calculate_signal_d2(ds_series=None, ds_series_offset_1=None, **cal_args):
@@ -380,7 +290,7 @@ def calculate_signal_d2(ds_series=None, ds_series_offset_1=None, **cal_args):
     if ds_series_offset_1 is None:
         cal_args['offset'] = cal_args.get('offset', 0) - 1
         ds_series_offset_1 = calculate_signal_d(**cal_args)
-    return (ds_series - ds_series_offset_1).apply(np.sign)
+    return np.sign(ds_series - ds_series_offset_1)
 
 
 def calculate_signal_d3(c_series=None, c_series_offset_1=None, **cal_args):
@@ -402,7 +312,7 @@ def calculate_signal_d3(c_series=None, c_series_offset_1=None, **cal_args):
     if c_series_offset_1 is None:
         cal_args['offset'] = cal_args.get('offset', 0) - 1
         c_series_offset_1 = get_close_price_series(**cal_args)
-    return (c_series - c_series_offset_1).apply(np.sign)
+    return np.sign(c_series - c_series_offset_1)
 
 
 def calculate_signal_d4(d_series=None, d_series_offset_1=None, **cal_args):
@@ -424,7 +334,7 @@ def calculate_signal_d4(d_series=None, d_series_offset_1=None, **cal_args):
     if d_series_offset_1 is None:
         cal_args['offset'] = cal_args.get('offset', 0) - 1
         d_series_offset_1 = calculate_factor_d(**cal_args)
-    return (d_series - d_series_offset_1).apply(np.sign)
+    return np.sign(d_series - d_series_offset_1)
 
 
 def calculate_signal_m2l(m2_series=None, m2_series_offset_1=None, m2_series_offset_2=None,
@@ -661,8 +571,8 @@ def calculate_signal_m2b(m2_series=None, m3_series=None, **cal_args):
         m2_series = calculate_signal_m2(**cal_args)
     if m3_series is None:
         m3_series = calculate_signal_m3(**cal_args)
-    multiplier = pd.Series(m2_series == m3_series).apply(lambda x: 0 if x else 1)
-    return (m2_series * multiplier).apply(lambda x: 0 if x == -0 else x)
+    multiplier = 1 - (m2_series == m3_series).astype(int)
+    return m2_series * multiplier + 0.0
 
 
 def calculate_signal_w2b(w2_series=None, w3_series=None, **cal_args):
@@ -683,8 +593,8 @@ def calculate_signal_w2b(w2_series=None, w3_series=None, **cal_args):
         w2_series = calculate_signal_w2(**cal_args)
     if w3_series is None:
         w3_series = calculate_signal_w3(**cal_args)
-    multiplier = pd.Series(w2_series == w3_series).apply(lambda x: 0 if x else 1)
-    return (w2_series * multiplier).apply(lambda x: 0 if x == -0 else x)
+    multiplier = 1 - (w2_series == w3_series).astype(int)
+    return w2_series * multiplier + 0.0
 
 
 def calculate_signal_d2b(d2_series=None, d3_series=None, **cal_args):
@@ -705,8 +615,8 @@ def calculate_signal_d2b(d2_series=None, d3_series=None, **cal_args):
         d2_series = calculate_signal_d2(**cal_args)
     if d3_series is None:
         d3_series = calculate_signal_d3(**cal_args)
-    multiplier = pd.Series(d2_series == d3_series).apply(lambda x: 0 if x else 1)
-    return (d2_series * multiplier).apply(lambda x: 0 if x == -0 else x)
+    multiplier = 1 - (d2_series == d3_series).astype(int)
+    return d2_series * multiplier + 0.0
 
 
 def calculate_signal_m4b(m4_series=None, m3_series=None, **cal_args):
@@ -727,8 +637,8 @@ def calculate_signal_m4b(m4_series=None, m3_series=None, **cal_args):
         m4_series = calculate_signal_m4(**cal_args)
     if m3_series is None:
         m3_series = calculate_signal_m3(**cal_args)
-    multiplier = pd.Series(m4_series == m3_series).apply(lambda x: 0 if x else 1)
-    return (m4_series * multiplier).apply(lambda x: 0 if x == -0 else x)
+    multiplier = 1 - (m4_series == m3_series).astype(int)
+    return m4_series * multiplier + 0.0
 
 
 def calculate_signal_w4b(w4_series=None, w3_series=None, **cal_args):
@@ -749,8 +659,8 @@ def calculate_signal_w4b(w4_series=None, w3_series=None, **cal_args):
         w4_series = calculate_signal_w4(**cal_args)
     if w3_series is None:
         w3_series = calculate_signal_w3(**cal_args)
-    multiplier = pd.Series(w4_series == w3_series).apply(lambda x: 0 if x else 1)
-    return (w4_series * multiplier).apply(lambda x: 0 if x == -0 else x)
+    multiplier = 1 - (w4_series == w3_series).astype(int)
+    return w4_series * multiplier + 0.0
 
 
 def calculate_signal_d4b(d4_series=None, d3_series=None, **cal_args):
@@ -771,8 +681,8 @@ def calculate_signal_d4b(d4_series=None, d3_series=None, **cal_args):
         d4_series = calculate_signal_d4(**cal_args)
     if d3_series is None:
         d3_series = calculate_signal_d3(**cal_args)
-    multiplier = pd.Series(d4_series == d3_series).apply(lambda x: 0 if x else 1)
-    return (d4_series * multiplier).apply(lambda x: 0 if x == -0 else x)
+    multiplier = 1 - (d4_series == d3_series).astype(int)
+    return d4_series * multiplier + 0.0
 
 
 def calculate_signal_j(m2b_series=None, w2b_series=None, d2b_series=None, **cal_args):
@@ -817,8 +727,8 @@ def calculate_signal_z1(m2_series=None, m3_series=None, **cal_args):
         m2_series = calculate_signal_m2(**cal_args)
     if m3_series is None:
         m3_series = calculate_signal_m3(**cal_args)
-    multiplier = pd.Series((m2_series < 0) & (m3_series == 1)).apply(lambda x: 1 if x else 0)
-    return (m2_series * multiplier).apply(lambda x: 0 if x == -0 else x)
+    multiplier = ((m2_series < 0) & (m3_series == 1)).astype(int)
+    return m2_series * multiplier + 0.0
 
 
 def calculate_signal_z(z1_series=None, z1_series_offset_1=None, z1_series_offset_2=None,
@@ -875,8 +785,8 @@ def calculate_signal_wz1(w2_series=None, w3_series=None, **cal_args):
         w2_series = calculate_signal_w2(**cal_args)
     if w3_series is None:
         w3_series = calculate_signal_w3(**cal_args)
-    multiplier = pd.Series((w2_series < 0) & (w3_series == 1)).apply(lambda x: 1 if x else 0)
-    return (w2_series * multiplier).apply(lambda x: 0 if x == -0 else x)
+    multiplier = ((w2_series < 0) & (w3_series == 1)).astype(int)
+    return w2_series * multiplier + 0.0
 
 
 def calculate_signal_wz(wz1_series=None, wz1_series_offset_1=None, wz1_series_offset_2=None,
@@ -933,8 +843,8 @@ def calculate_signal_t1(m2_series=None, m3_series=None, **cal_args):
         m2_series = calculate_signal_m2(**cal_args)
     if m3_series is None:
         m3_series = calculate_signal_m3(**cal_args)
-    multiplier = pd.Series((m2_series > 0) & (m3_series == -1)).apply(lambda x: 1 if x else 0)
-    return (m2_series * multiplier).apply(lambda x: 0 if x == -0 else x)
+    multiplier = ((m2_series > 0) & (m3_series == -1)).astype(int)
+    return m2_series * multiplier + 0.0
 
 
 def calculate_signal_t(t1_series=None, t1_series_offset_1=None, t1_series_offset_2=None,
@@ -10,8 +10,39 @@
 AVAILABLE_DATA_FIELDS = [
     'cadd', 'cadw', 'cadm', 'cadq', 'scdh1', 'scdh2', 'scdh3', 'scdh4', 'scdd', 'scdw', 'scdm', 'scdq',
     'tid', 'tiw', 'tim', 'tiq', 'adj_open_price', 'adj_close_price']
+ATTRIBUTE_COLUMN_MAP = {
+    'adj_open_price': '复权开盘价',
+    'adj_close_price': '复权收盘价'
+}
+ATTRIBUTE_TABLE_MAP = {
+    'adj_open_price': 'price',
+    'adj_close_price': 'price'
+}
+INDICATOR_FIELDS = [
+    'Q(n)', 'M(n)', 'W(n)', 'D(n)', 'Ms(n)', 'Ws(n)', 'Ds(n)', 'M1(n)', 'M2(n)', 'M3(n)', 'M4(n)', 'W1(n)',
+    'W2(n)', 'W3(n)', 'W4(n)', 'D1(n)', 'D2(n)', 'D3(n)', 'D4(n)', 'J(n)', 'M2L(n)', 'W2L(n)', 'D2L(n)',
+    'M4L(n)', 'W4L(n)', 'D4L(n)', 'M2B(n)', 'W2B(n)', 'D2B(n)', 'M4B(n)', 'W4B(n)', 'D4B(n)', 'Z(n)',
+    'WZ(n)', 'T(n)', 'ZQ(n)']
 OUTPUT_FIELDS = ['M2B(n)', 'W2B(n)', 'D2B(n)', 'Z(n)', 'WZ(n)', 'T(n)', 'ZQ(n)']
 MAX_THREADS = 5
 MAX_SINGLE_FACTOR_PERIODS = 40
 MAX_GLOBAL_PERIODS = 80
 MAX_SYMBOLS_FRAGMENT = 200
+STREAM_WINDOW_PERIODS = 20
+BACKFILL_WINDOW_PERIODS = 60
+CALENDAR_REFRESH_INTERVAL = 3600
+CALENDAR_MISS_REFRESH_INTERVAL = 60
+STORE_SYNC_INTERVAL = 60
+POOL_MAX_CONNECTIONS = 8
+POOL_MAX_LIFETIME = 1800
+POOL_HEALTH_CHECK_INTERVAL = 30
+POOL_CHECKOUT_TIMEOUT = 300
+MAX_QUERY_SYMBOLS = 1000
+INGEST_BATCH_SIZE = 10000
+WRITE_CHUNK_SIZE = 50000
+MAX_WRITERS = 4
+DELETE_CHUNK_SIZE = 10000
+WRITE_DEADLOCK_RETRIES = 3
+MYSQL_DEADLOCK_ERROR = 1213
+TARGET_PARTITION_START = '2005-01'
+TARGET_PARTITION_END = '2031-01'
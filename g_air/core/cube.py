@@ -0,0 +1,448 @@
+"""
+# -*- coding: UTF-8 -*-
+# **********************************************************************************#
+#     File: Dense data cubes.
+#   Author: Myron
+# **********************************************************************************#
+"""
+import numpy as np
+import pandas as pd
+
+
+class AttributeCube(object):
+    """
+    Dense (attribute, date, symbol) float array with shared integer coded date and symbol axes.
+
+    The cube behaves like the {attribute: DataFrame} dict it replaces: cube[attribute] is a
+    DataFrame view on the underlying array, so it is accepted everywhere such a dict is.
+    """
+
+    def __init__(self, array, attributes, dates, symbols):
+        """
+        Args:
+            array(numpy.ndarray): float array of shape (attribute, date, symbol)
+            attributes(list): list of attribute name
+            dates(list): list of date, %Y-%m-%d
+            symbols(list): list of symbols
+        """
+        assert array.shape == (len(attributes), len(dates), len(symbols)), 'Cube shape does not match its axes.'
+        self.array = array
+        self.attributes = list(attributes)
+        self.dates = list(dates)
+        self.symbols = list(symbols)
+        self.attribute_index = {attribute: index for index, attribute in enumerate(self.attributes)}
+        self.date_index = pd.Index(self.dates)
+        self.symbol_index = pd.Index(self.symbols)
+        self._frames = dict()
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state['_frames'] = dict()
+        return state
+
+    def __getitem__(self, attribute):
+        return self.frame(attribute)
+
+    def __contains__(self, attribute):
+        return attribute in self.attribute_index
+
+    def __iter__(self):
+        return iter(self.attributes)
+
+    def __len__(self):
+        return len(self.attributes)
+
+    def __repr__(self):
+        return 'AttributeCube(attributes={}, dates={}, symbols={})'.format(
+            len(self.attributes), len(self.dates), len(self.symbols))
+
+    @classmethod
+    def allocate(cls, attributes, dates, symbols):
+        """
+        Allocate a cube filled with NaN.
+
+        Args:
+            attributes(list): list of attribute name
+            dates(list): list of date, %Y-%m-%d
+            symbols(list): list of symbols
+
+        Returns:
+            AttributeCube: instance
+        """
+        array = np.full((len(attributes), len(dates), len(symbols)), np.nan)
+        return cls(array, attributes, dates, symbols)
+
+    @classmethod
+    def from_arrays(cls, arrays, dates, symbols):
+        """
+        Build a cube from (date, symbol) arrays sharing the same axes.
+
+        Args:
+            arrays(dict): {attribute: numpy.ndarray}
+            dates(list): list of date, %Y-%m-%d
+            symbols(list): list of symbols
+
+        Returns:
+            AttributeCube: instance
+        """
+        cube = cls.allocate(list(arrays), dates, symbols)
+        for index, values in enumerate(arrays.values()):
+            cube.array[index] = values
+        return cube
+
+    @classmethod
+    def from_frames(cls, frames):
+        """
+        Build a cube from a dict of DataFrames, aligned on the union of their symbols.
+
+        Args:
+            frames(dict): {attribute: DataFrame}
+
+        Returns:
+            AttributeCube: instance
+        """
+        if isinstance(frames, cls):
+            return frames
+        dates = list(next(iter(frames.values())).index) if frames else list()
+        symbols = sorted(set().union(*[set(frame.columns) for frame in frames.values()]))
+        cube = cls.allocate(list(frames), dates, symbols)
+        for index, frame in enumerate(frames.values()):
+            cube.array[index] = frame.reindex(index=dates, columns=symbols).values
+        return cube
+
+    def keys(self):
+        """
+        Attributes of cube.
+        """
+        return list(self.attributes)
+
+    def items(self):
+        """
+        (attribute, DataFrame) pairs of cube.
+        """
+        return [(attribute, self.frame(attribute)) for attribute in self.attributes]
+
+    def get(self, attribute, default=None):
+        """
+        Get DataFrame view of attribute with a default value.
+        """
+        return self.frame(attribute) if attribute in self else default
+
+    def position(self, date):
+        """
+        Position of date on the date axis.
+
+        Args:
+            date(string): date, %Y-%m-%d
+
+        Returns:
+            int: position
+        """
+        return self.date_index.get_loc(date)
+
+    def view(self, attribute):
+        """
+        Zero-copy (date, symbol) view of attribute.
+
+        Args:
+            attribute(string): attribute name
+
+        Returns:
+            numpy.ndarray: view
+        """
+        return self.array[self.attribute_index[attribute]]
+
+    def row(self, attribute, position):
+        """
+        Zero-copy symbol row of attribute at date position.
+
+        Args:
+            attribute(string): attribute name
+            position(int): date position, negative positions count from the end
+
+        Returns:
+            numpy.ndarray: view
+        """
+        return self.array[self.attribute_index[attribute], position]
+
+    def lag(self, attribute, lag):
+        """
+        Zero-copy lagged view of attribute: row i of the view is the value lag dates before
+        date i + lag of the cube.
+
+        Args:
+            attribute(string): attribute name
+            lag(int): non-negative lag
+
+        Returns:
+            numpy.ndarray: view of shape (date - lag, symbol)
+        """
+        return self.array[self.attribute_index[attribute], :len(self.dates) - lag]
+
+    def date_slice(self, position):
+        """
+        Zero-copy (attribute, symbol) view at date position.
+
+        Args:
+            position(int): date position
+
+        Returns:
+            numpy.ndarray: view
+        """
+        return self.array[:, position]
+
+    def series(self, attribute, position):
+        """
+        Symbol series of attribute at date position, sharing memory with the cube.
+
+        Args:
+            attribute(string): attribute name
+            position(int): date position
+
+        Returns:
+            Series: series indexed by symbols
+        """
+        return pd.Series(self.row(attribute, position), index=self.symbol_index, copy=False)
+
+    def frame(self, attribute):
+        """
+        (date, symbol) DataFrame view of attribute.
+
+        Args:
+            attribute(string): attribute name
+
+        Returns:
+            DataFrame: frame sharing memory with the cube
+        """
+        if attribute not in self._frames:
+            self._frames[attribute] = pd.DataFrame(
+                self.view(attribute), index=self.date_index, columns=self.symbol_index, copy=False)
+        return self._frames[attribute]
+
+    def last_valid_date(self):
+        """
+        Latest date with a value of any attribute.
+
+        Returns:
+            string or None: date, %Y-%m-%d, None if the cube has no values
+        """
+        positions = np.flatnonzero(~np.isnan(self.array).all(axis=(0, 2)))
+        return self.dates[positions[-1]] if len(positions) else None
+
+    def tail(self, periods):
+        """
+        Zero-copy cube of the last periods dates.
+
+        Args:
+            periods(int): number of dates
+
+        Returns:
+            AttributeCube: view cube
+        """
+        start = max(len(self.dates) - periods, 0)
+        return AttributeCube(self.array[:, start:], self.attributes, self.dates[start:], self.symbols)
+
+    def append(self, other):
+        """
+        Concatenate the dates of other cube after the dates of this cube, aligned on the union of symbols.
+
+        Args:
+            other(AttributeCube): cube of later dates, attributes missing in it are NaN
+
+        Returns:
+            AttributeCube: new cube
+        """
+        symbols = self.symbols if other.symbols == self.symbols else sorted(set(self.symbols) | set(other.symbols))
+        cube = AttributeCube.allocate(self.attributes, self.dates + other.dates, symbols)
+        for part, offset in ((self, 0), (other, len(self.dates))):
+            positions = cube.symbol_index.get_indexer(part.symbols)
+            for index, attribute in enumerate(self.attributes):
+                if attribute in part:
+                    cube.array[index, offset:offset + len(part.dates)][:, positions] = part.view(attribute)
+        return cube
+
+    def to_frames(self):
+        """
+        Convert to a dict of DataFrames.
+
+        Returns:
+            dict: {attribute: DataFrame}
+        """
+        return dict(self.items())
+
+
+class IndicatorCube(object):
+    """
+    Dense (indicator, date, symbol) float array of calculated indicators.
+
+    The cube is preallocated by the api functions and filled in place; indicators, dates and symbols
+    are all available as zero-copy DataFrame views. Iterating a cube and cube[indicator] behave as
+    the former pandas.Panel results did.
+    """
+
+    def __init__(self, array, indicators, dates, symbols):
+        """
+        Args:
+            array(numpy.ndarray): float array of shape (indicator, date, symbol)
+            indicators(list): list of indicator name
+            dates(list): list of date, %Y-%m-%d
+            symbols(list): list of symbols
+        """
+        assert array.shape == (len(indicators), len(dates), len(symbols)), 'Cube shape does not match its axes.'
+        self.array = array
+        self.indicators = list(indicators)
+        self.dates = list(dates)
+        self.symbols = list(symbols)
+        self.indicator_index = pd.Index(self.indicators)
+        self.date_index = pd.Index(self.dates)
+        self.symbol_index = pd.Index(self.symbols)
+
+    def __getitem__(self, indicator):
+        return self.by_indicator(indicator)
+
+    def __contains__(self, indicator):
+        return indicator in self.indicator_index
+
+    def __iter__(self):
+        return iter(self.indicators)
+
+    def __len__(self):
+        return len(self.indicators)
+
+    def __repr__(self):
+        return 'IndicatorCube(indicators={}, dates={}, symbols={})'.format(
+            len(self.indicators), len(self.dates), len(self.symbols))
+
+    @classmethod
+    def allocate(cls, indicators, dates, symbols):
+        """
+        Allocate a cube filled with NaN.
+
+        Args:
+            indicators(list): list of indicator name
+            dates(list): list of date, %Y-%m-%d
+            symbols(list): list of symbols
+
+        Returns:
+            IndicatorCube: instance
+        """
+        array = np.full((len(indicators), len(dates), len(symbols)), np.nan)
+        return cls(array, indicators, dates, symbols)
+
+    def fill(self, indicator, frame):
+        """
+        Write a (date, symbol) frame of indicator into the cube, aligned on the cube axes.
+
+        Args:
+            indicator(string): indicator name
+            frame(DataFrame): frame of indicator, dates or symbols outside of the cube are ignored
+        """
+        date_positions = self.date_index.get_indexer(frame.index)
+        symbol_positions = self.symbol_index.get_indexer(frame.columns)
+        rows, columns = date_positions >= 0, symbol_positions >= 0
+        self.array[self.indicator_index.get_loc(indicator)][np.ix_(date_positions[rows], symbol_positions[columns])] = \
+            np.asarray(frame.values, dtype=np.float64)[np.ix_(rows, columns)]
+
+    def fill_row(self, indicator, date, series):
+        """
+        Write a symbol series of indicator at date into the cube.
+
+        Args:
+            indicator(string): indicator name
+            date(string): date, %Y-%m-%d
+            series(Series): series indexed by symbols
+        """
+        self.fill(indicator, pd.DataFrame([np.asarray(series.values, dtype=np.float64)],
+                                          index=[date], columns=series.index))
+
+    def update(self, other):
+        """
+        Write all values of another cube into the matching positions of this cube.
+
+        Args:
+            other(IndicatorCube): cube on a subset of the axes of this cube
+        """
+        indicator_positions = self.indicator_index.get_indexer(other.indicators)
+        date_positions = self.date_index.get_indexer(other.dates)
+        symbol_positions = self.symbol_index.get_indexer(other.symbols)
+        assert (indicator_positions >= 0).all() and (date_positions >= 0).all() and (symbol_positions >= 0).all(), \
+            'Cube axes are not a subset of this cube.'
+        self.array[np.ix_(indicator_positions, date_positions, symbol_positions)] = other.array
+
+    def by_indicator(self, indicator):
+        """
+        (date, symbol) DataFrame view of indicator.
+
+        Args:
+            indicator(string): indicator name
+
+        Returns:
+            DataFrame: frame sharing memory with the cube
+        """
+        return pd.DataFrame(self.array[self.indicator_index.get_loc(indicator)],
+                            index=self.date_index, columns=self.symbol_index, copy=False)
+
+    def by_date(self, date):
+        """
+        (indicator, symbol) DataFrame view at date.
+
+        Args:
+            date(string): date, %Y-%m-%d
+
+        Returns:
+            DataFrame: frame sharing memory with the cube
+        """
+        return pd.DataFrame(self.array[:, self.date_index.get_loc(date)],
+                            index=self.indicator_index, columns=self.symbol_index, copy=False)
+
+    def by_symbol(self, symbol):
+        """
+        (date, indicator) DataFrame view of symbol.
+
+        Args:
+            symbol(string): symbol
+
+        Returns:
+            DataFrame: frame sharing memory with the cube
+        """
+        return pd.DataFrame(self.array[:, :, self.symbol_index.get_loc(symbol)].T,
+                            index=self.date_index, columns=self.indicator_index, copy=False)
+
+    def to_frame(self):
+        """
+        Convert to a long DataFrame indexed by (date, symbol) with one column per indicator.
+
+        Returns:
+            DataFrame: frame
+        """
+        index = pd.MultiIndex.from_product([self.date_index, self.symbol_index], names=['date', 'symbol'])
+        values = self.array.reshape(len(self.indicators), -1).T
+        return pd.DataFrame(values, index=index, columns=self.indicator_index)
+
+    def to_xarray(self):
+        """
+        Convert to a xarray DataArray sharing memory with the cube, xarray is required.
+
+        Returns:
+            xarray.DataArray: array of dims (indicator, date, symbol)
+        """
+        import xarray
+        return xarray.DataArray(self.array, dims=('indicator', 'date', 'symbol'),
+                                coords={'indicator': self.indicators, 'date': self.dates, 'symbol': self.symbols})
+
+    def to_excel(self, path):
+        """
+        Dump to an excel file with one (date, symbol) sheet per indicator.
+
+        Args:
+            path(string): excel path
+        """
+        with pd.ExcelWriter(path) as writer:
+            for indicator in self.indicators:
+                self.by_indicator(indicator).to_excel(writer, sheet_name=indicator)
+
+
+__all__ = [
+    'AttributeCube',
+    'IndicatorCube'
+]
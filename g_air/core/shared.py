@@ -0,0 +1,105 @@
+"""
+# -*- coding: UTF-8 -*-
+# **********************************************************************************#
+#     File: Shared memory arrays.
+#   Author: Myron
+# **********************************************************************************#
+"""
+import numpy as np
+from multiprocessing import shared_memory
+
+
+class SharedArray(object):
+    """
+    Float array placed in a named shared memory block, attachable by name from other processes.
+    """
+
+    def __init__(self, memory, shape, owner=False):
+        """
+        Args:
+            memory(SharedMemory): shared memory block
+            shape(tuple): array shape
+            owner(boolean): whether the block is unlinked on close or not
+        """
+        self.memory = memory
+        self.shape = tuple(shape)
+        self.owner = owner
+        self.array = np.ndarray(self.shape, dtype=np.float64, buffer=memory.buf)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @property
+    def name(self):
+        """
+        Name of shared memory block.
+        """
+        return self.memory.name
+
+    @classmethod
+    def create(cls, shape, fill_value=np.nan):
+        """
+        Create a shared array filled with fill value.
+
+        Args:
+            shape(tuple): array shape
+            fill_value(float): initial value
+
+        Returns:
+            SharedArray: instance owning the block
+        """
+        size = max(int(np.prod(shape)) * np.dtype(np.float64).itemsize, 1)
+        shared = cls(shared_memory.SharedMemory(create=True, size=size), shape, owner=True)
+        shared.array.fill(fill_value)
+        return shared
+
+    @classmethod
+    def from_array(cls, array):
+        """
+        Copy an array into a new shared array.
+
+        Args:
+            array(numpy.ndarray): float array
+
+        Returns:
+            SharedArray: instance owning the block
+        """
+        shared = cls.create(array.shape)
+        shared.array[...] = array
+        return shared
+
+    @classmethod
+    def attach(cls, name, shape):
+        """
+        Attach to an existing shared array from a child process, the creating process stays responsible
+        for unlinking it.
+
+        Args:
+            name(string): name of shared memory block
+            shape(tuple): array shape
+
+        Returns:
+            SharedArray: instance
+        """
+        try:
+            memory = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            memory = shared_memory.SharedMemory(name=name)
+        return cls(memory, shape)
+
+    def close(self):
+        """
+        Release the array, unlink the block if owned.
+        """
+        self.array = None
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+
+__all__ = [
+    'SharedArray'
+]
@@ -5,8 +5,19 @@
 #   Author: Myron
 # **********************************************************************************#
 """
+import os
+import threading
 import pymysql
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
 from .. import global_configs
+from ..const import (
+    POOL_MAX_CONNECTIONS,
+    POOL_MAX_LIFETIME,
+    POOL_HEALTH_CHECK_INTERVAL,
+    POOL_CHECKOUT_TIMEOUT
+)
 
 
 class ConnectionType(object):
@@ -17,17 +28,209 @@ class ConnectionType(object):
     TARGET = 'mysql_target'
 
 
-def get_connection(connection_type=ConnectionType.SOURCE):
+def get_connection(connection_type=ConnectionType.SOURCE, **options):
     """
     Get connection by connection type.
 
     Args:
         connection_type(string): connection type.
+        **options(**dict): extra connection options, as local_infile
 
     Returns:
         Connection: instance.
     """
     configs = dict(global_configs[connection_type])
     configs['port'] = int(configs['port'])
+    configs.update(options)
     connection = pymysql.connect(**configs)
     return connection
+
+
+class ConnectionPool(object):
+    """
+    Bounded, thread-safe connection pool of a connection type.
+
+    Idle connections are health checked before checkout once they have been idle longer than
+    health_check_interval seconds, and recycled once they are older than max_lifetime seconds.
+    """
+
+    def __init__(self, connection_type=ConnectionType.SOURCE, max_connections=POOL_MAX_CONNECTIONS,
+                 max_lifetime=POOL_MAX_LIFETIME, health_check_interval=POOL_HEALTH_CHECK_INTERVAL,
+                 checkout_timeout=POOL_CHECKOUT_TIMEOUT):
+        """
+        Args:
+            connection_type(string): connection type
+            max_connections(int): maximum connections checked out at the same time
+            max_lifetime(int): seconds before a connection is recycled
+            health_check_interval(int): idle seconds before a connection is pinged on checkout
+            checkout_timeout(int or None): seconds to wait for a free connection, None for ever
+        """
+        self.connection_type = connection_type
+        self.max_connections = max_connections
+        self.max_lifetime = max_lifetime
+        self.health_check_interval = health_check_interval
+        self.checkout_timeout = checkout_timeout
+        self._idle = deque()
+        self._created = dict()
+        self._lock = threading.Lock()
+        self._semaphore = threading.BoundedSemaphore(max_connections)
+        self._pid = os.getpid()
+
+    def _reset_after_fork(self):
+        """
+        Drop connections inherited from a parent process without closing the shared sockets.
+        """
+        if self._pid != os.getpid():
+            with self._lock:
+                self._idle = deque()
+                self._created = dict()
+                self._semaphore = threading.BoundedSemaphore(self.max_connections)
+                self._pid = os.getpid()
+
+    def _create(self):
+        """
+        Create a new connection.
+        """
+        connection = get_connection(self.connection_type)
+        self._created[id(connection)] = datetime.now()
+        return connection
+
+    def _discard(self, connection):
+        """
+        Close a connection and forget it.
+        """
+        self._created.pop(id(connection), None)
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _is_healthy(self, connection, last_used):
+        """
+        Check whether an idle connection can be handed out or not.
+        """
+        now = datetime.now()
+        created = self._created.get(id(connection), now)
+        if self.max_lifetime is not None and (now - created).total_seconds() > self.max_lifetime:
+            return False
+        if (now - last_used).total_seconds() > self.health_check_interval:
+            try:
+                connection.ping(reconnect=False)
+            except Exception:
+                return False
+        return True
+
+    def acquire(self):
+        """
+        Check out a connection.
+
+        Returns:
+            Connection: instance.
+        """
+        self._reset_after_fork()
+        if not self._semaphore.acquire(timeout=self.checkout_timeout):
+            raise TimeoutError('No free connection of {} in {} seconds.'.format(
+                self.connection_type, self.checkout_timeout))
+        try:
+            while True:
+                with self._lock:
+                    connection, last_used = self._idle.pop() if self._idle else (None, None)
+                if connection is None:
+                    return self._create()
+                if self._is_healthy(connection, last_used):
+                    return connection
+                self._discard(connection)
+        except Exception:
+            self._semaphore.release()
+            raise
+
+    def release(self, connection, discard=False):
+        """
+        Return a connection to the pool.
+
+        Args:
+            connection(Connection): connection checked out from this pool
+            discard(boolean): close the connection instead of reusing it
+        """
+        if self._pid != os.getpid():
+            return
+        try:
+            if discard or not connection.open:
+                self._discard(connection)
+            else:
+                connection.rollback()
+                with self._lock:
+                    self._idle.append((connection, datetime.now()))
+        except Exception:
+            self._discard(connection)
+        finally:
+            self._semaphore.release()
+
+    @contextmanager
+    def connection(self):
+        """
+        Check out a connection within a context.
+        """
+        connection = self.acquire()
+        try:
+            yield connection
+        except Exception:
+            self.release(connection, discard=True)
+            raise
+        else:
+            self.release(connection)
+
+    def close(self):
+        """
+        Close all idle connections.
+        """
+        with self._lock:
+            while self._idle:
+                connection, _ = self._idle.pop()
+                self._discard(connection)
+
+
+_pools = dict()
+_pools_lock = threading.Lock()
+
+
+def get_connection_pool(connection_type=ConnectionType.SOURCE):
+    """
+    Get the process-wide connection pool of connection type.
+
+    Args:
+        connection_type(string): connection type.
+
+    Returns:
+        ConnectionPool: instance.
+    """
+    with _pools_lock:
+        if connection_type not in _pools:
+            _pools[connection_type] = ConnectionPool(connection_type)
+        return _pools[connection_type]
+
+
+@contextmanager
+def pooled_connection(connection_type=ConnectionType.SOURCE):
+    """
+    Check out a pooled connection within a context.
+
+    Args:
+        connection_type(string): connection type.
+    """
+    with get_connection_pool(connection_type).connection() as connection:
+        yield connection
+
+
+@contextmanager
+def pooled_cursor(connection_type=ConnectionType.SOURCE, cursor_class=None):
+    """
+    Open a cursor on a pooled connection within a context.
+
+    Args:
+        connection_type(string): connection type.
+        cursor_class(class): pymysql cursor class
+    """
+    with pooled_connection(connection_type) as connection:
+        with connection.cursor(cursor_class) as cursor:
+            yield cursor
@@ -0,0 +1,134 @@
+"""
+# -*- coding: UTF-8 -*-
+# **********************************************************************************#
+#     File: local result cache.
+#   Author: Myron
+# **********************************************************************************#
+"""
+import os
+import sqlite3
+import threading
+import numpy as np
+from contextlib import contextmanager
+
+
+class ResultCache(object):
+    """
+    Local on-disk cache of calculated indicator cells keyed by (target date, symbol, indicator, version).
+
+    Cells of one (target date, indicator, version) are kept together in one sqlite row as a symbol list
+    and a float64 blob; a cell is known when its symbol is in the row, and stale as soon as the version of
+    its indicator changes. NaN cells are only kept before the watermark of the data they were calculated
+    on, the latest date with source rows, since the source rows of later dates may still arrive.
+    """
+
+    def __init__(self, path):
+        """
+        Args:
+            path(string): sqlite file path
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+        self._lock = threading.Lock()
+        with self._connect() as connection:
+            connection.execute("""
+            create table if not exists results
+            (
+                date text not null,
+                indicator text not null,
+                version text not null,
+                symbols text not null,
+                data blob not null,
+                primary key (date, indicator, version)
+            )""")
+
+    @contextmanager
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=60)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _rows(connection, indicator, version, dates):
+        """
+        Cached rows of indicator of version in dates.
+
+        Returns:
+            dict: {date: (list of symbols, numpy.ndarray)}
+        """
+        rows = connection.execute(
+            """select date, symbols, data from results where indicator = ? and version = ? and date between ? and ?""",
+            (indicator, version, min(dates), max(dates))).fetchall()
+        dates = set(dates)
+        return {date: (symbols.split(',') if symbols else list(), np.frombuffer(data, dtype=np.float64))
+                for date, symbols, data in rows if date in dates}
+
+    def fetch(self, cube, versions):
+        """
+        Fill a cube in place with the cached cells of the current versions.
+
+        Args:
+            cube(IndicatorCube): cube to fill
+            versions(dict): {indicator: version}
+
+        Returns:
+            numpy.ndarray: boolean mask of the known cells, of the shape of cube
+        """
+        known = np.zeros(cube.array.shape, dtype=bool)
+        if not cube.dates:
+            return known
+        with self._lock, self._connect() as connection:
+            for index, indicator in enumerate(cube.indicators):
+                rows = self._rows(connection, indicator, versions[indicator], cube.dates)
+                for date, (symbols, values) in rows.items():
+                    position = cube.date_index.get_loc(date)
+                    symbol_positions = cube.symbol_index.get_indexer(symbols)
+                    valid = symbol_positions >= 0
+                    cube.array[index, position, symbol_positions[valid]] = values[valid]
+                    known[index, position, symbol_positions[valid]] = True
+        return known
+
+    def store(self, cube, versions, watermark=None):
+        """
+        Store the known cells of a cube, merged with the cached cells of other symbols.
+
+        Args:
+            cube(IndicatorCube): calculated cube
+            versions(dict): {indicator: version}
+            watermark(string or None): latest date with rows of the data the cube was calculated on, NaN cells
+                of earlier dates are known, NaN cells are never known if None
+        """
+        if not cube.dates:
+            return
+        with self._lock, self._connect() as connection:
+            items = list()
+            for index, indicator in enumerate(cube.indicators):
+                cached = self._rows(connection, indicator, versions[indicator], cube.dates)
+                for position, date in enumerate(cube.dates):
+                    values = cube.array[index, position]
+                    valid = ~np.isnan(values) | (watermark is not None and date < watermark)
+                    symbols, values = [symbol for symbol, flag in zip(cube.symbols, valid) if flag], values[valid]
+                    if date in cached:
+                        others = [symbol not in cube.symbol_index for symbol in cached[date][0]]
+                        symbols += [symbol for symbol, other in zip(cached[date][0], others) if other]
+                        values = np.concatenate([values, cached[date][1][np.asarray(others, dtype=bool)]])
+                    items.append((date, indicator, versions[indicator], ','.join(symbols),
+                                  np.ascontiguousarray(values, dtype=np.float64).tobytes()))
+            connection.executemany("""replace into results values (?, ?, ?, ?, ?)""", items)
+
+    def clear(self):
+        """
+        Remove all cached cells.
+        """
+        with self._lock, self._connect() as connection:
+            connection.execute("""delete from results""")
+
+
+__all__ = [
+    'ResultCache'
+]
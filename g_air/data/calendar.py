@@ -0,0 +1,179 @@
+"""
+# -*- coding: UTF-8 -*-
+# **********************************************************************************#
+#     File: trading calendar file.
+#   Author: Myron
+# **********************************************************************************#
+"""
+import bisect
+import threading
+import numpy as np
+from datetime import datetime
+from ..const import (
+    CALENDAR_REFRESH_INTERVAL,
+    CALENDAR_MISS_REFRESH_INTERVAL
+)
+from ..utils.datetime import normalize_date
+
+
+class TradingCalendar(object):
+    """
+    In-process trading calendar, loaded once and refreshed by policy.
+
+    The calendar keeps a sorted list (and array) of trading days together with a
+    date -> ordinal dict, so that offset lookups are O(1) and window lookups are O(log n).
+    It is reloaded when it is older than refresh_interval seconds, or when a date later
+    than the last known trading day is requested and the last load is older than
+    miss_refresh_interval seconds.
+    """
+
+    def __init__(self, loader, refresh_interval=CALENDAR_REFRESH_INTERVAL,
+                 miss_refresh_interval=CALENDAR_MISS_REFRESH_INTERVAL):
+        """
+        Args:
+            loader(function): function with no arguments returning all trading days, %Y-%m-%d
+            refresh_interval(int or None): seconds before the calendar expires, None for never
+            miss_refresh_interval(int or None): seconds before a missing future date triggers reloading
+        """
+        self.loader = loader
+        self.refresh_interval = refresh_interval
+        self.miss_refresh_interval = miss_refresh_interval
+        self.trading_days = list()
+        self.trading_days_array = np.array([], dtype='U10')
+        self.ordinal_map = dict()
+        self.loaded_time = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        self.ensure_loaded()
+        return len(self.trading_days)
+
+    def __contains__(self, date):
+        self.ensure_loaded(date)
+        return date in self.ordinal_map
+
+    @property
+    def is_loaded(self):
+        """
+        Whether the calendar has been loaded or not.
+        """
+        return self.loaded_time is not None
+
+    def refresh(self, trading_days=None):
+        """
+        Reload all trading days from the loader.
+
+        Args:
+            trading_days(list or None): trading days already loaded elsewhere, %Y-%m-%d, used instead of the loader
+        """
+        with self._lock:
+            trading_days = sorted(set(self.loader() if trading_days is None else trading_days))
+            self.trading_days = trading_days
+            self.trading_days_array = np.array(trading_days, dtype='U10')
+            self.ordinal_map = {date: ordinal for ordinal, date in enumerate(trading_days)}
+            self.loaded_time = datetime.now()
+
+    def ensure_loaded(self, date=None):
+        """
+        Load or reload the calendar according to the refresh policy.
+
+        Args:
+            date(string or None): date about to be queried, %Y-%m-%d
+        """
+        if not self.is_loaded:
+            self.refresh()
+            return
+        elapsed = (datetime.now() - self.loaded_time).total_seconds()
+        if self.refresh_interval is not None and elapsed > self.refresh_interval:
+            self.refresh()
+            return
+        if date is not None and self.trading_days and date > self.trading_days[-1] \
+                and self.miss_refresh_interval is not None and elapsed > self.miss_refresh_interval:
+            self.refresh()
+
+    def ordinal(self, date):
+        """
+        Ordinal of a trading day.
+
+        Args:
+            date(string): date, %Y-%m-%d
+
+        Returns:
+            int: ordinal of date in the calendar
+        """
+        self.ensure_loaded(date)
+        try:
+            return self.ordinal_map[date]
+        except KeyError:
+            raise ValueError('{} is not a trading day.'.format(date))
+
+    def ordinals(self, dates):
+        """
+        Ordinals of a batch of dates, -1 for non trading days.
+
+        Args:
+            dates(list or array): list of date, %Y-%m-%d
+
+        Returns:
+            numpy.ndarray: ordinals of dates
+        """
+        self.ensure_loaded(max(dates) if len(dates) else None)
+        dates = np.asarray(dates, dtype='U10')
+        positions = np.searchsorted(self.trading_days_array, dates)
+        positions = np.minimum(positions, max(len(self.trading_days_array) - 1, 0))
+        matched = self.trading_days_array[positions] == dates if len(self.trading_days_array) else \
+            np.zeros(len(dates), dtype=bool)
+        return np.where(matched, positions, -1)
+
+    def offset(self, date, offset=0):
+        """
+        Offset trading day, clipped to the calendar boundaries.
+
+        Args:
+            date(string): date, %Y-%m-%d
+            offset(int): all int,  offset < 0, backward; offset > 0, forward
+
+        Returns:
+            string: target date, %Y-%m-%d
+        """
+        index = self.ordinal(date)
+        return self.trading_days[min(max(index + offset, 0), len(self.trading_days) - 1)]
+
+    def history_periods(self, date, history_periods):
+        """
+        Trading days up to date with history periods.
+
+        Args:
+            date(string): date, %Y-%m-%d
+            history_periods(int): periods length
+
+        Returns:
+            list: list of date
+        """
+        self.ensure_loaded(date)
+        index = bisect.bisect_right(self.trading_days, date)
+        start_index = max(index - history_periods - 1, 0)
+        return self.trading_days[start_index:index]
+
+    def window(self, start=None, end=None):
+        """
+        Trading days between start and end, both included.
+
+        Args:
+            start(string or None): start date
+            end(string or None): end date
+
+        Returns:
+            list: list of date
+        """
+        start = normalize_date(start).strftime('%Y-%m-%d') if start else None
+        end = normalize_date(end).strftime('%Y-%m-%d') if end else None
+        self.ensure_loaded(end)
+        start_index = bisect.bisect_left(self.trading_days, start) if start else 0
+        end_index = bisect.bisect_right(self.trading_days, end) if end else len(self.trading_days)
+        return self.trading_days[start_index:end_index]
+
+
+__all__ = [
+    'TradingCalendar'
+]
@@ -5,19 +5,37 @@
 #   Author: Myron
 # **********************************************************************************#
 """
-import bisect
+import threading
+import pymysql
 import pandas as pd
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from .api_base import (
-    get_connection,
+    pooled_cursor,
     ConnectionType
 )
+from .calendar import TradingCalendar
+from .store import AttributeStore
+from .cache import ResultCache
+from .schema import (
+    date_range_condition,
+    set_table_type,
+    typed_schema_enabled,
+    typed_table_sql
+)
+from .query import build_attribute_queries
+from .ingest import ingest_attributes
+from ..core.cube import AttributeCube
+from .. import global_configs
 from ..const import (
     AVAILABLE_DATA_FIELDS,
-    MAX_THREADS
+    DELETE_CHUNK_SIZE,
+    MAX_THREADS,
+    MAX_WRITERS,
+    MYSQL_DEADLOCK_ERROR,
+    WRITE_CHUNK_SIZE,
+    WRITE_DEADLOCK_RETRIES
 )
 from ..utils.exceptions import Exceptions
-from ..utils.datetime import normalize_date
 from ..const import MAX_SINGLE_FACTOR_PERIODS
 
 
@@ -25,7 +43,7 @@ def load_all_symbols():
     """
     Load all symbols from price table.
     """
-    with get_connection().cursor() as cursor:
+    with pooled_cursor() as cursor:
         sql = """select distinct 代码 from price"""
         cursor.execute(sql)
         result = list(map(lambda x: x[0], cursor.fetchall()))
@@ -36,7 +54,7 @@ def load_symbols_name_map():
     """
     Load all symbols from price table.
     """
-    with get_connection().cursor() as cursor:
+    with pooled_cursor() as cursor:
         sql = """select distinct 代码,简称 from price"""
         cursor.execute(sql)
         result = dict(cursor.fetchall())
@@ -47,7 +65,7 @@ def load_hs300():
     """
     Load HS300.
     """
-    with get_connection().cursor() as cursor:
+    with pooled_cursor() as cursor:
         sql = """select distinct 代码 from hs_300"""
         cursor.execute(sql)
         result = list(map(lambda x: x[0], cursor.fetchall()))
@@ -58,7 +76,7 @@ def load_zz500():
     """
     Load ZZ500.
     """
-    with get_connection().cursor() as cursor:
+    with pooled_cursor() as cursor:
         sql = """select distinct 代码 from zz_500"""
         cursor.execute(sql)
         result = list(map(lambda x: x[0], cursor.fetchall()))
@@ -69,41 +87,52 @@ def load_shares():
     """
     Load shares.
     """
-    with get_connection().cursor() as cursor:
+    with pooled_cursor() as cursor:
         sql = """select distinct 代码 from zx_shares"""
         cursor.execute(sql)
         result = list(map(lambda x: x[0], cursor.fetchall()))
     return result
 
 
+def _query_trading_days():
+    """
+    Query all trading days from cadd table.
+
+    Returns:
+        list: trading days list, %Y-%m-%d
+    """
+    with pooled_cursor() as cursor:
+        sql = """select distinct 日期 from cadd"""
+        cursor.execute(sql)
+        result = sorted(map(lambda x: x[0].split(' ')[0], cursor.fetchall()))
+    return result
+
+
+_trading_calendar = TradingCalendar(loader=_query_trading_days)
+
+
+def get_trading_calendar():
+    """
+    Get the process-wide trading calendar, loaded lazily on first use.
+
+    Returns:
+        TradingCalendar: trading calendar instance
+    """
+    return _trading_calendar
+
+
 def load_trading_days(start=None, end=None):
     """
-    Load trading days from cadd table.
+    Load trading days from the trading calendar.
 
     Args:
         start(string): start time
         end(string): end time
 
     Returns:
-        list of datetime.datetime: trading days list
+        list of string: trading days list, %Y-%m-%d
     """
-    with get_connection().cursor() as cursor:
-        sql = """select distinct 日期 from cadd"""
-        where_clause = """"""
-        if start or end:
-            if start and not end:
-                where_clause += """日期 >= '{}'""".format(normalize_date(start).strftime('%Y-%m-%d %H:%M:%S'))
-            if not start and end:
-                where_clause += """日期 <= '{}'""".format(normalize_date(end).strftime('%Y-%m-%d %H:%M:%S'))
-            if start and end:
-                where_clause += """日期 >= '{}' and 日期 <= '{}'""".format(
-                    normalize_date(start).strftime('%Y-%m-%d %H:%M:%S'),
-                    normalize_date(end).strftime('%Y-%m-%d %H:%M:%S'))
-        if where_clause:
-            sql = ' where '.join([sql, where_clause])
-        cursor.execute(sql)
-        result = sorted(map(lambda x: x[0].split(' ')[0], cursor.fetchall()))
-    return result
+    return get_trading_calendar().window(start=start, end=end)
 
 
 def load_trading_days_with_history_periods(date, history_periods=MAX_SINGLE_FACTOR_PERIODS):
@@ -117,11 +146,7 @@ def load_trading_days_with_history_periods(date, history_periods=MAX_SINGLE_FACT
     Returns:
         list: list of date
     """
-    all_trading_days = load_trading_days()
-    index = bisect.bisect_right(all_trading_days, date)
-    start_index = max(index - history_periods - 1, 0)
-    result = all_trading_days[start_index:index]
-    return result
+    return get_trading_calendar().history_periods(date, history_periods)
 
 
 def load_offset_trading_day(date, offset=0, all_trading_days=None):
@@ -136,7 +161,8 @@ def load_offset_trading_day(date, offset=0, all_trading_days=None):
     Returns:
         string: target date, %Y-%m-%d
     """
-    all_trading_days = all_trading_days or load_trading_days()
+    if all_trading_days is None:
+        return get_trading_calendar().offset(date, offset=offset)
     index = all_trading_days.index(date)
     return all_trading_days[min(max(index + offset, 0), len(all_trading_days) - 1)]
 
@@ -152,49 +178,111 @@ def load_attribute(symbols=None, trading_days=None, attribute=None):
     """
     attribute = attribute or AVAILABLE_DATA_FIELDS[0]
     assert attribute in AVAILABLE_DATA_FIELDS, Exceptions.INVALID_FIELDS
-    with get_connection().cursor() as cursor:
-        attribute_map = {
-            'adj_open_price': '复权开盘价',
-            'adj_close_price': '复权收盘价'
-        }
-        table_map = {
-            'adj_open_price': 'price',
-            'adj_close_price': 'price'
-        }
-        select_clause = '日期,代码,{}'.format(attribute_map.get(attribute, attribute))
-        from_clause = '{}'.format(table_map.get(attribute, attribute))
-        sql = """select {} from {}""".format(select_clause, from_clause)
-        where_clause = """"""
-        symbol_condition = """代码 in ({})""".format(','.join(
-            map(lambda x: '\"{}\"'.format(x), tuple(symbols)))) if symbols else """"""
-        trading_days_str_list = trading_days or list()
-        trading_days_condition = """substr(日期, 1, 10) in ({})""".format(
-            ','.join(map(lambda x: '\"{}\"'.format(x), trading_days_str_list))) if trading_days_str_list else """"""
-        joiner = ' and ' if symbol_condition and trading_days_condition else ''
-        if symbol_condition or trading_days_condition:
-            where_clause = joiner.join([symbol_condition, trading_days_condition])
-        if where_clause:
-            sql = ' where '.join([sql, where_clause])
-        cursor.execute(sql)
-        result = list(cursor.fetchall())
+    result = list()
+    with pooled_cursor() as cursor:
+        for sql, params in build_attribute_queries(attribute, symbols=symbols, trading_days=trading_days):
+            cursor.execute(sql, params)
+            result.extend(cursor.fetchall())
     frame = pd.DataFrame(result, columns=['date', 'symbol', attribute])
-    frame['date'] = frame['date'].apply(lambda x: x.split(' ')[0])
+    frame['date'] = frame['date'].str[:10]
+    if trading_days:
+        frame = frame[frame['date'].isin(set(trading_days))]
     return frame
 
 
-def load_attributes_data(symbols=None, trading_days=None, attributes=None):
+def _query_attribute_rows(attribute, watermark=None):
     """
-    Load attribute data from database.
+    Query source rows of attribute newer than watermark.
+
+    Args:
+        attribute(string): attribute name
+        watermark(string or None): maximum raw 日期 already synced
+
+    Returns:
+        list: list of (日期, 代码, value)
+    """
+    (sql, params), = build_attribute_queries(attribute, since=watermark)
+    with pooled_cursor() as cursor:
+        cursor.execute(sql, params)
+        result = list(cursor.fetchall())
+    return result
+
+
+_attribute_store = None
+
+
+def get_attribute_store():
+    """
+    Get the local attribute store if it is enabled in configs.
+
+    Returns:
+        AttributeStore or None: store instance
+    """
+    global _attribute_store
+    configs = global_configs.get('local_store', dict())
+    if not configs.get('enabled', False):
+        return None
+    if _attribute_store is None:
+        _attribute_store = AttributeStore(configs['path'])
+    return _attribute_store
+
+
+_result_cache = None
+
+
+def get_result_cache():
+    """
+    Get the local result cache if it is enabled in configs.
+
+    Returns:
+        ResultCache or None: cache instance
+    """
+    global _result_cache
+    configs = global_configs.get('result_cache', dict())
+    if not configs.get('enabled', False):
+        return None
+    if _result_cache is None:
+        _result_cache = ResultCache(configs['path'])
+    return _result_cache
+
+
+def sync_attribute_store(attributes=None):
+    """
+    Incrementally sync the local attribute store from the source database.
+
+    Args:
+        attributes(list): list of attribute name
+    """
+    store = get_attribute_store()
+    assert store is not None, 'Local attribute store is not enabled.'
+    store.sync(attributes or AVAILABLE_DATA_FIELDS, fetcher=_query_attribute_rows)
+
+
+def load_attributes_data(symbols=None, trading_days=None, attributes=None, periods=None):
+    """
+    Load attribute data from database, served from the local store when it is enabled.
 
     Args:
         symbols(list): list of symbols
         trading_days(list): list of datetime.datetime
         attributes(list): list of attribute name
+        periods(dict): {attribute: number of latest trading days to load}, earlier rows are NaN,
+            all trading days by default
 
     Returns:
         dict: {attribute: DataFrame}
     """
     attributes = attributes or AVAILABLE_DATA_FIELDS
+    store = get_attribute_store()
+    if store is not None and trading_days:
+        outdated = [attribute for attribute in attributes if not store.covers(attribute, trading_days)]
+        if outdated:
+            store.sync(outdated, fetcher=_query_attribute_rows)
+        return store.load(symbols, trading_days, attributes)
+    if trading_days:
+        arrays, all_symbols = ingest_attributes(symbols, trading_days, attributes, periods=periods)
+        return {attribute: pd.DataFrame(values, index=list(trading_days), columns=all_symbols)
+                for attribute, values in arrays.items()}
     with ThreadPoolExecutor(MAX_THREADS) as pool:
         requests = [pool.submit(load_attribute, symbols, trading_days, attribute) for attribute in attributes]
         responses = [data.result() for data in as_completed(requests)]
@@ -210,16 +298,61 @@ def load_attributes_data(symbols=None, trading_days=None, attributes=None):
     return result
 
 
+def load_attributes_cube(symbols=None, trading_days=None, attributes=None, periods=None):
+    """
+    Load attribute data from database as a dense attribute cube.
+
+    Args:
+        symbols(list): list of symbols
+        trading_days(list): list of date, %Y-%m-%d
+        attributes(list): list of attribute name
+        periods(dict): {attribute: number of latest trading days to load}, earlier rows are NaN,
+            all trading days by default
+
+    Returns:
+        AttributeCube: cube of (attribute, date, symbol)
+    """
+    attributes = attributes or AVAILABLE_DATA_FIELDS
+    if get_attribute_store() is not None or not trading_days:
+        return AttributeCube.from_frames(load_attributes_data(symbols, trading_days, attributes, periods=periods))
+    arrays, all_symbols = ingest_attributes(symbols, trading_days, attributes, periods=periods)
+    return AttributeCube.from_arrays(arrays, list(trading_days), all_symbols)
+
+
 def get_all_tables():
     """
     Get all tables.
     """
-    with get_connection(ConnectionType.TARGET).cursor() as cursor:
+    with pooled_cursor(ConnectionType.TARGET) as cursor:
         cursor.execute("""show tables""")
         tables = list(map(lambda x: x[0], cursor.fetchall()))
     return tables
 
 
+_known_tables = set()
+_known_tables_lock = threading.Lock()
+
+
+def ensure_tables(indicators):
+    """
+    Create the missing tables of indicators, with the tables known to exist cached per process so that
+    only the first write of a table queries the schema.
+
+    Args:
+        indicators(string or list): list of indicators.
+    """
+    indicators = indicators.split(',') if isinstance(indicators, str) else indicators
+    with _known_tables_lock:
+        missing = set(indicators) - _known_tables
+        if not missing:
+            return
+        _known_tables.update(get_all_tables())
+        missing -= _known_tables
+        if missing:
+            create_tables(sorted(missing))
+            _known_tables.update(missing)
+
+
 def create_tables(indicators):
     """
     Create tables for indicators.
@@ -230,9 +363,10 @@ def create_tables(indicators):
     indicators = indicators.split(',') if isinstance(indicators, str) else indicators
     assert isinstance(indicators, list), 'Indicators must be as type list.'
     all_tables = get_all_tables()
-    with get_connection(ConnectionType.TARGET).cursor() as cursor:
+    with pooled_cursor(ConnectionType.TARGET) as cursor:
+        typed = typed_schema_enabled()
         for indicator in set(indicators) - set(all_tables):
-            sql = """
+            sql = typed_table_sql(indicator) if typed else """
             create table %s
             (
             日期 varchar(100),
@@ -245,6 +379,7 @@ def create_tables(indicators):
             try:
                 print('create table {}'.format(indicator))
                 cursor.execute(sql)
+                set_table_type(indicator, typed)
             except Exception as exc:
                 print(exc)
 
@@ -259,32 +394,52 @@ def drop_tables(indicators):
     indicators = indicators.split(',') if isinstance(indicators, str) else indicators
     assert isinstance(indicators, list), 'Indicators must be as type list.'
     all_tables = get_all_tables()
-    with get_connection(ConnectionType.TARGET).cursor() as cursor:
+    with pooled_cursor(ConnectionType.TARGET) as cursor:
         for indicator in set(indicators) & set(all_tables):
             try:
                 print('drop table {}'.format(indicator))
                 cursor.execute("""drop table %s""" % indicator)
+                _known_tables.discard(indicator)
+                set_table_type(indicator)
             except Exception as exc:
                 print(exc)
 
 
-def update_table(indicator, items):
+def update_table(indicator, items, batch_size=WRITE_CHUNK_SIZE, writers=1):
     """
-    Update table of a specific indicator with items.
+    Update table of a specific indicator with items, one transaction per batch of items.
 
     Args:
         indicator(string): indicator name
         items(list): list of item
-    """
-    create_tables(indicator)
-    with get_connection(ConnectionType.TARGET).cursor() as cursor:
-        sql = """insert into {}
-        (日期,代码,简称,{})
-        values (%s,%s,%s,%s)
-        on duplicate key update
-        {}=values({})""".format(*[indicator]*4)
-        cursor.executemany(sql, items)
-        cursor.connection.commit()
+        batch_size(int): number of items of a transaction
+        writers(int): number of pooled connections writing batches in parallel
+    """
+    ensure_tables([indicator])
+    sql = """insert into {}
+    (日期,代码,简称,{})
+    values (%s,%s,%s,%s)
+    on duplicate key update
+    {}=values({})""".format(*[indicator]*4)
+
+    def _upsert(batch):
+        for retry in range(WRITE_DEADLOCK_RETRIES, -1, -1):
+            try:
+                with pooled_cursor(ConnectionType.TARGET) as cursor:
+                    cursor.executemany(sql, batch)
+                    cursor.connection.commit()
+                return
+            except pymysql.err.OperationalError as exc:
+                if not retry or exc.args[0] != MYSQL_DEADLOCK_ERROR:
+                    raise
+
+    batches = [items[index:index + batch_size] for index in range(0, len(items), batch_size)]
+    if writers > 1 and len(batches) > 1:
+        with ThreadPoolExecutor(min(writers, len(batches))) as pool:
+            list(pool.map(_upsert, batches))
+    else:
+        for batch in batches:
+            _upsert(batch)
 
 
 def delete_tables(indicators):
@@ -297,7 +452,7 @@ def delete_tables(indicators):
     indicators = indicators.split(',') if isinstance(indicators, str) else indicators
     assert isinstance(indicators, list), 'Indicators must be as type list.'
     all_tables = get_all_tables()
-    with get_connection(ConnectionType.TARGET).cursor() as cursor:
+    with pooled_cursor(ConnectionType.TARGET) as cursor:
         for indicator in set(indicators) & set(all_tables):
             try:
                 print('delete table {}'.format(indicator))
@@ -307,45 +462,75 @@ def delete_tables(indicators):
                 print(exc)
 
 
-def delete_items_(start_date, end_date, symbols=None, indicators=None):
+def delete_items_(start_date, end_date, symbols=None, indicators=None, chunk_size=DELETE_CHUNK_SIZE,
+                  writers=MAX_WRITERS):
     """
     Delete items from mysql.
 
+    Rows are deleted with a sargable 日期 range in chunks of bounded size, one transaction per chunk,
+    and tables are deleted concurrently over pooled connections.
+
     Args:
         start_date(string): start date
         end_date(string): end date
         symbols(list or None): list of symbols
         indicators(str or list or None): indicators
+        chunk_size(int): maximum rows deleted by a transaction
+        writers(int): number of tables deleted concurrently
+
+    Returns:
+        int: number of rows deleted
     """
     all_tables = get_all_tables()
     indicators = indicators or all_tables
     indicators = indicators.split(',') if isinstance(indicators, str) else indicators
     assert isinstance(indicators, list), 'Indicators must be as type list.'
-    with get_connection(ConnectionType.TARGET).cursor() as cursor:
-        for indicator in set(indicators) & set(all_tables):
-            try:
-                symbol_condition = """ and 代码 in ({})""".format(','.join(
-                    map(lambda x: '\"{}\"'.format(x), tuple(symbols)))) if symbols else """"""
-                sql = """delete from {} where substr(日期, 1, 10) >= '{}' and substr(日期, 1, 10) <= '{}'{}""".format(
-                    indicator, start_date, end_date, symbol_condition)
-                cursor.execute(sql)
-                cursor.connection.commit()
-            except Exception as exc:
-                print(exc)
+    condition, parameters = date_range_condition(start_date, end_date)
+    if symbols:
+        condition += """ and 代码 in ({})""".format(','.join(['%s'] * len(symbols)))
+        parameters += tuple(symbols)
+
+    def _delete(indicator):
+        deleted = 0
+        try:
+            with pooled_cursor(ConnectionType.TARGET) as cursor:
+                while True:
+                    rows = cursor.execute("""delete from {} where {} limit {}""".format(
+                        indicator, condition, chunk_size), parameters)
+                    cursor.connection.commit()
+                    deleted += rows
+                    if rows < chunk_size:
+                        break
+            print('delete {} rows from {}'.format(deleted, indicator))
+        except Exception as exc:
+            print(exc)
+        return deleted
+
+    tables = sorted(set(indicators) & set(all_tables))
+    if not tables:
+        return 0
+    with ThreadPoolExecutor(min(writers, len(tables))) as pool:
+        return sum(pool.map(_delete, tables))
 
 
 __all__ = [
     'load_all_symbols',
+    'get_trading_calendar',
     'load_trading_days',
     'load_trading_days_with_history_periods',
     'load_offset_trading_day',
     'load_attribute',
     'load_attributes_data',
+    'load_attributes_cube',
+    'get_attribute_store',
+    'get_result_cache',
+    'sync_attribute_store',
     'load_symbols_name_map',
     'load_hs300',
     'load_zz500',
     'load_shares',
     'get_all_tables',
+    'ensure_tables',
     'create_tables',
     'update_table',
     'drop_tables',
@@ -0,0 +1,169 @@
+"""
+# -*- coding: UTF-8 -*-
+# **********************************************************************************#
+#     File: streaming attribute ingest.
+#   Author: Myron
+# **********************************************************************************#
+"""
+import threading
+import numpy as np
+import pandas as pd
+from pymysql.cursors import SSCursor
+from concurrent.futures import ThreadPoolExecutor
+from .api_base import pooled_cursor
+from .query import build_attribute_queries
+from ..const import (
+    AVAILABLE_DATA_FIELDS,
+    INGEST_BATCH_SIZE,
+    MAX_THREADS
+)
+
+
+class SymbolCoder(object):
+    """
+    Thread-safe symbol -> integer code mapping shared by the attributes of one load.
+    """
+
+    def __init__(self, symbols=None):
+        """
+        Args:
+            symbols(list or None): fixed symbols, None for growing with the rows seen
+        """
+        self.fixed = symbols is not None
+        self.symbols = list(dict.fromkeys(symbols)) if symbols is not None else list()
+        self.index = pd.Index(self.symbols, dtype=object)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.symbols)
+
+    def encode(self, symbols):
+        """
+        Encode symbols to integer codes, -1 for unknown symbols of a fixed coder.
+
+        Args:
+            symbols(numpy.ndarray): array of symbols
+
+        Returns:
+            numpy.ndarray: codes
+        """
+        codes = self.index.get_indexer(symbols)
+        if self.fixed or (codes >= 0).all():
+            return codes
+        with self._lock:
+            known = set(self.symbols)
+            new_symbols = [symbol for symbol in pd.unique(symbols[codes < 0]) if symbol not in known]
+            if new_symbols:
+                self.symbols = self.symbols + new_symbols
+                self.index = pd.Index(self.symbols, dtype=object)
+            index = self.index
+        return index.get_indexer(symbols)
+
+
+def _grow(values, seen, width):
+    """
+    Grow the symbol axis of an array and its seen mask to at least width.
+    """
+    width = max(width, 2 * values.shape[1])
+    grown_values = np.full((values.shape[0], width), np.nan)
+    grown_values[:, :values.shape[1]] = values
+    grown_seen = np.zeros(width, dtype=bool)
+    grown_seen[:len(seen)] = seen
+    return grown_values, grown_seen
+
+
+def _fill_batch(values, seen, rows, date_index, symbol_coder):
+    """
+    Fill a batch of rows into a (date, symbol) array.
+
+    Args:
+        values(numpy.ndarray): array to fill
+        seen(numpy.ndarray): mask of symbols with rows
+        rows(tuple): batch of (日期, 代码, value)
+        date_index(pandas.Index): index of trading days
+        symbol_coder(SymbolCoder): symbol coder
+
+    Returns:
+        tuple: (values, seen), grown when new symbols are coded
+    """
+    raw_dates, symbols, batch_values = zip(*rows)
+    date_codes = date_index.get_indexer(np.array(raw_dates, dtype='U10'))
+    symbol_codes = symbol_coder.encode(np.array(symbols, dtype=object))
+    if len(symbol_coder) > values.shape[1]:
+        values, seen = _grow(values, seen, len(symbol_coder))
+    valid = (date_codes >= 0) & (symbol_codes >= 0)
+    values[date_codes[valid], symbol_codes[valid]] = np.array(batch_values, dtype=np.float64)[valid]
+    seen[symbol_codes[valid]] = True
+    return values, seen
+
+
+def ingest_attribute(attribute, trading_days, symbol_coder, symbols=None, batch_size=INGEST_BATCH_SIZE,
+                     periods=None):
+    """
+    Stream an attribute from an unbuffered server-side cursor into a (date, symbol) array.
+
+    Args:
+        attribute(string): attribute name
+        trading_days(list): list of date, %Y-%m-%d
+        symbol_coder(SymbolCoder): symbol coder
+        symbols(list): list of symbols to query
+        batch_size(int): rows fetched per batch
+        periods(int or None): number of latest trading days to query, earlier rows are left NaN, all by default
+
+    Returns:
+        tuple: (array of shape (date, symbol), mask of symbols with rows)
+    """
+    date_index = pd.Index(trading_days)
+    query_days = trading_days[max(len(trading_days) - periods, 0):] if periods else trading_days
+    values = np.full((len(trading_days), max(len(symbol_coder), 1)), np.nan)
+    seen = np.zeros(values.shape[1], dtype=bool)
+    with pooled_cursor(cursor_class=SSCursor) as cursor:
+        for sql, params in build_attribute_queries(attribute, symbols=symbols, trading_days=query_days):
+            cursor.execute(sql, params)
+            rows = cursor.fetchmany(batch_size)
+            while rows:
+                values, seen = _fill_batch(values, seen, rows, date_index, symbol_coder)
+                rows = cursor.fetchmany(batch_size)
+    return values, seen
+
+
+def ingest_attributes(symbols=None, trading_days=None, attributes=None, periods=None):
+    """
+    Stream attributes into (date, symbol) arrays sharing integer coded date and symbol axes.
+
+    Symbols without any row in the trading days are dropped, as the long-format loading does.
+
+    Args:
+        symbols(list): list of symbols
+        trading_days(list): list of date, %Y-%m-%d
+        attributes(list): list of attribute name
+        periods(dict): {attribute: number of latest trading days to query}, all trading days by default
+
+    Returns:
+        tuple: ({attribute: numpy.ndarray}, symbols)
+    """
+    attributes = attributes or AVAILABLE_DATA_FIELDS
+    symbol_coder = SymbolCoder(symbols)
+    with ThreadPoolExecutor(MAX_THREADS) as pool:
+        requests = {attribute: pool.submit(ingest_attribute, attribute, trading_days, symbol_coder, symbols,
+                                           periods=(periods or dict()).get(attribute)) for attribute in attributes}
+        responses = {attribute: request.result() for attribute, request in requests.items()}
+    symbols_length = len(symbol_coder)
+    available = np.zeros(symbols_length, dtype=bool)
+    arrays = dict()
+    for attribute, (values, seen) in responses.items():
+        if values.shape[1] < symbols_length:
+            values, seen = _grow(values, seen, symbols_length)
+        arrays[attribute] = values[:, :symbols_length]
+        available |= seen[:symbols_length]
+    if not available.all():
+        arrays = {attribute: values[:, available] for attribute, values in arrays.items()}
+    symbols = [symbol for symbol, flag in zip(symbol_coder.symbols, available) if flag]
+    return arrays, symbols
+
+
+__all__ = [
+    'SymbolCoder',
+    'ingest_attribute',
+    'ingest_attributes'
+]
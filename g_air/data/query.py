@@ -0,0 +1,82 @@
+"""
+# -*- coding: UTF-8 -*-
+# **********************************************************************************#
+#     File: attribute query builder.
+#   Author: Myron
+# **********************************************************************************#
+"""
+from datetime import timedelta
+from ..const import (
+    AVAILABLE_DATA_FIELDS,
+    ATTRIBUTE_COLUMN_MAP,
+    ATTRIBUTE_TABLE_MAP,
+    MAX_QUERY_SYMBOLS
+)
+from ..utils.datetime import normalize_date
+from ..utils.exceptions import Exceptions
+
+
+DATE_TIME_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def date_range_bounds(trading_days):
+    """
+    Half-open bounds of raw 日期 covering trading days.
+
+    Args:
+        trading_days(list): list of date, %Y-%m-%d
+
+    Returns:
+        tuple: (lower bound included, upper bound excluded), %Y-%m-%d %H:%M:%S
+    """
+    start = normalize_date(min(trading_days))
+    end = normalize_date(max(trading_days)) + timedelta(days=1)
+    return start.strftime(DATE_TIME_FORMAT), end.strftime(DATE_TIME_FORMAT)
+
+
+def build_attribute_queries(attribute, symbols=None, trading_days=None, since=None,
+                            chunk_size=MAX_QUERY_SYMBOLS):
+    """
+    Build index friendly, parameterized queries of attribute.
+
+    The date filter is a half-open range predicate on the raw 日期 column, so that an index on it
+    can be used; the exact trading days set has to be applied on the client side. Symbols are bound
+    as parameters and split into chunks of chunk_size.
+
+    Args:
+        attribute(string): attribute name
+        symbols(list): list of symbols
+        trading_days(list): list of date, %Y-%m-%d
+        since(string): only rows with raw 日期 greater than it
+        chunk_size(int): maximum symbols of one query
+
+    Returns:
+        list: list of (sql, params)
+    """
+    assert attribute in AVAILABLE_DATA_FIELDS, Exceptions.INVALID_FIELDS
+    sql = """select 日期,代码,{} from {}""".format(
+        ATTRIBUTE_COLUMN_MAP.get(attribute, attribute), ATTRIBUTE_TABLE_MAP.get(attribute, attribute))
+    conditions, params = list(), list()
+    if trading_days:
+        conditions.append("""日期 >= %s and 日期 < %s""")
+        params.extend(date_range_bounds(trading_days))
+    if since:
+        conditions.append("""日期 > %s""")
+        params.append(since)
+    symbols = list(symbols or list())
+    symbol_chunks = [symbols[index:index + chunk_size] for index in range(0, len(symbols), chunk_size)] or [None]
+    queries = list()
+    for chunk in symbol_chunks:
+        chunk_conditions, chunk_params = list(conditions), list(params)
+        if chunk:
+            chunk_conditions.append("""代码 in ({})""".format(','.join(['%s'] * len(chunk))))
+            chunk_params.extend(chunk)
+        chunk_sql = ' where '.join([sql, ' and '.join(chunk_conditions)]) if chunk_conditions else sql
+        queries.append((chunk_sql, tuple(chunk_params)))
+    return queries
+
+
+__all__ = [
+    'date_range_bounds',
+    'build_attribute_queries'
+]
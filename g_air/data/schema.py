@@ -0,0 +1,236 @@
+"""
+# -*- coding: UTF-8 -*-
+# **********************************************************************************#
+#     File: target schema of indicator tables.
+#   Author: Myron
+# **********************************************************************************#
+"""
+import argparse
+import threading
+import pandas as pd
+from datetime import date, timedelta
+from .api_base import (
+    pooled_cursor,
+    ConnectionType
+)
+from .. import global_configs
+from ..utils.datetime import normalize_date
+from ..const import (
+    TARGET_PARTITION_START,
+    TARGET_PARTITION_END
+)
+
+LEGACY_SUFFIX = '__legacy'
+MIGRATING_SUFFIX = '__typed'
+
+
+def typed_schema_enabled():
+    """
+    Whether new indicator tables are created with the typed schema or not.
+    """
+    return global_configs.get('target_schema', dict()).get('typed', False)
+
+
+def monthly_partitions(start=TARGET_PARTITION_START, end=TARGET_PARTITION_END):
+    """
+    Monthly range partitions of 日期 between start and end, with a last partition for later dates.
+
+    Args:
+        start(string): first month, %Y-%m
+        end(string): month after the last partition, %Y-%m
+
+    Returns:
+        string: partition clause
+    """
+    year, month = map(int, start.split('-'))
+    end_year, end_month = map(int, end.split('-'))
+    partitions = list()
+    while (year, month) < (end_year, end_month):
+        next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+        partitions.append("partition p{:04d}{:02d} values less than ('{}')".format(
+            year, month, date(next_year, next_month, 1).isoformat()))
+        year, month = next_year, next_month
+    partitions.append('partition pmax values less than (maxvalue)')
+    return 'partition by range columns (日期)\n({})'.format(',\n'.join(partitions))
+
+
+def typed_table_sql(table, column=None):
+    """
+    DDL of an indicator table with a DATE 日期, a (日期, 代码) primary key and monthly partitions.
+
+    Args:
+        table(string): table name
+        column(string): value column name, table name by default
+
+    Returns:
+        string: sql
+    """
+    return """
+    create table {}
+    (
+    日期 date not null,
+    代码 varchar(20) not null,
+    简称 varchar(100),
+    {} float,
+    primary key (日期, 代码)
+    )
+    {}
+    """.format(table, column or table, monthly_partitions())
+
+
+def date_range_condition(start_date, end_date):
+    """
+    Sargable condition of 日期 between two dates, both included, for typed and legacy tables alike.
+
+    Args:
+        start_date(string): start date
+        end_date(string): end date
+
+    Returns:
+        tuple: (sql condition with two placeholders, parameters)
+    """
+    start = normalize_date(start_date).strftime('%Y-%m-%d')
+    end = (normalize_date(end_date) + timedelta(days=1)).strftime('%Y-%m-%d')
+    return """日期 >= %s and 日期 < %s""", (start, end)
+
+
+_typed_tables = dict()
+_typed_tables_lock = threading.Lock()
+
+
+def load_table_types():
+    """
+    Load whether the 日期 column of each target table is typed or not, with one schema query.
+
+    Returns:
+        dict: {table: whether typed or not}
+    """
+    with pooled_cursor(ConnectionType.TARGET) as cursor:
+        cursor.execute("""select table_name, data_type from information_schema.columns
+        where table_schema = database() and column_name = '日期'""")
+        return {table: data_type.lower() == 'date' for table, data_type in cursor.fetchall()}
+
+
+def is_typed_table(table):
+    """
+    Whether the 日期 column of a target table is typed or not, cached per process.
+
+    Args:
+        table(string): table name
+
+    Returns:
+        boolean: typed or not
+    """
+    with _typed_tables_lock:
+        if table not in _typed_tables:
+            _typed_tables.update(load_table_types())
+        return _typed_tables.get(table, False)
+
+
+def set_table_type(table, typed=None):
+    """
+    Record the type of a table created or dropped by this process.
+
+    Args:
+        table(string): table name
+        typed(boolean or None): typed or not, None to forget the table
+    """
+    with _typed_tables_lock:
+        if typed is None:
+            _typed_tables.pop(table, None)
+        else:
+            _typed_tables[table] = typed
+
+
+def _copy_month(cursor, table, migrating, month):
+    """
+    Copy the rows of one month of a legacy table into its typed table.
+    """
+    condition, parameters = date_range_condition(
+        month + '-01', (pd.Timestamp(month + '-01') + pd.offsets.MonthEnd(0)).strftime('%Y-%m-%d'))
+    cursor.execute("""insert into {} (日期, 代码, 简称, {})
+    select str_to_date(substr(日期, 1, 10), '%%Y-%%m-%%d'), 代码, 简称, {} from {}
+    where {}
+    on duplicate key update {}=values({})""".format(migrating, table, table, table, condition, table, table),
+                   parameters)
+
+
+def migrate_table(table, drop_legacy=False):
+    """
+    Migrate a legacy varchar 日期 table to the typed schema.
+
+    Rows are copied month by month into a typed table. Both tables are then write locked, the last month
+    is copied again to catch the rows of the latest dates written meanwhile, and the typed table replaces
+    the legacy table, which is kept as table__legacy unless dropped. Rows written to earlier months during
+    the copy are not caught, so backfills of the table must be stopped while it migrates, and other
+    processes must be restarted to see the table typed. Renaming locked tables needs MySQL 8.0.13 or later.
+
+    Args:
+        table(string): table name
+        drop_legacy(boolean): whether to drop the legacy table after migration or not
+    """
+    if is_typed_table(table):
+        print('{} is already typed.'.format(table))
+        return
+    migrating, legacy = table + MIGRATING_SUFFIX, table + LEGACY_SUFFIX
+    with pooled_cursor(ConnectionType.TARGET) as cursor:
+        cursor.execute("""drop table if exists {}""".format(migrating))
+        cursor.execute(typed_table_sql(migrating, column=table))
+        cursor.execute("""select distinct substr(日期, 1, 7) from {}""".format(table))
+        months = sorted(month for month, in cursor.fetchall() if month)
+        for month in months:
+            _copy_month(cursor, table, migrating, month)
+            cursor.connection.commit()
+            print('{} migrated {}.'.format(table, month))
+        cursor.execute("""lock tables {} write, {} write""".format(table, migrating))
+        try:
+            cursor.execute("""select distinct substr(日期, 1, 7) from {} where 日期 >= %s""".format(table),
+                           ((months[-1] if months else TARGET_PARTITION_START) + '-01',))
+            for month, in cursor.fetchall():
+                _copy_month(cursor, table, migrating, month)
+            cursor.execute("""rename table {} to {}, {} to {}""".format(table, legacy, migrating, table))
+            cursor.connection.commit()
+        finally:
+            cursor.execute("""unlock tables""")
+        if drop_legacy:
+            cursor.execute("""drop table {}""".format(legacy))
+    set_table_type(table, True)
+
+
+def main(arguments=None):
+    """
+    Command line entry: python -m g_air.data.schema migrate table [table ...] [--drop-legacy].
+    """
+    parser = argparse.ArgumentParser(description='Target schema of indicator tables.')
+    subparsers = parser.add_subparsers(dest='command')
+    migrate_parser = subparsers.add_parser(
+        'migrate', help='migrate legacy tables to the typed schema',
+        description='Migrate legacy tables to the typed schema. Stop backfills of the tables while they migrate, '
+                    'only rows of the latest month written meanwhile are caught under a write lock, and restart '
+                    'other processes afterwards. Needs MySQL 8.0.13 or later.')
+    migrate_parser.add_argument('tables', nargs='*', help='tables to migrate, all legacy tables by default')
+    migrate_parser.add_argument('--drop-legacy', action='store_true', help='drop legacy tables after migration')
+    arguments = parser.parse_args(arguments)
+    if arguments.command == 'migrate':
+        tables = arguments.tables or sorted(table for table, typed in load_table_types().items() if not typed
+                                            and not table.endswith((LEGACY_SUFFIX, MIGRATING_SUFFIX)))
+        for table in tables:
+            migrate_table(table, drop_legacy=arguments.drop_legacy)
+    else:
+        parser.print_help()
+
+
+__all__ = [
+    'typed_schema_enabled',
+    'monthly_partitions',
+    'typed_table_sql',
+    'date_range_condition',
+    'load_table_types',
+    'is_typed_table',
+    'set_table_type',
+    'migrate_table'
+]
+
+
+if __name__ == '__main__':
+    main()
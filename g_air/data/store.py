@@ -0,0 +1,296 @@
+"""
+# -*- coding: UTF-8 -*-
+# **********************************************************************************#
+#     File: local columnar attribute store.
+#   Author: Myron
+# **********************************************************************************#
+"""
+import os
+import json
+import threading
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from ..const import (
+    MAX_THREADS,
+    STORE_SYNC_INTERVAL
+)
+
+
+DATES_FILE = 'dates.txt'
+SYMBOLS_FILE = 'symbols.txt'
+WATERMARKS_FILE = 'watermarks.json'
+ROWS_ARRAY = '__rows__'
+
+
+def _dump_lines(path, lines):
+    """
+    Dump lines to file atomically.
+
+    Args:
+        path(string): file path
+        lines(list): list of string
+    """
+    temp_path = '{}.tmp'.format(path)
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(lines))
+    os.replace(temp_path, path)
+
+
+def _load_lines(path):
+    """
+    Load lines from file.
+
+    Args:
+        path(string): file path
+
+    Returns:
+        list: list of string
+    """
+    if not os.path.exists(path):
+        return list()
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line for line in f.read().split('\n') if line]
+
+
+class AttributeStore(object):
+    """
+    Local on-disk columnar store of attributes.
+
+    Each attribute is kept as one memory-mapped float64 array of shape (date, symbol), sharing the
+    date and symbol index files of the store. A watermark per attribute records the maximum raw
+    日期 synced from the source, so that a sync only pulls rows newer than it, and one more array marks
+    the (date, symbol) cells the source has rows of, NULL values included.
+    """
+
+    def __init__(self, path, sync_interval=STORE_SYNC_INTERVAL):
+        """
+        Args:
+            path(string): store directory
+            sync_interval(int or None): seconds after a sync during which dates past the watermark of an
+                attribute are taken as not yet in the source, None to sync them on every call
+        """
+        self.path = path
+        self.sync_interval = sync_interval
+        self.synced_times = dict()
+        if not os.path.exists(path):
+            os.makedirs(path)
+        self.dates = _load_lines(os.path.join(path, DATES_FILE))
+        self.symbols = _load_lines(os.path.join(path, SYMBOLS_FILE))
+        watermarks_path = os.path.join(path, WATERMARKS_FILE)
+        if os.path.exists(watermarks_path):
+            with open(watermarks_path, 'r', encoding='utf-8') as f:
+                self.watermarks = json.load(f)
+        else:
+            self.watermarks = dict()
+        self.date_index = {date: index for index, date in enumerate(self.dates)}
+        self.symbol_index = {symbol: index for index, symbol in enumerate(self.symbols)}
+        self._lock = threading.RLock()
+
+    def _file(self, attribute):
+        """
+        Array file path of attribute.
+        """
+        return os.path.join(self.path, '{}.dat'.format(attribute))
+
+    def _array(self, attribute, mode='r'):
+        """
+        Memory-mapped array of attribute.
+
+        Args:
+            attribute(string): attribute name
+            mode(string): memmap mode
+
+        Returns:
+            numpy.memmap or None: array of shape (date, symbol)
+        """
+        if not os.path.exists(self._file(attribute)) or not self.dates or not self.symbols:
+            return None
+        return np.memmap(self._file(attribute), dtype=np.float64, mode=mode,
+                         shape=(len(self.dates), len(self.symbols)))
+
+    def _dump_meta(self):
+        """
+        Dump index files and watermarks.
+        """
+        _dump_lines(os.path.join(self.path, DATES_FILE), self.dates)
+        _dump_lines(os.path.join(self.path, SYMBOLS_FILE), self.symbols)
+        temp_path = os.path.join(self.path, '{}.tmp'.format(WATERMARKS_FILE))
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.watermarks, f)
+        os.replace(temp_path, os.path.join(self.path, WATERMARKS_FILE))
+
+    def _extend_axes(self, dates, symbols):
+        """
+        Extend date and symbol axes of all attribute arrays.
+
+        New dates later than the stored ones are appended in place, any other change of the axes
+        rewrites the arrays once.
+
+        Args:
+            dates(iterable): dates to be included
+            symbols(iterable): symbols to be included
+        """
+        new_dates = sorted(set(dates) - set(self.date_index))
+        new_symbols = sorted(set(symbols) - set(self.symbol_index))
+        if not new_dates and not new_symbols:
+            return
+        attributes = [attribute for attribute in list(self.watermarks) + [ROWS_ARRAY]
+                      if os.path.exists(self._file(attribute))]
+        if not new_symbols and (not self.dates or new_dates[0] > self.dates[-1]):
+            for attribute in attributes:
+                with open(self._file(attribute), 'ab') as f:
+                    np.full((len(new_dates), len(self.symbols)), np.nan).tofile(f)
+            self.dates = self.dates + new_dates
+        else:
+            all_dates = sorted(self.dates + new_dates)
+            all_symbols = self.symbols + new_symbols
+            date_positions = np.searchsorted(all_dates, self.dates)
+            for attribute in attributes:
+                origin = self._array(attribute)
+                temp_path = '{}.tmp'.format(self._file(attribute))
+                target = np.memmap(temp_path, dtype=np.float64, mode='w+', shape=(len(all_dates), len(all_symbols)))
+                target[:] = np.nan
+                if origin is not None:
+                    target[date_positions, :len(self.symbols)] = origin
+                target.flush()
+                del origin, target
+                os.replace(temp_path, self._file(attribute))
+            self.dates = all_dates
+            self.symbols = all_symbols
+        self.date_index = {date: index for index, date in enumerate(self.dates)}
+        self.symbol_index = {symbol: index for index, symbol in enumerate(self.symbols)}
+
+    def _initialize_rows(self):
+        """
+        Create the rows array, marking the non NaN cells of the attributes synced before it existed.
+        """
+        rows = np.full((len(self.dates), len(self.symbols)), np.nan)
+        for attribute in self.watermarks:
+            array = self._array(attribute)
+            if array is not None:
+                rows[~np.isnan(array)] = 1.
+            del array
+        rows.tofile(self._file(ROWS_ARRAY))
+
+    def watermark(self, attribute):
+        """
+        Maximum raw 日期 synced of attribute.
+
+        Args:
+            attribute(string): attribute name
+
+        Returns:
+            string or None: watermark
+        """
+        return self.watermarks.get(attribute)
+
+    def covers(self, attribute, trading_days):
+        """
+        Whether the store covers trading days of attribute or not, trading days past the watermark are
+        covered within sync_interval seconds of the last sync of attribute, as the source had no rows
+        of them then.
+
+        Args:
+            attribute(string): attribute name
+            trading_days(list): list of date, %Y-%m-%d
+
+        Returns:
+            boolean: covered or not
+        """
+        watermark = self.watermark(attribute)
+        if watermark is None or not trading_days:
+            return False
+        if max(trading_days) <= watermark[:10]:
+            return True
+        synced_time = self.synced_times.get(attribute)
+        return synced_time is not None and self.sync_interval is not None and \
+            (datetime.now() - synced_time).total_seconds() <= self.sync_interval
+
+    def write(self, attribute, rows):
+        """
+        Write source rows of attribute into the store.
+
+        Args:
+            attribute(string): attribute name
+            rows(list): list of (日期, 代码, value)
+        """
+        with self._lock:
+            if not rows:
+                return
+            raw_dates, symbols, values = zip(*rows)
+            dates = [raw_date.split(' ')[0] for raw_date in raw_dates]
+            self._extend_axes(dates, symbols)
+            if not os.path.exists(self._file(attribute)):
+                np.full((len(self.dates), len(self.symbols)), np.nan).tofile(self._file(attribute))
+            array = self._array(attribute, mode='r+')
+            date_positions = np.fromiter((self.date_index[date] for date in dates), dtype=np.int64, count=len(dates))
+            symbol_positions = np.fromiter(
+                (self.symbol_index[symbol] for symbol in symbols), dtype=np.int64, count=len(symbols))
+            array[date_positions, symbol_positions] = np.array(values, dtype=np.float64)
+            array.flush()
+            if not os.path.exists(self._file(ROWS_ARRAY)):
+                self._initialize_rows()
+            rows_array = self._array(ROWS_ARRAY, mode='r+')
+            rows_array[date_positions, symbol_positions] = 1.
+            rows_array.flush()
+            del array, rows_array
+            self.watermarks[attribute] = max(max(raw_dates), self.watermarks.get(attribute, ''))
+            self._dump_meta()
+
+    def sync(self, attributes, fetcher):
+        """
+        Incrementally sync attributes from the source.
+
+        Args:
+            attributes(list): list of attribute name
+            fetcher(function): fetcher(attribute, watermark) returning rows newer than watermark
+        """
+        with ThreadPoolExecutor(MAX_THREADS) as pool:
+            requests = {pool.submit(fetcher, attribute, self.watermark(attribute)): attribute
+                        for attribute in attributes}
+            for request in as_completed(requests):
+                self.write(requests[request], request.result())
+                self.synced_times[requests[request]] = datetime.now()
+
+    def load(self, symbols=None, trading_days=None, attributes=None):
+        """
+        Load attributes data from the store, on the symbols with source rows in trading days.
+
+        Args:
+            symbols(list): list of symbols
+            trading_days(list): list of date, %Y-%m-%d
+            attributes(list): list of attribute name
+
+        Returns:
+            dict: {attribute: DataFrame}
+        """
+        with self._lock:
+            trading_days = list(trading_days or self.dates)
+            symbols = [symbol for symbol in (symbols or self.symbols) if symbol in self.symbol_index]
+            date_positions = np.array([self.date_index.get(date, -1) for date in trading_days], dtype=np.int64)
+            symbol_positions = np.array([self.symbol_index[symbol] for symbol in symbols], dtype=np.int64)
+            valid_dates = date_positions >= 0
+            result = dict()
+            available = np.zeros(len(symbols), dtype=bool)
+            rows_array = self._array(ROWS_ARRAY)
+            if rows_array is not None and len(symbols):
+                available = ~np.isnan(rows_array[date_positions[valid_dates]][:, symbol_positions]).all(axis=0)
+            for attribute in attributes or list(self.watermarks):
+                values = np.full((len(trading_days), len(symbols)), np.nan)
+                array = self._array(attribute)
+                if array is not None and len(symbols):
+                    values[valid_dates] = array[date_positions[valid_dates]][:, symbol_positions]
+                if rows_array is None:
+                    available |= ~np.isnan(values).all(axis=0)
+                result[attribute] = values
+            columns = [symbol for symbol, flag in zip(symbols, available) if flag]
+            for attribute, values in result.items():
+                result[attribute] = pd.DataFrame(values[:, available], index=trading_days, columns=columns)
+        return result
+
+
+__all__ = [
+    'AttributeStore'
+]
@@ -0,0 +1,210 @@
+"""
+# -*- coding: UTF-8 -*-
+# **********************************************************************************#
+#     File: bulk writer of calculated indicators.
+#   Author: Myron
+# **********************************************************************************#
+"""
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from collections import OrderedDict
+from .api_base import (
+    get_connection,
+    pooled_cursor,
+    ConnectionType
+)
+from .database_api import (
+    ensure_tables,
+    update_table
+)
+from .schema import (
+    date_range_condition,
+    is_typed_table
+)
+from ..const import (
+    MAX_WRITERS,
+    WRITE_CHUNK_SIZE
+)
+
+
+def table_name(indicator):
+    """
+    Target table of an indicator, M2B(n) --> m2b.
+    """
+    return indicator.strip('(n)').lower()
+
+
+def build_rows(frame, symbols_name_map=None, typed=False, mask=None):
+    """
+    Build the (日期, 代码, 简称, value) rows of an indicator frame, NaN cells dropped.
+
+    Args:
+        frame(DataFrame): indicator frame of (date, symbol)
+        symbols_name_map(dict): {symbol: name}, names default to symbols
+        typed(boolean): whether 日期 is a DATE column or a legacy '%Y-%m-%d 00:00:00' varchar
+        mask(numpy.ndarray): boolean (date, symbol) mask of the cells to keep, all cells by default
+
+    Returns:
+        DataFrame: rows with columns date, symbol, name and value
+    """
+    symbols_name_map = symbols_name_map or dict()
+    values = np.asarray(frame.values, dtype=np.float64)
+    keep = ~np.isnan(values) if mask is None else ~np.isnan(values) & mask
+    date_positions, symbol_positions = np.nonzero(keep)
+    date_format = '{}' if typed else '{} 00:00:00'
+    dates = np.asarray([date_format.format(date) for date in frame.index], dtype=object)
+    symbols = np.asarray(frame.columns, dtype=object)
+    names = np.asarray([symbols_name_map.get(symbol, symbol) for symbol in frame.columns], dtype=object)
+    return pd.DataFrame({
+        'date': dates[date_positions],
+        'symbol': symbols[symbol_positions],
+        'name': names[symbol_positions],
+        'value': values[date_positions, symbol_positions]})
+
+
+def load_existing(table, frame):
+    """
+    Load the values of an indicator table on the dates and symbols of a frame.
+
+    Args:
+        table(string): table name
+        frame(DataFrame): indicator frame of (date, symbol)
+
+    Returns:
+        tuple: (float array of existing values, boolean array of existing cells), both of the shape of frame
+    """
+    existing = np.full(frame.shape, np.nan)
+    known = np.zeros(frame.shape, dtype=bool)
+    if frame.empty:
+        return existing, known
+    condition, parameters = date_range_condition(min(frame.index), max(frame.index))
+    with pooled_cursor(ConnectionType.TARGET) as cursor:
+        cursor.execute("""select 日期, 代码, {} from {} where {}""".format(table, table, condition), parameters)
+        rows = cursor.fetchall()
+    if not rows:
+        return existing, known
+    dates, symbols, values = zip(*rows)
+    date_positions = pd.Index(frame.index).get_indexer([str(date)[:10] for date in dates])
+    symbol_positions = pd.Index(frame.columns).get_indexer(list(symbols))
+    valid = (date_positions >= 0) & (symbol_positions >= 0)
+    values = np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+    existing[date_positions[valid], symbol_positions[valid]] = values[valid]
+    known[date_positions[valid], symbol_positions[valid]] = True
+    return existing, known
+
+
+def diff_cells(frame, existing, known):
+    """
+    Compare calculated cells with existing cells at the single precision of the target FLOAT columns.
+
+    Args:
+        frame(DataFrame): indicator frame of (date, symbol)
+        existing(numpy.ndarray): existing values
+        known(numpy.ndarray): existing cells
+
+    Returns:
+        tuple: (boolean mask of new cells, boolean mask of changed cells, number of unchanged cells)
+    """
+    values = np.asarray(frame.values, dtype=np.float64)
+    valid = ~np.isnan(values)
+    new = valid & ~known
+    same = np.asarray(values, dtype=np.float32) == np.asarray(existing, dtype=np.float32)
+    changed = valid & known & ~same
+    return new, changed, int((valid & known & same).sum())
+
+
+def upsert_rows(table, rows, chunk_size=WRITE_CHUNK_SIZE, writers=1):
+    """
+    Upsert rows into an indicator table, one transaction per chunk of rows.
+
+    Args:
+        table(string): table name
+        rows(DataFrame): rows built by build_rows
+        chunk_size(int): number of rows of a transaction
+        writers(int): number of pooled connections writing chunks in parallel
+    """
+    items = list(zip(rows['date'], rows['symbol'], rows['name'], rows['value'].tolist()))
+    update_table(table, items, batch_size=chunk_size, writers=writers)
+
+
+def load_rows(table, rows):
+    """
+    Replace rows into an indicator table with LOAD DATA LOCAL INFILE from a temporary file.
+
+    Args:
+        table(string): table name
+        rows(DataFrame): rows built by build_rows
+    """
+    descriptor, path = tempfile.mkstemp(suffix='.tsv')
+    os.close(descriptor)
+    connection = get_connection(ConnectionType.TARGET, local_infile=True)
+    try:
+        rows.to_csv(path, sep='\t', header=False, index=False, encoding='utf-8', lineterminator='\n')
+        with connection.cursor() as cursor:
+            cursor.execute("""load data local infile '{}' replace into table {} character set utf8mb4
+            fields terminated by '\\t' lines terminated by '\\n'
+            (日期,代码,简称,{})""".format(path.replace('\\', '/'), table, table))
+        connection.commit()
+    finally:
+        connection.close()
+        os.remove(path)
+
+
+def write_indicator_cube(cube, indicators=None, symbols_name_map=None, method='insert', chunk_size=WRITE_CHUNK_SIZE,
+                         writers=MAX_WRITERS):
+    """
+    Write indicators of a cube to their target tables, missing tables are created once up front.
+
+    Args:
+        cube(IndicatorCube): calculated cube
+        indicators(list): list of indicator name, all indicators of cube by default
+        symbols_name_map(dict): {symbol: name}
+        method(string): 'insert' for chunked upserts, 'load_data' for LOAD DATA LOCAL INFILE, 'diff' for
+            chunked upserts of the new and changed cells only
+        chunk_size(int): number of rows of a transaction of upserts
+        writers(int): number of pooled connections writing chunks of upserts in parallel
+
+    Returns:
+        OrderedDict: {indicator: {'written': rows written, 'new': new rows, 'changed': changed rows,
+            'unchanged': unchanged rows}}, new, changed and unchanged rows are None unless method is 'diff'
+    """
+    assert method in ('insert', 'load_data', 'diff'), 'Invalid write method {}.'.format(method)
+    indicators = list(indicators or cube.indicators)
+    ensure_tables([table_name(indicator) for indicator in indicators])
+    counts = OrderedDict()
+    for indicator in indicators:
+        frame = cube[indicator]
+        table = table_name(indicator)
+        skipped = int(np.isnan(frame.values).sum())
+        if skipped:
+            print('{} skipped {} NaN cells.'.format(indicator, skipped))
+        mask = None
+        counts[indicator] = {'written': 0, 'new': None, 'changed': None, 'unchanged': None}
+        if method == 'diff':
+            new, changed, unchanged = diff_cells(frame, *load_existing(table, frame))
+            mask = new | changed
+            counts[indicator].update(new=int(new.sum()), changed=int(changed.sum()), unchanged=unchanged)
+            print('{}: {} new, {} changed, {} unchanged rows.'.format(
+                indicator, counts[indicator]['new'], counts[indicator]['changed'], unchanged))
+        rows = build_rows(frame, symbols_name_map, typed=is_typed_table(table), mask=mask)
+        if len(rows) == 0:
+            continue
+        if method == 'load_data':
+            load_rows(table, rows)
+        else:
+            upsert_rows(table, rows, chunk_size=chunk_size, writers=writers)
+        counts[indicator]['written'] = len(rows)
+    return counts
+
+
+__all__ = [
+    'table_name',
+    'build_rows',
+    'load_existing',
+    'diff_cells',
+    'upsert_rows',
+    'load_rows',
+    'write_indicator_cube'
+]
@@ -56,6 +56,8 @@ class Exceptions(BaseExceptions):
     Enumerate exceptions.
     """
     INVALID_FIELDS = DataException(error_wrapper(500, 'There exits invalid fields.'))
+    INVALID_INDICATORS = DataException(error_wrapper(500, 'There exits invalid indicators.'))
+    MISMATCHED_CHECKPOINT = DataException(error_wrapper(500, 'The checkpoint belongs to another backfill job.'))
 
 
 __all__ = [
@@ -0,0 +1,79 @@
+"""
+# -*- coding: UTF-8 -*-
+# **********************************************************************************#
+#     File: Test checkpointed backfill.
+#   Author: Myron
+# **********************************************************************************#
+"""
+import os
+import shutil
+import tempfile
+from unittest import TestCase
+from unittest import mock
+from g_air import backfill
+from g_air.backfill import *
+from g_air.utils.exceptions import DataException
+
+
+class TestBackfill(TestCase):
+
+    def setUp(self):
+        """
+        initialize set up.
+        """
+        self.path = tempfile.mkdtemp()
+        self.checkpoint_path = os.path.join(self.path, 'checkpoint.json')
+        self.dates = ['2018-12-{:02d}'.format(day) for day in range(3, 13)]
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_split_windows(self):
+        """
+        Test windows of consecutive dates.
+        """
+        windows = split_windows(list(reversed(self.dates)), 4)
+        self.assertEqual([len(window) for window in windows], [4, 4, 2])
+        self.assertEqual(windows[0][0], '2018-12-03')
+
+    def test_resume(self):
+        """
+        Test a failed run resumes from the windows it did not complete.
+        """
+        calculated = list()
+
+        def _calculate(symbols, target_date_range, indicators, **kwargs):
+            if target_date_range[0] == '2018-12-07' and len(calculated) < 3:
+                calculated.append(None)
+                raise IOError('Connection lost.')
+            calculated.append(target_date_range[0])
+
+        with mock.patch.object(backfill, 'calculate_indicators_of_date_range', _calculate):
+            with self.assertRaises(IOError):
+                run_backfill(['000001.SZ'], self.dates, window_periods=4, checkpoint_path=self.checkpoint_path)
+            completed = BackfillCheckpoint(self.checkpoint_path).completed
+            self.assertIn('2018-12-03~2018-12-06', completed)
+            self.assertNotIn('2018-12-07~2018-12-10', completed)
+            windows = run_backfill(['000001.SZ'], self.dates, window_periods=4, max_workers=2,
+                                   checkpoint_path=self.checkpoint_path)
+        self.assertIn('2018-12-07', [window[0] for window in windows])
+        self.assertNotIn('2018-12-03', [window[0] for window in windows])
+        self.assertEqual(len(BackfillCheckpoint(self.checkpoint_path).completed), 3)
+
+    def test_job_identity(self):
+        """
+        Test the checkpoint of another job is refused and jobs default to their own checkpoint files.
+        """
+        with mock.patch.object(backfill, 'calculate_indicators_of_date_range', lambda **kwargs: None):
+            run_backfill(['000001.SZ'], self.dates, window_periods=4, checkpoint_path=self.checkpoint_path)
+            with self.assertRaises(DataException):
+                run_backfill(['000002.SZ'], self.dates, window_periods=4, checkpoint_path=self.checkpoint_path)
+            windows = run_backfill(['000001.SZ'], self.dates, indicators='ZQ(n)', window_periods=4,
+                                   checkpoint_path=self.checkpoint_path, reset=True)
+        self.assertEqual(len(windows), 3)
+        job = job_identity(['000002.SZ', '000001.SZ'], window_periods=4)
+        self.assertEqual(job['symbols'], ['000001.SZ', '000002.SZ'])
+        same_job = job_identity(['000001.SZ', '000002.SZ'], window_periods=4)
+        other_job = job_identity(['000001.SZ'], window_periods=4)
+        self.assertEqual(default_checkpoint_path(job), default_checkpoint_path(same_job))
+        self.assertNotEqual(default_checkpoint_path(job), default_checkpoint_path(other_job))
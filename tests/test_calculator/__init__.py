@@ -5,3 +5,35 @@
 #   Author: Myron
 # **********************************************************************************#
 """
+import numpy as np
+import pandas as pd
+from g_air.const import AVAILABLE_DATA_FIELDS
+
+SYMBOLS = ['000001.SZ', '000002.SZ', '600000.SH']
+
+
+def make_attribute_frames(seed, periods=90, scale=3, decimals=1, nan_rate=0., symbols=None):
+    """
+    Synthetic attribute frames of business dates from 2018-01-01, rounded random values with NaN cells.
+
+    Args:
+        seed(int): seed of random state
+        periods(int): number of dates
+        scale(float): scale of standard normal values
+        decimals(int): decimals of rounded values
+        nan_rate(float): probability of a NaN cell
+        symbols(list): list of symbols, SYMBOLS by default
+
+    Returns:
+        tuple: (list of dates, list of symbols, {attribute: DataFrame of (date, symbol)})
+    """
+    random_state = np.random.RandomState(seed)
+    dates = [str(date.date()) for date in pd.bdate_range('2018-01-01', periods=periods)]
+    symbols = list(symbols or SYMBOLS)
+    data = dict()
+    for attribute in AVAILABLE_DATA_FIELDS:
+        values = np.round(random_state.randn(len(dates), len(symbols)) * scale, decimals)
+        if nan_rate:
+            values[random_state.rand(*values.shape) < nan_rate] = np.nan
+        data[attribute] = pd.DataFrame(values, index=dates, columns=symbols)
+    return dates, symbols, data
@@ -0,0 +1,70 @@
+"""
+# -*- coding: UTF-8 -*-
+# **********************************************************************************#
+#     File: Test indicator formula language.
+#   Author: Myron
+# **********************************************************************************#
+"""
+import numpy as np
+from unittest import TestCase
+from tests.test_calculator import make_attribute_frames
+from g_air.calculator import factors, signals
+from g_air.calculator.formula import *
+from g_air.const import INDICATOR_FIELDS
+
+
+class TestFormula(TestCase):
+
+    def setUp(self):
+        """
+        initialize set up.
+        """
+        self.dates, self.symbols, self.data = make_attribute_frames(3, nan_rate=0.05)
+
+    def test_identical_to_per_date_signals(self):
+        """
+        Test compiled formulas are identical to the per-date factors and signals.
+        """
+        matrices = calculate_indicator_matrices(self.data)
+        self.assertEqual(list(matrices), INDICATOR_FIELDS)
+        functions = dict()
+        for indicator in INDICATOR_FIELDS:
+            name = indicator[:-len('(n)')].lower()
+            functions[indicator] = getattr(factors, 'calculate_factor_{}'.format(name), None) or getattr(
+                signals, 'calculate_signal_{}'.format(name[:-1] if name in ('ms', 'ws', 'ds') else name))
+        for target_date in self.dates[-2:]:
+            for indicator, calculate in functions.items():
+                expected = calculate(target_date=target_date, data=self.data).reindex(self.symbols)
+                np.testing.assert_array_equal(matrices[indicator].loc[target_date].values,
+                                              expected.values.astype(np.float64))
+
+    def test_common_subexpressions(self):
+        """
+        Test common subexpressions and nested lags are shared.
+        """
+        formulas = FormulaSet('A = SCDD + TID\nB = (SCDD + TID)[-1] + A[-1]\nC = A[-1][-2] - SCDD[-3]')
+        self.assertEqual(sum(1 for node in formulas.nodes if node[0] == 'lag'), 3)
+        source = formulas.compile(['B']).source
+        self.assertEqual(source.count('shift_rows'), 1)
+        result = formulas.compile(['A', 'B']).evaluate(self.data)
+        np.testing.assert_array_equal(result['B(n)'].values[1:], 2 * result['A(n)'].values[:-1])
+        self.assertTrue(np.isnan(result['B(n)'].values[0]).all())
+
+    def test_invalid_formulas(self):
+        """
+        Test invalid formulas are rejected.
+        """
+        for text in ['A = UNKNOWN + 1', 'A = SCDD[1]', 'A = lsum(SCDD, TID)', 'A = SCDD ** 2', 'SCDD + 1']:
+            with self.assertRaises(FormulaError):
+                FormulaSet(text)
+
+    def test_versions(self):
+        """
+        Test versions only change with the computation of an indicator.
+        """
+        versions = formula_versions()
+        self.assertEqual(list(versions), INDICATOR_FIELDS)
+        formulas = FormulaSet('A = SCDD + TID\nB = (SCDD + TID) * 2\nC = SCDD + TIW')
+        self.assertEqual(formulas.version('A'), FormulaSet('A = (SCDD + TID)').version('A'))
+        self.assertNotEqual(formulas.version('A'), formulas.version('C'))
+        self.assertEqual(FormulaSet().version('Q'), versions['Q(n)'])
@@ -0,0 +1,39 @@
+"""
+# -*- coding: UTF-8 -*-
+# **********************************************************************************#
+#     File: Test table driven graders.
+#   Author: Myron
+# **********************************************************************************#
+"""
+import numpy as np
+import pandas as pd
+from unittest import TestCase
+from g_air.calculator.graders import *
+
+
+class TestGraders(TestCase):
+
+    def test_signal_grader_edges(self):
+        """
+        Test scores on and around the interval edges.
+        """
+        values = pd.Series([-9.5, -9, -8.5, -5, -4.9, 3, 3.1, 4, 5, 5.1, np.nan], index=list('abcdefghijk'))
+        scores = SIGNAL_GRADER.grade(values)
+        self.assertEqual(list(scores.index), list(values.index))
+        self.assertEqual(list(scores), [5, 5, 4, 1, 0, 0, -1, -1, -2, -3, 0])
+
+    def test_left_closed_grader(self):
+        """
+        Test left closed bins.
+        """
+        grader = Grader(edges=[0, 1], scores=[-1, 0, 1], right=False, default=9)
+        np.testing.assert_array_equal(grader.grade(np.array([-0.5, 0, 0.5, 1, np.nan])), [-1, 0, 0, 1, 9])
+
+    def test_grade_frame(self):
+        """
+        Test grading a (date, symbol) frame in one call.
+        """
+        frame = pd.DataFrame([[6, -10], [np.nan, 0]], index=['2018-12-03', '2018-12-04'], columns=['a', 'b'])
+        scores = SIGNAL_GRADER.grade(frame)
+        self.assertEqual(scores.values.tolist(), [[-3, 5], [0, 0]])
+        self.assertEqual(list(scores.columns), ['a', 'b'])
@@ -0,0 +1,87 @@
+"""
+# -*- coding: UTF-8 -*-
+# **********************************************************************************#
+#     File: Test incremental end-of-day update.
+#   Author: Myron
+# **********************************************************************************#
+"""
+import os
+import shutil
+import tempfile
+import numpy as np
+from unittest import TestCase
+from unittest import mock
+from tests.test_calculator import make_attribute_frames
+from g_air import api
+from g_air.calculator.formula import calculate_indicator_matrices
+from g_air.calculator.incremental import *
+from g_air.calculator.planner import plan_lookbacks
+
+
+class TestIncremental(TestCase):
+
+    def setUp(self):
+        """
+        initialize set up.
+        """
+        self.dates, self.symbols, self.data = make_attribute_frames(2, scale=1)
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_state_requirements(self):
+        """
+        Test rows of history are the planned lookbacks of the compiled formulas.
+        """
+        state = IncrementalState(None, dict())
+        self.assertEqual(state.requirements, plan_lookbacks())
+        self.assertEqual(IncrementalState(None, dict(), ['D4(n)']).attributes,
+                         ['cadd', 'scdh1', 'scdh2', 'scdh3', 'scdh4', 'scdd', 'tid'])
+
+    def test_update(self):
+        """
+        Test daily updates are identical to full window calculations.
+        """
+        window = {attribute: frame.iloc[:86] for attribute, frame in self.data.items()}
+        state, _ = IncrementalState.from_data(window)
+        self.assertEqual(state.date, self.dates[85])
+        matrices = calculate_indicator_matrices(self.data)
+        state_path = os.path.join(self.path, 'state.pkl')
+        for target_date in self.dates[86:]:
+            state.save(state_path)
+            state = IncrementalState.load(state_path)
+            rows = {attribute: frame.loc[[target_date]] for attribute, frame in self.data.items()}
+            indicators = state.update(target_date, rows)
+            for indicator, matrix in matrices.items():
+                np.testing.assert_array_equal(indicators[indicator].values, matrix.loc[target_date].values)
+        self.assertEqual(len(state.history['scdm'].index), plan_lookbacks()['scdm'])
+        self.assertEqual(state.history['scdm'].index[-1], self.dates[-1])
+
+    def test_state_of_other_symbols(self):
+        """
+        Test a state built for other symbols is rebuilt rather than updated.
+        """
+        calendar = mock.MagicMock()
+        calendar.offset.side_effect = lambda date, offset: self.dates[self.dates.index(date) + offset]
+
+        def _load_planned_cube(symbols, target_date, indicators=None):
+            end = self.dates.index(target_date) + 1
+            return {attribute: frame.iloc[:end][list(symbols)] for attribute, frame in self.data.items()}
+
+        def _load_attributes_cube(symbols, target_dates, attributes=None):
+            return {attribute: self.data[attribute].loc[target_dates, list(symbols)] for attribute in attributes}
+
+        configs = {'incremental_state': {'path': os.path.join(self.path, 'state.pkl')}}
+        with mock.patch.object(api, 'global_configs', configs), \
+                mock.patch.object(api, 'get_trading_calendar', lambda: calendar), \
+                mock.patch.object(api, '_load_planned_cube', side_effect=_load_planned_cube) as load_planned, \
+                mock.patch.object(api, 'load_attributes_cube', side_effect=_load_attributes_cube):
+            api._calculate_indicators_incrementally(self.symbols[:2], self.dates[85], ['ZQ(n)'])
+            result = api._calculate_indicators_incrementally(self.symbols, self.dates[86], ['ZQ(n)'])
+            self.assertEqual(load_planned.call_count, 2)
+            api._calculate_indicators_incrementally(self.symbols, self.dates[87], ['ZQ(n)'])
+            self.assertEqual(load_planned.call_count, 2)
+        expected = calculate_indicator_matrices(self.data)['ZQ(n)'].loc[self.dates[86]]
+        self.assertEqual(list(result['ZQ(n)'].index), self.symbols)
+        np.testing.assert_array_equal(result['ZQ(n)'].values, expected.values)
@@ -0,0 +1,30 @@
+"""
+# -*- coding: UTF-8 -*-
+# **********************************************************************************#
+#     File: Test array kernels.
+#   Author: Myron
+# **********************************************************************************#
+"""
+import numpy as np
+from unittest import TestCase
+from g_air.calculator.kernels import *
+
+
+class TestKernels(TestCase):
+
+    def test_shift_rows(self):
+        """
+        Test shifted rows are NaN padded without enough history.
+        """
+        values = np.arange(4, dtype=np.float64).reshape(4, 1)
+        np.testing.assert_array_equal(shift_rows(values, 1), [[np.nan], [0.], [1.], [2.]])
+        np.testing.assert_array_equal(shift_rows(values, 5), [[np.nan], [np.nan], [np.nan], [np.nan]])
+        self.assertIs(shift_rows(values, 0), values)
+
+    def test_rolling_sum(self):
+        """
+        Test rolling sums of NaN padded windows.
+        """
+        values = np.array([[1.], [2.], [4.], [8.]])
+        np.testing.assert_array_equal(rolling_sum(values, 3), [[np.nan], [np.nan], [7.], [14.]])
+        np.testing.assert_array_equal(rolling_sum(values, 1), values)
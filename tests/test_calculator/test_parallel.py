@@ -0,0 +1,73 @@
+"""
+# -*- coding: UTF-8 -*-
+# **********************************************************************************#
+#     File: Test parallel date range calculation.
+#   Author: Myron
+# **********************************************************************************#
+"""
+import numpy as np
+from unittest import TestCase
+from unittest import mock
+from tests.test_calculator import make_attribute_frames
+from g_air.calculator.formula import calculate_indicator_matrices
+from g_air.calculator.parallel import *
+from g_air.calculator.parallel import _attached_task
+from g_air.core.shared import SharedArray
+
+
+class TestParallel(TestCase):
+
+    def setUp(self):
+        """
+        initialize set up.
+        """
+        self.dates, self.symbols, self.data = make_attribute_frames(4, periods=120, symbols=['600000.SH', '000001.SZ', '000002.SZ'])
+
+    def test_identical_to_serial(self):
+        """
+        Test parallel blocks are identical to one serial evaluation.
+        """
+        target_dates = self.dates[10:] + ['2019-01-01']
+        cube = calculate_indicator_cube_in_parallel(self.data, target_dates, ['ZQ(n)', 'M1(n)'], processes=3)
+        self.assertEqual(cube.symbols, sorted(self.symbols))
+        matrices = calculate_indicator_matrices(self.data, ['ZQ(n)', 'M1(n)'])
+        for indicator, matrix in matrices.items():
+            expected = matrix.reindex(index=target_dates, columns=cube.symbols).values
+            np.testing.assert_array_equal(cube[indicator].values, expected)
+
+    def test_slot_shards(self):
+        """
+        Test symbol shards on the warm pool are identical to the compiled formulas.
+        """
+        target_date = self.dates[-1]
+        cube = calculate_indicator_slot_in_parallel(self.data, target_date, processes=2, shard_size=2)
+        pool = get_worker_pool()
+        executor = pool.executor
+        expected = calculate_indicator_matrices(self.data)
+        for indicator, matrix in expected.items():
+            np.testing.assert_array_equal(cube[indicator].values[0], matrix.loc[target_date, cube.symbols].values)
+        calculate_indicator_slot_in_parallel(self.data, target_date, ['Q(n)'], shard_size=2)
+        self.assertIs(get_worker_pool().executor, executor)
+
+    def test_attached_task_releases_arrays(self):
+        """
+        Test task arrays are closed after a failed task and its error surfaces.
+        """
+        attached = list()
+        attach = SharedArray.attach
+
+        def _attach(name, shape):
+            attached.append(attach(name, shape))
+            return attached[-1]
+
+        @_attached_task
+        def _failing_task(inputs, outputs):
+            view = inputs[1:]
+            raise ValueError(view.shape)
+
+        with SharedArray.from_array(np.zeros((3, 2))) as shared_input, SharedArray.create((1,)) as shared_output, \
+                mock.patch.object(SharedArray, 'attach', staticmethod(_attach)):
+            with self.assertRaises(ValueError):
+                _failing_task((shared_input.name, (3, 2)), (shared_output.name, (1,)))
+        self.assertEqual(len(attached), 2)
+        self.assertTrue(all(item.array is None for item in attached))
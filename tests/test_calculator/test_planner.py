@@ -0,0 +1,30 @@
+"""
+# -*- coding: UTF-8 -*-
+# **********************************************************************************#
+#     File: Test lookback planning.
+#   Author: Myron
+# **********************************************************************************#
+"""
+from unittest import TestCase
+from g_air.calculator.planner import *
+
+
+class TestPlanner(TestCase):
+
+    def test_plan_lookbacks(self):
+        """
+        Test lookbacks follow the cumulative lags of the dependency graph.
+        """
+        lookbacks = plan_lookbacks()
+        self.assertEqual(lookbacks['scdm'], 64)
+        self.assertEqual(lookbacks['tid'], 5)
+        self.assertEqual(lookbacks['adj_close_price'], 24)
+        self.assertNotIn('adj_open_price', lookbacks)
+        self.assertEqual(plan_lookbacks(['Q(n)']), {'cadq': 0, 'scdm': 40, 'scdq': 0, 'tiq': 0})
+        self.assertEqual(plan_lookbacks(['D2L(n)'])['scdd'], 9)
+
+    def test_plan_periods(self):
+        """
+        Test periods to load include the target dates.
+        """
+        self.assertEqual(plan_periods({'scdm': 40, 'tiq': 0}, target_periods=3), {'scdm': 43, 'tiq': 3})
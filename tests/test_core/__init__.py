@@ -0,0 +1,7 @@
+"""
+# -*- coding: UTF-8 -*-
+# **********************************************************************************#
+#     File:
+#   Author: Myron
+# **********************************************************************************#
+"""
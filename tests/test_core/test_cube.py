@@ -0,0 +1,116 @@
+"""
+# -*- coding: UTF-8 -*-
+# **********************************************************************************#
+#     File: Test data cubes.
+#   Author: Myron
+# **********************************************************************************#
+"""
+import pickle
+import numpy as np
+import pandas as pd
+from unittest import TestCase
+from g_air.core.cube import AttributeCube, IndicatorCube
+
+
+class TestAttributeCube(TestCase):
+
+    def setUp(self):
+        """
+        initialize set up.
+        """
+        self.dates = ['2018-12-03', '2018-12-04', '2018-12-05']
+        self.frames = {
+            'scdd': pd.DataFrame([[1., 2.], [3., 4.], [5., 6.]], index=self.dates, columns=['600000.SH', '000001.SZ']),
+            'tid': pd.DataFrame([[7.], [8.], [9.]], index=self.dates, columns=['000001.SZ']),
+        }
+        self.cube = AttributeCube.from_frames(self.frames)
+
+    def test_from_frames(self):
+        """
+        Test cube is aligned on the union of symbols.
+        """
+        self.assertEqual(self.cube.symbols, ['000001.SZ', '600000.SH'])
+        self.assertEqual(self.cube.array.shape, (2, 3, 2))
+        self.assertEqual(self.cube['scdd'].loc['2018-12-04', '600000.SH'], 3.)
+        self.assertTrue(np.isnan(self.cube['tid'].loc['2018-12-04', '600000.SH']))
+        self.assertEqual(set(self.cube.keys()), {'scdd', 'tid'})
+
+    def test_zero_copy_views(self):
+        """
+        Test views share memory with the cube.
+        """
+        for view in [self.cube.view('scdd'), self.cube.row('scdd', 1), self.cube.lag('scdd', 1),
+                     self.cube.date_slice(2), self.cube['scdd'].values, self.cube.series('tid', 0).values]:
+            self.assertTrue(np.shares_memory(view, self.cube.array))
+        self.assertEqual(list(self.cube.lag('scdd', 1)[:, 1]), [1., 3.])
+        self.assertEqual(list(self.cube.date_slice(self.cube.position('2018-12-05'))[:, 0]), [6., 9.])
+
+    def test_pickle(self):
+        """
+        Test cube survives pickling without cached frames.
+        """
+        self.cube.frame('scdd')
+        cube = pickle.loads(pickle.dumps(self.cube))
+        np.testing.assert_array_equal(cube['scdd'].values, self.cube['scdd'].values)
+
+    def test_tail_and_append(self):
+        """
+        Test sliding a cube forward keeps the tail and aligns appended symbols.
+        """
+        tail = self.cube.tail(2)
+        self.assertEqual(tail.dates, ['2018-12-04', '2018-12-05'])
+        self.assertTrue(np.shares_memory(tail.array, self.cube.array))
+        later = AttributeCube.from_frames({'scdd': pd.DataFrame([[10., 11.]], index=['2018-12-06'],
+                                                                columns=['600001.SH', '600000.SH'])})
+        cube = tail.append(later)
+        self.assertEqual(cube.dates, ['2018-12-04', '2018-12-05', '2018-12-06'])
+        self.assertEqual(cube.symbols, ['000001.SZ', '600000.SH', '600001.SH'])
+        self.assertEqual(cube['scdd'].loc['2018-12-05', '600000.SH'], 5.)
+        self.assertEqual(cube['scdd'].loc['2018-12-06', '600000.SH'], 11.)
+        self.assertTrue(np.isnan(cube['tid'].loc['2018-12-06', '000001.SZ']))
+        self.assertEqual(cube.last_valid_date(), '2018-12-06')
+        self.assertEqual(tail.append(AttributeCube.allocate(['scdd'], ['2018-12-06'], ['600000.SH'])).last_valid_date(),
+                         '2018-12-05')
+
+
+class TestIndicatorCube(TestCase):
+
+    def setUp(self):
+        """
+        initialize set up.
+        """
+        self.cube = IndicatorCube(np.arange(12, dtype=np.float64).reshape(2, 3, 2), ['J(n)', 'Q(n)'],
+                                  ['2018-12-03', '2018-12-04', '2018-12-05'], ['000001.SZ', '600000.SH'])
+
+    def test_views(self):
+        """
+        Test views by any axis share memory with the cube.
+        """
+        self.assertEqual(list(self.cube), ['J(n)', 'Q(n)'])
+        self.assertEqual(self.cube['Q(n)'].loc['2018-12-04', '600000.SH'], 9.)
+        self.assertEqual(self.cube.by_date('2018-12-05').loc['J(n)', '000001.SZ'], 4.)
+        self.assertEqual(self.cube.by_symbol('600000.SH').loc['2018-12-03', 'Q(n)'], 7.)
+        for frame in (self.cube['J(n)'], self.cube.by_date('2018-12-04'), self.cube.by_symbol('000001.SZ')):
+            self.assertTrue(np.shares_memory(frame.values, self.cube.array))
+
+    def test_fill_and_update(self):
+        """
+        Test frames and cubes are written in place on the matching positions.
+        """
+        cube = IndicatorCube.allocate(['J(n)', 'Q(n)'], ['2018-12-04', '2018-12-05'], ['000001.SZ', '600000.SH'])
+        cube.fill('J(n)', pd.DataFrame([[1., 2.], [3., 4.]], index=['2018-12-03', '2018-12-04'],
+                                       columns=['600000.SH', '000002.SZ']))
+        self.assertEqual(cube['J(n)'].loc['2018-12-04', '600000.SH'], 3.)
+        self.assertEqual(int(np.isnan(cube.array).sum()), 7)
+        cube.update(IndicatorCube(np.full((1, 1, 1), 5.), ['Q(n)'], ['2018-12-05'], ['000001.SZ']))
+        self.assertEqual(cube['Q(n)'].loc['2018-12-05', '000001.SZ'], 5.)
+        with self.assertRaises(AssertionError):
+            cube.update(self.cube)
+
+    def test_to_frame(self):
+        """
+        Test conversion to a long frame.
+        """
+        frame = self.cube.to_frame()
+        self.assertEqual(frame.shape, (6, 2))
+        self.assertEqual(frame.loc[('2018-12-04', '600000.SH'), 'Q(n)'], 9.)
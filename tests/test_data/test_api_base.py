@@ -0,0 +1,99 @@
+"""
+# -*- coding: UTF-8 -*-
+# **********************************************************************************#
+#     File: Test api base.
+#   Author: Myron
+# **********************************************************************************#
+"""
+from unittest import TestCase
+from g_air.data.api_base import ConnectionPool
+
+
+class _FakeConnection(object):
+
+    def __init__(self):
+        self.open = True
+        self.alive = True
+
+    def ping(self, reconnect=False):
+        if not self.alive:
+            raise ConnectionError('Lost connection.')
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.open = False
+
+
+class TestConnectionPool(TestCase):
+
+    def setUp(self):
+        """
+        initialize set up.
+        """
+        import g_air.data.api_base as api_base
+        self.api_base = api_base
+        self.origin_get_connection = api_base.get_connection
+        self.created = list()
+
+        def _get_connection(connection_type):
+            connection = _FakeConnection()
+            self.created.append(connection)
+            return connection
+
+        api_base.get_connection = _get_connection
+
+    def tearDown(self):
+        self.api_base.get_connection = self.origin_get_connection
+
+    def test_reuse(self):
+        """
+        Test connections are reused.
+        """
+        pool = ConnectionPool(max_connections=2)
+        for _ in range(5):
+            with pool.connection() as connection:
+                self.assertTrue(connection.open)
+        self.assertEqual(len(self.created), 1)
+
+    def test_bounded(self):
+        """
+        Test checkout is bounded.
+        """
+        pool = ConnectionPool(max_connections=2, checkout_timeout=0.01)
+        first, second = pool.acquire(), pool.acquire()
+        self.assertRaises(TimeoutError, pool.acquire)
+        pool.release(first)
+        self.assertIs(pool.acquire(), first)
+        pool.release(second)
+
+    def test_health_check_and_recycle(self):
+        """
+        Test broken and expired connections are replaced.
+        """
+        pool = ConnectionPool(max_connections=1, health_check_interval=-1)
+        with pool.connection() as connection:
+            connection.alive = False
+        with pool.connection() as connection:
+            self.assertTrue(connection.alive)
+        self.assertEqual(len(self.created), 2)
+        self.assertFalse(self.created[0].open)
+        pool.max_lifetime = -1
+        with pool.connection():
+            pass
+        self.assertEqual(len(self.created), 3)
+
+    def test_discard_on_error(self):
+        """
+        Test connection is discarded when the context raises.
+        """
+        pool = ConnectionPool(max_connections=1)
+        try:
+            with pool.connection():
+                raise ValueError
+        except ValueError:
+            pass
+        self.assertFalse(self.created[0].open)
+        with pool.connection() as connection:
+            self.assertIsNot(connection, self.created[0])
@@ -0,0 +1,117 @@
+"""
+# -*- coding: UTF-8 -*-
+# **********************************************************************************#
+#     File: Test local result cache.
+#   Author: Myron
+# **********************************************************************************#
+"""
+import os
+import shutil
+import tempfile
+import numpy as np
+from unittest import TestCase
+from unittest import mock
+from tests.test_calculator import make_attribute_frames
+from g_air import api
+from g_air.core.cube import AttributeCube, IndicatorCube
+from g_air.data.cache import ResultCache
+
+
+class TestResultCache(TestCase):
+
+    def setUp(self):
+        """
+        initialize set up.
+        """
+        self.path = tempfile.mkdtemp()
+        self.cache = ResultCache(os.path.join(self.path, 'cache.sqlite'))
+        self.versions = {'J(n)': 'a', 'Q(n)': 'b'}
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_fetch_known_cells(self):
+        """
+        Test cached cells are known and merged across symbols, NaN cells are not.
+        """
+        cube = IndicatorCube(np.array([[[1., np.nan]]]), ['J(n)'], ['2018-12-04'], ['000001.SZ', '000002.SZ'])
+        self.cache.store(cube, self.versions)
+        self.cache.store(IndicatorCube(np.array([[[3.]]]), ['J(n)'], ['2018-12-04'], ['600000.SH']), self.versions)
+        target = IndicatorCube.allocate(['J(n)', 'Q(n)'], ['2018-12-04', '2018-12-05'],
+                                        ['000001.SZ', '000002.SZ', '600000.SH', '600001.SH'])
+        known = self.cache.fetch(target, self.versions)
+        self.assertEqual(known[0, 0].tolist(), [True, False, True, False])
+        self.assertFalse(known[1].any() or known[:, 1].any())
+        self.assertEqual(target['J(n)'].loc['2018-12-04', '600000.SH'], 3.)
+        self.assertEqual(target['J(n)'].loc['2018-12-04', '000001.SZ'], 1.)
+
+    def test_nan_cells_before_watermark(self):
+        """
+        Test NaN cells are known before the watermark of their data only.
+        """
+        cube = IndicatorCube(np.array([[[1., np.nan], [np.nan, np.nan]]]), ['J(n)'], ['2018-12-04', '2018-12-05'],
+                             ['000001.SZ', '000002.SZ'])
+        self.cache.store(cube, self.versions, watermark='2018-12-05')
+        target = IndicatorCube.allocate(['J(n)'], cube.dates, cube.symbols)
+        self.assertEqual(self.cache.fetch(target, self.versions)[0].tolist(), [[True, True], [False, False]])
+        np.testing.assert_array_equal(target.array[:, 0], cube.array[:, 0])
+
+    def test_stale_versions(self):
+        """
+        Test cells of another formula version are not known.
+        """
+        cube = IndicatorCube(np.array([[[1.]]]), ['Q(n)'], ['2018-12-04'], ['000001.SZ'])
+        self.cache.store(cube, self.versions)
+        self.assertFalse(self.cache.fetch(cube, {'Q(n)': 'c'}).any())
+        self.assertTrue(self.cache.fetch(cube, self.versions).all())
+
+
+class TestCachedCalculation(TestCase):
+
+    def setUp(self):
+        """
+        initialize set up.
+        """
+        self.dates, self.symbols, self.data = make_attribute_frames(3)
+        self.symbols.append('600519.SH')
+        self.target_dates = self.dates[80:]
+        self.path = tempfile.mkdtemp()
+        self.cache = ResultCache(os.path.join(self.path, 'cache.sqlite'))
+        self.start_dates = list()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def _load_attributes_cube(self, symbols, trading_days, attributes=None, periods=None):
+        """
+        Load the synthetic attributes of trading days on the symbols with rows in them.
+        """
+        available = [symbol for symbol in symbols if symbol in self.data[attributes[0]].columns]
+        return AttributeCube.from_frames({attribute: self.data[attribute].loc[list(trading_days), available]
+                                          for attribute in attributes})
+
+    def _history_periods(self, date, history_periods):
+        self.start_dates.append(date)
+        position = self.dates.index(date)
+        return self.dates[max(position - history_periods, 0):position + 1]
+
+    def _calculate(self, cache):
+        with mock.patch.object(api, 'get_result_cache', lambda: cache), \
+                mock.patch.object(api, 'load_trading_days_with_history_periods', self._history_periods), \
+                mock.patch.object(api, 'load_attributes_cube', self._load_attributes_cube):
+            return api.calculate_indicators_of_date_range(symbols=self.symbols, target_date_range=self.target_dates)
+
+    def test_symbols_without_rows(self):
+        """
+        Test cached and uncached calculations share the requested symbols, and NaN cells of a symbol without
+        rows are only calculated again at the latest date of the data.
+        """
+        expected = self._calculate(None)
+        self.assertEqual(expected.symbols, sorted(self.symbols))
+        self.assertTrue(np.isnan(expected['Q(n)']['600519.SH'].values).all())
+        for _ in range(2):
+            self.start_dates = list()
+            cube = self._calculate(self.cache)
+            self.assertEqual(cube.symbols, expected.symbols)
+            np.testing.assert_array_equal(cube.array, expected.array)
+        self.assertEqual(self.start_dates, [self.target_dates[-1]])
@@ -0,0 +1,84 @@
+"""
+# -*- coding: UTF-8 -*-
+# **********************************************************************************#
+#     File: Test trading calendar.
+#   Author: Myron
+# **********************************************************************************#
+"""
+from unittest import TestCase
+from g_air.data.calendar import TradingCalendar
+
+
+class TestTradingCalendar(TestCase):
+
+    def setUp(self):
+        """
+        initialize set up.
+        """
+        self.trading_days = ['2018-12-03', '2018-12-04', '2018-12-05', '2018-12-06', '2018-12-07', '2018-12-10']
+        self.loading_times = 0
+
+        def _loader():
+            self.loading_times += 1
+            return list(reversed(self.trading_days))
+
+        self.calendar = TradingCalendar(loader=_loader)
+
+    def test_offset(self):
+        """
+        Test offset trading day.
+        """
+        self.assertEqual(self.calendar.offset('2018-12-05'), '2018-12-05')
+        self.assertEqual(self.calendar.offset('2018-12-05', offset=-1), '2018-12-04')
+        self.assertEqual(self.calendar.offset('2018-12-07', offset=1), '2018-12-10')
+        self.assertEqual(self.calendar.offset('2018-12-04', offset=-10), '2018-12-03')
+        self.assertEqual(self.calendar.offset('2018-12-07', offset=10), '2018-12-10')
+        self.assertRaises(ValueError, self.calendar.offset, '2018-12-08')
+
+    def test_history_periods(self):
+        """
+        Test trading days with history periods.
+        """
+        self.assertEqual(self.calendar.history_periods('2018-12-06', 2), ['2018-12-04', '2018-12-05', '2018-12-06'])
+        self.assertEqual(self.calendar.history_periods('2018-12-08', 1), ['2018-12-06', '2018-12-07'])
+        self.assertEqual(self.calendar.history_periods('2018-12-04', 10), ['2018-12-03', '2018-12-04'])
+
+    def test_window(self):
+        """
+        Test trading days window.
+        """
+        self.assertEqual(self.calendar.window('2018-12-04', '2018-12-06'), ['2018-12-04', '2018-12-05', '2018-12-06'])
+        self.assertEqual(self.calendar.window(start='20181207'), ['2018-12-07', '2018-12-10'])
+        self.assertEqual(self.calendar.window(end='2018-12-03'), ['2018-12-03'])
+        self.assertEqual(self.calendar.window(), self.trading_days)
+
+    def test_ordinals(self):
+        """
+        Test ordinals of dates.
+        """
+        self.assertEqual(self.calendar.ordinal('2018-12-10'), 5)
+        self.assertEqual(list(self.calendar.ordinals(['2018-12-03', '2018-12-08', '2018-12-10', '2019-01-01'])),
+                         [0, -1, 5, -1])
+
+    def test_refresh_policy(self):
+        """
+        Test calendar is loaded once and refreshed by policy.
+        """
+        for _ in range(10):
+            self.calendar.offset('2018-12-05', offset=-1)
+            self.calendar.history_periods('2018-12-05', 2)
+        self.assertEqual(self.loading_times, 1)
+        self.calendar.miss_refresh_interval = 0
+        self.calendar.history_periods('2018-12-11', 2)
+        self.assertEqual(self.loading_times, 2)
+        self.calendar.refresh_interval = 0
+        self.calendar.offset('2018-12-05')
+        self.assertEqual(self.loading_times, 3)
+
+    def test_seeded_refresh(self):
+        """
+        Test calendar seeded with trading days does not call the loader.
+        """
+        self.calendar.refresh(self.trading_days[:3])
+        self.assertEqual(self.calendar.offset('2018-12-05', offset=-2), '2018-12-03')
+        self.assertEqual(self.loading_times, 0)
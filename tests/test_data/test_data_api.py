@@ -70,6 +70,16 @@ class TestDatabaseAPI(TestCase):
         # data_all = load_attributes_data(trading_days=trading_days)
         # assert data
 
+    def test_load_attributes_cube(self):
+        """
+        Test load attributes cube.
+        """
+        symbols = ['000001.SZ', '600000.SH']
+        trading_days = load_trading_days(start='20181201', end='20190101')
+        cube = load_attributes_cube(symbols, trading_days, attributes=['scdd', 'adj_close_price'])
+        self.assertEqual(cube.array.shape, (2, len(trading_days), len(cube.symbols)))
+        print(cube['scdd'])
+
     def test_load_symbols_name_map(self):
         """
         Test load symbols name map.
@@ -0,0 +1,80 @@
+"""
+# -*- coding: UTF-8 -*-
+# **********************************************************************************#
+#     File: Test streaming attribute ingest.
+#   Author: Myron
+# **********************************************************************************#
+"""
+import numpy as np
+from contextlib import contextmanager
+from unittest import TestCase
+import g_air.data.ingest as ingest
+
+
+class _FakeCursor(object):
+
+    def __init__(self, tables):
+        self.tables = tables
+        self.rows = list()
+
+    def execute(self, sql, params=None):
+        table = sql.split(' from ')[1].split(' ')[0]
+        self.rows = list(self.tables[table])
+
+    def fetchmany(self, size):
+        rows, self.rows = self.rows[:size], self.rows[size:]
+        return tuple(rows)
+
+
+class TestIngest(TestCase):
+
+    def setUp(self):
+        """
+        initialize set up.
+        """
+        self.tables = {
+            'scdd': [
+                ('2018-12-03 00:00:00', '000001.SZ', 1.0),
+                ('2018-12-04 00:00:00', '600000.SH', 2.0),
+                ('2018-12-01 00:00:00', '600000.SH', 9.0),
+                ('2018-12-05 00:00:00', '300001.SZ', None),
+            ],
+            'tid': [
+                ('2018-12-04 00:00:00', '000001.SZ', 3.0),
+                ('2018-12-05 00:00:00', '002352.SZ', 4.0),
+            ]
+        }
+        self.origin_pooled_cursor = ingest.pooled_cursor
+
+        @contextmanager
+        def _pooled_cursor(connection_type=None, cursor_class=None):
+            yield _FakeCursor(self.tables)
+
+        ingest.pooled_cursor = _pooled_cursor
+
+    def tearDown(self):
+        ingest.pooled_cursor = self.origin_pooled_cursor
+
+    def test_ingest_attributes(self):
+        """
+        Test rows are streamed into shared date and symbol axes.
+        """
+        trading_days = ['2018-12-03', '2018-12-04', '2018-12-05']
+        arrays, symbols = ingest.ingest_attributes(trading_days=trading_days, attributes=['scdd', 'tid'])
+        self.assertEqual(sorted(symbols), ['000001.SZ', '002352.SZ', '300001.SZ', '600000.SH'])
+        scdd, tid = arrays['scdd'], arrays['tid']
+        self.assertEqual(scdd.shape, (3, 4))
+        self.assertEqual(scdd[0, symbols.index('000001.SZ')], 1.0)
+        self.assertEqual(scdd[1, symbols.index('600000.SH')], 2.0)
+        self.assertEqual(np.nansum(scdd), 3.0)
+        self.assertEqual(tid[2, symbols.index('002352.SZ')], 4.0)
+
+    def test_ingest_fixed_symbols(self):
+        """
+        Test fixed symbols and symbols without rows are dropped.
+        """
+        trading_days = ['2018-12-03', '2018-12-04']
+        arrays, symbols = ingest.ingest_attributes(
+            symbols=['600000.SH', '000001.SZ', '000002.SZ'], trading_days=trading_days, attributes=['scdd'])
+        self.assertEqual(symbols, ['600000.SH', '000001.SZ'])
+        np.testing.assert_array_equal(arrays['scdd'], np.array([[np.nan, 1.0], [2.0, np.nan]]))
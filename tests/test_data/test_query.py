@@ -0,0 +1,34 @@
+"""
+# -*- coding: UTF-8 -*-
+# **********************************************************************************#
+#     File: Test attribute query builder.
+#   Author: Myron
+# **********************************************************************************#
+"""
+from unittest import TestCase
+from g_air.data.query import build_attribute_queries
+
+
+class TestQueryBuilder(TestCase):
+
+    def test_date_range_and_symbol_chunks(self):
+        """
+        Test half-open date range predicates and chunked symbol parameters.
+        """
+        queries = build_attribute_queries(
+            'scdm', symbols=['000001.SZ', '600000.SH', '300001.SZ'],
+            trading_days=['2018-12-28', '2018-12-03', '2018-12-31'], chunk_size=2)
+        self.assertEqual(len(queries), 2)
+        sql, params = queries[0]
+        self.assertEqual(sql, 'select 日期,代码,scdm from scdm where 日期 >= %s and 日期 < %s and 代码 in (%s,%s)')
+        self.assertEqual(params, ('2018-12-03 00:00:00', '2019-01-01 00:00:00', '000001.SZ', '600000.SH'))
+        self.assertEqual(queries[1][1], ('2018-12-03 00:00:00', '2019-01-01 00:00:00', '300001.SZ'))
+        self.assertNotIn('substr', sql)
+
+    def test_mapped_attribute(self):
+        """
+        Test mapped attribute columns and watermark predicate.
+        """
+        queries = build_attribute_queries('adj_close_price', since='2018-12-03 00:00:00')
+        self.assertEqual(queries, [('select 日期,代码,复权收盘价 from price where 日期 > %s', ('2018-12-03 00:00:00',))])
+        self.assertEqual(build_attribute_queries('tid'), [('select 日期,代码,tid from tid', ())])
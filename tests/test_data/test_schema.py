@@ -0,0 +1,56 @@
+"""
+# -*- coding: UTF-8 -*-
+# **********************************************************************************#
+#     File: Test target schema.
+#   Author: Myron
+# **********************************************************************************#
+"""
+from contextlib import contextmanager
+from unittest import TestCase
+from unittest import mock
+from g_air.data import schema
+from g_air.data.schema import *
+
+
+class TestSchema(TestCase):
+
+    def test_monthly_partitions(self):
+        """
+        Test monthly partitions across a year end.
+        """
+        clause = monthly_partitions('2018-11', '2019-02')
+        self.assertIn("partition p201812 values less than ('2019-01-01')", clause)
+        self.assertEqual(clause.count('partition p'), 4)
+        self.assertTrue(clause.endswith('partition pmax values less than (maxvalue))'))
+
+    def test_typed_table_sql(self):
+        """
+        Test typed tables have a DATE column and a composite primary key.
+        """
+        sql = typed_table_sql('m2b__typed', column='m2b')
+        self.assertIn('create table m2b__typed', sql)
+        self.assertIn('日期 date not null', sql)
+        self.assertIn('m2b float', sql)
+        self.assertIn('primary key (日期, 代码)', sql)
+
+    def test_migrate_table_locks_last_month(self):
+        """
+        Test the last month is copied again under a write lock before the tables are swapped.
+        """
+        statements = list()
+        cursor = mock.MagicMock()
+        cursor.execute.side_effect = lambda sql, *args: statements.append(' '.join(sql.split()))
+        cursor.fetchall.side_effect = [[('2018-11',), ('2018-12',)], [('2018-12',)]]
+
+        @contextmanager
+        def _pooled_cursor(*args):
+            yield cursor
+
+        with mock.patch.object(schema, 'pooled_cursor', _pooled_cursor), \
+                mock.patch.object(schema, '_typed_tables', {'m2b': False}):
+            migrate_table('m2b')
+            self.assertTrue(is_typed_table('m2b'))
+        kinds = [statement.split(' ')[0] for statement in statements]
+        self.assertEqual(kinds, ['drop', 'create', 'select', 'insert', 'insert', 'lock', 'select', 'insert',
+                                 'rename', 'unlock'])
+        self.assertEqual(statements[5], 'lock tables m2b write, m2b__typed write')
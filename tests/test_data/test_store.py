@@ -0,0 +1,88 @@
+"""
+# -*- coding: UTF-8 -*-
+# **********************************************************************************#
+#     File: Test local attribute store.
+#   Author: Myron
+# **********************************************************************************#
+"""
+import shutil
+import tempfile
+import numpy as np
+from datetime import timedelta
+from unittest import TestCase
+from g_air.data.store import AttributeStore
+
+
+class TestAttributeStore(TestCase):
+
+    def setUp(self):
+        """
+        initialize set up.
+        """
+        self.path = tempfile.mkdtemp()
+        self.rows = [
+            ('2018-12-03 00:00:00', '000001.SZ', 1.0),
+            ('2018-12-03 00:00:00', '600000.SH', 2.0),
+            ('2018-12-04 00:00:00', '000001.SZ', 3.0),
+            ('2018-12-05 00:00:00', '600000.SH', None),
+        ]
+        self.watermarks = list()
+
+        def _fetcher(attribute, watermark):
+            self.watermarks.append((attribute, watermark))
+            return [row for row in self.rows if watermark is None or row[0] > watermark]
+
+        self.fetcher = _fetcher
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_sync_and_load(self):
+        """
+        Test sync attributes and load them back.
+        """
+        store = AttributeStore(self.path)
+        store.sync(['scdd'], fetcher=self.fetcher)
+        self.assertEqual(store.watermark('scdd'), '2018-12-05 00:00:00')
+        data = store.load(['000001.SZ', '600000.SH', '300001.SZ'], ['2018-12-03', '2018-12-04', '2018-12-05'],
+                          attributes=['scdd'])
+        frame = data['scdd']
+        self.assertEqual(list(frame.columns), ['000001.SZ', '600000.SH'])
+        self.assertEqual(list(store.load(trading_days=['2018-12-05'], attributes=['scdd'])['scdd'].columns),
+                         ['600000.SH'])
+        self.assertEqual(frame.loc['2018-12-03', '600000.SH'], 2.0)
+        self.assertEqual(frame.loc['2018-12-04', '000001.SZ'], 3.0)
+        self.assertTrue(np.isnan(frame.loc['2018-12-05', '600000.SH']))
+
+    def test_incremental_sync(self):
+        """
+        Test sync only pulls rows newer than the watermark and survives reopening.
+        """
+        store = AttributeStore(self.path, sync_interval=None)
+        store.sync(['scdd'], fetcher=self.fetcher)
+        self.assertFalse(store.covers('scdd', ['2018-12-06']))
+        self.rows.extend([
+            ('2018-12-06 00:00:00', '000001.SZ', 5.0),
+            ('2018-12-06 00:00:00', '300001.SZ', 6.0),
+        ])
+        store = AttributeStore(self.path)
+        store.sync(['scdd'], fetcher=self.fetcher)
+        self.assertEqual(self.watermarks[-1], ('scdd', '2018-12-05 00:00:00'))
+        self.assertTrue(store.covers('scdd', ['2018-12-06']))
+        frame = store.load(trading_days=['2018-12-03', '2018-12-06'], attributes=['scdd'])['scdd']
+        self.assertEqual(frame.loc['2018-12-03', '600000.SH'], 2.0)
+        self.assertEqual(frame.loc['2018-12-06', '300001.SZ'], 6.0)
+        self.assertEqual(frame.loc['2018-12-06', '000001.SZ'], 5.0)
+
+    def test_sync_interval(self):
+        """
+        Test dates past the watermark are not synced again within the sync interval.
+        """
+        store = AttributeStore(self.path)
+        self.assertFalse(store.covers('scdd', ['2018-12-06']))
+        store.sync(['scdd'], fetcher=self.fetcher)
+        self.assertTrue(store.covers('scdd', ['2018-12-06']))
+        self.assertFalse(store.covers('scdm', ['2018-12-06']))
+        store.sync_interval = 0
+        store.synced_times['scdd'] -= timedelta(seconds=1)
+        self.assertFalse(store.covers('scdd', ['2018-12-06']))
@@ -0,0 +1,153 @@
+"""
+# -*- coding: UTF-8 -*-
+# **********************************************************************************#
+#     File: Test bulk writer.
+#   Author: Myron
+# **********************************************************************************#
+"""
+import threading
+import numpy as np
+import pandas as pd
+from contextlib import contextmanager
+from unittest import TestCase
+from unittest import mock
+from g_air.core.cube import IndicatorCube
+from g_air.data import database_api
+from g_air.data.writer import *
+
+
+class TestWriter(TestCase):
+
+    def test_build_rows(self):
+        """
+        Test rows are the non NaN cells with symbol names joined.
+        """
+        frame = pd.DataFrame([[1., np.nan], [np.nan, 4.]], index=['2018-12-04', '2018-12-05'],
+                             columns=['000001.SZ', '600000.SH'])
+        rows = build_rows(frame, {'000001.SZ': '平安银行'})
+        self.assertEqual([tuple(row) for row in rows.itertuples(index=False)],
+                         [('2018-12-04 00:00:00', '000001.SZ', '平安银行', 1.),
+                          ('2018-12-05 00:00:00', '600000.SH', '600000.SH', 4.)])
+        self.assertEqual(len(build_rows(frame.iloc[:0])), 0)
+        self.assertEqual(list(build_rows(frame, typed=True)['date']), ['2018-12-04', '2018-12-05'])
+
+    def test_table_name(self):
+        """
+        Test table names of indicators.
+        """
+        self.assertEqual(table_name('M2B(n)'), 'm2b')
+        self.assertEqual(table_name('ZQ(n)'), 'zq')
+
+    def test_diff_cells(self):
+        """
+        Test only new and changed cells are kept, with existing rows read back aligned to the frame.
+        """
+        frame = pd.DataFrame([[1.1, 2., np.nan], [3., 4., 5.]], index=['2018-12-04', '2018-12-05'],
+                             columns=['000001.SZ', '600000.SH', '600519.SH'])
+        fetched = [('2018-12-04 00:00:00', '000001.SZ', float(np.float32(1.1))),
+                   ('2018-12-04 00:00:00', '600000.SH', 2.5),
+                   ('2018-12-05 00:00:00', '000001.SZ', None),
+                   ('2018-12-05 00:00:00', '000002.SZ', 7.)]
+
+        @contextmanager
+        def _pooled_cursor(*args):
+            cursor = mock.MagicMock()
+            cursor.fetchall.return_value = fetched
+            yield cursor
+
+        with mock.patch('g_air.data.writer.pooled_cursor', _pooled_cursor):
+            existing, known = load_existing('m2b', frame)
+        self.assertEqual(known.tolist(), [[True, True, False], [True, False, False]])
+        new, changed, unchanged = diff_cells(frame, existing, known)
+        self.assertEqual(new.tolist(), [[False, False, False], [False, True, True]])
+        self.assertEqual(changed.tolist(), [[False, True, False], [True, False, False]])
+        self.assertEqual(unchanged, 1)
+        rows = build_rows(frame, mask=new | changed)
+        self.assertEqual(list(zip(rows['date'], rows['symbol'])),
+                         [('2018-12-04 00:00:00', '600000.SH'), ('2018-12-05 00:00:00', '000001.SZ'),
+                          ('2018-12-05 00:00:00', '600000.SH'), ('2018-12-05 00:00:00', '600519.SH')])
+
+    def test_diff_counts(self):
+        """
+        Test per indicator counts of a diff write, only new and changed rows upserted.
+        """
+        cube = IndicatorCube(np.array([[[1., 2., np.nan]], [[3., 4., 5.]]]), ['M2B(n)', 'ZQ(n)'], ['2018-12-04'],
+                             ['000001.SZ', '000002.SZ', '600000.SH'])
+        existing = {'m2b': (np.array([[1., 5., 6.]]), np.array([[True, True, True]])),
+                    'zq': (np.array([[3., np.nan, np.nan]]), np.array([[True, False, False]]))}
+        upserted = dict()
+        with mock.patch('g_air.data.writer.ensure_tables'), \
+                mock.patch('g_air.data.writer.is_typed_table', return_value=False), \
+                mock.patch('g_air.data.writer.load_existing', lambda table, frame: existing[table]), \
+                mock.patch('g_air.data.writer.upsert_rows',
+                           lambda table, rows, **kwargs: upserted.update({table: list(rows['symbol'])})):
+            counts = write_indicator_cube(cube, method='diff')
+        self.assertEqual(counts['M2B(n)'], {'written': 1, 'new': 0, 'changed': 1, 'unchanged': 1})
+        self.assertEqual(counts['ZQ(n)'], {'written': 2, 'new': 2, 'changed': 0, 'unchanged': 1})
+        self.assertEqual(upserted, {'m2b': ['000002.SZ'], 'zq': ['000002.SZ', '600000.SH']})
+
+    def test_batched_update_table(self):
+        """
+        Test the schema is queried once and items are upserted in bounded batches.
+        """
+        batches, queries = list(), list()
+        lock = threading.Lock()
+
+        class _Cursor(object):
+            connection = mock.Mock()
+
+            @staticmethod
+            def executemany(sql, items):
+                with lock:
+                    batches.append(list(items))
+
+        @contextmanager
+        def _pooled_cursor(connection_type):
+            yield _Cursor()
+
+        def _get_all_tables():
+            queries.append(None)
+            return ['m2b']
+
+        with mock.patch.object(database_api, 'pooled_cursor', _pooled_cursor), \
+                mock.patch.object(database_api, 'get_all_tables', _get_all_tables), \
+                mock.patch.object(database_api, '_known_tables', set()):
+            items = [('2018-12-04 00:00:00', str(index), str(index), float(index)) for index in range(10)]
+            database_api.update_table('m2b', items, batch_size=4, writers=2)
+            database_api.update_table('m2b', items[:3], batch_size=4)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(sorted(len(batch) for batch in batches), [2, 3, 4, 4])
+        self.assertEqual(sorted(item for batch in batches[:3] for item in batch), sorted(items))
+
+    def test_chunked_delete(self):
+        """
+        Test range deletes are sargable, chunked and run for every table.
+        """
+        statements = list()
+        remaining = {'m2b': 5, 'zq': 2}
+        lock = threading.Lock()
+
+        class _Cursor(object):
+            connection = mock.Mock()
+
+            @staticmethod
+            def execute(sql, parameters):
+                table, limit = sql.split()[2], int(sql.split()[-1])
+                with lock:
+                    statements.append((sql, parameters))
+                    rows = min(remaining[table], limit)
+                    remaining[table] -= rows
+                return rows
+
+        @contextmanager
+        def _pooled_cursor(connection_type):
+            yield _Cursor()
+
+        with mock.patch.object(database_api, 'pooled_cursor', _pooled_cursor), \
+                mock.patch.object(database_api, 'get_all_tables', lambda: ['m2b', 'zq', 'w2b']):
+            deleted = database_api.delete_items_('2018-12-04', '2018-12-05', symbols=['000001.SZ'],
+                                                 indicators=['m2b', 'zq'], chunk_size=2, writers=2)
+        self.assertEqual(deleted, 7)
+        self.assertEqual(len(statements), 5)
+        self.assertNotIn('substr', statements[0][0])
+        self.assertEqual(statements[0][1], ('2018-12-04', '2018-12-06', '000001.SZ'))
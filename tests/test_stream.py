@@ -0,0 +1,72 @@
+"""
+# -*- coding: UTF-8 -*-
+# **********************************************************************************#
+#     File: Test streamed date range calculation.
+#   Author: Myron
+# **********************************************************************************#
+"""
+import numpy as np
+from unittest import TestCase
+from unittest import mock
+from tests.test_calculator import make_attribute_frames
+from g_air import api
+from g_air.core.cube import AttributeCube
+from g_air.data.calendar import TradingCalendar
+
+
+class TestStream(TestCase):
+
+    def setUp(self):
+        """
+        initialize set up.
+        """
+        self.dates, self.symbols, self.data = make_attribute_frames(5, periods=150)
+        self.symbols.append('600519.SH')
+        for attribute, frame in self.data.items():
+            frame['600519.SH'] = frame['000001.SZ'] + 1.
+            frame.loc[self.dates[:100], '600519.SH'] = np.nan
+        self.target_dates = self.dates[90:130]
+
+    def _load_attributes_cube(self, symbols, trading_days, attributes=None, periods=None):
+        """
+        Load the synthetic attributes of trading days on the symbols with rows in them.
+        """
+        frames = dict()
+        for attribute in attributes:
+            frame = self.data[attribute].loc[list(trading_days), list(symbols)].copy()
+            if periods:
+                frame.iloc[:len(trading_days) - periods[attribute]] = np.nan
+            frames[attribute] = frame
+        available = [symbol for symbol in symbols if any(frame[symbol].notna().any() for frame in frames.values())]
+        return AttributeCube.from_frames({attribute: frame[available] for attribute, frame in frames.items()})
+
+    def _history_periods(self, date, history_periods):
+        position = self.dates.index(date)
+        return self.dates[max(position - history_periods, 0):position + 1]
+
+    def test_windows_identical_to_range(self):
+        """
+        Test concatenated windows are identical to one date range calculation, a symbol joining the windows
+        with its first rows.
+        """
+        calendar = TradingCalendar(loader=lambda: self.dates)
+        with mock.patch.object(api, 'get_trading_calendar', lambda: calendar), \
+                mock.patch.object(api, 'get_result_cache', lambda: None), \
+                mock.patch.object(api, 'load_trading_days_with_history_periods', self._history_periods), \
+                mock.patch.object(api, 'load_attributes_cube', self._load_attributes_cube):
+            expected = api.calculate_indicators_of_date_range(symbols=self.symbols,
+                                                              target_date_range=self.target_dates)
+            self.assertIn('600519.SH', expected.symbols)
+            for window_periods in (1, 7):
+                cubes = list(api.iterate_indicators_of_date_range(
+                    symbols=self.symbols, target_date_range=self.target_dates[::-1], window_periods=window_periods))
+                self.assertEqual([date for cube in cubes for date in cube.dates], self.target_dates)
+                self.assertNotIn('600519.SH', cubes[0].symbols)
+                self.assertIn('600519.SH', cubes[-1].symbols)
+                for cube in cubes:
+                    self.assertEqual(cube.indicators, expected.indicators)
+                    for indicator in cube.indicators:
+                        frame = expected[indicator].loc[cube.dates]
+                        np.testing.assert_array_equal(cube[indicator].values, frame[cube.symbols].values)
+                self.assertEqual([cube.dates[0] for cube in cubes if '600519.SH' in cube.symbols][0],
+                                 self.target_dates[10 // window_periods * window_periods])